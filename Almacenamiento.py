@@ -0,0 +1,590 @@
+# Almacenamiento.py
+"""
+B-Tree en disco para el índice de snapshots de configuración (BTreeDisco).
+El archivo se divide en páginas de tamaño fijo: las páginas 0 y 1 son cabeceras y las demás
+guardan un nodo cada una. Las lecturas se hacen sobre un mmap del archivo y los nodos
+decodificados se conservan en un buffer pool LRU.
+Las escrituras nunca modifican páginas alcanzables desde la cabecera vigente (shadow paging):
+cada cambio copia el camino de la raíz a la hoja en páginas libres y se confirma escribiendo
+una cabecera nueva, con número de generación y checksum, en la ranura de la anterior. Al
+abrir se usa la cabecera válida de mayor generación, así que una caída a mitad de una
+escritura deja el árbol como estaba en la última confirmación.
+"""
+import mmap
+import os
+import struct
+import zlib
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+
+MAGICO = b"BTDISK01"
+# mágico, generación, tam_pagina, t, raíz, páginas, claves, altura, nodos, splits, merges
+_CABECERA = struct.Struct("<8sQIIQQQIIQQ")
+_CRC = struct.Struct("<I")
+_NODO = struct.Struct("<BH") # hoja, número de claves
+_LARGO = struct.Struct("<H")
+_PRIMERA_PAGINA_NODO = 2
+_TAM_PAGINA_MINIMO = 512 # Los tamaños de página son potencias de dos desde aquí (ver _leer_cabecera)
+
+class NodoDisco:
+    """Nodo de un BTreeDisco: como NodoBTree, pero los hijos son números de página."""
+    __slots__ = ("pagina", "hoja", "claves", "valores", "hijos")
+
+    def __init__(self, pagina, hoja, claves=None, valores=None, hijos=None):
+        self.pagina = pagina
+        self.hoja = hoja
+        self.claves = claves if claves is not None else []
+        self.valores = valores if valores is not None else []
+        self.hijos = hijos if hijos is not None else []
+
+class BTreeDisco:
+    """
+    B-Tree paginado en un único archivo con la misma interfaz que Arboles.BTree (insertar,
+    buscar, eliminar, iterar, piso, techo, tamano, obtener_stats). Claves y valores deben ser
+    cadenas; cada par codificado en UTF-8 puede ocupar hasta `max_entrada` bytes, y el grado
+    mínimo t se deduce de ese tamaño y del de página para que un nodo lleno quepa en una página.
+    Cada operación de escritura es una transacción; varias se agrupan con `transaccion()`.
+    Al serializarse con pickle (p. ej. la Red que recibe cada proceso de SimulacionParalela)
+    solo se guarda la ruta, y la copia reabre el archivo en solo lectura.
+    """
+    def __init__(self, archivo, tam_pagina=4096, max_entrada=256, capacidad_cache=256, sincronizar=True,
+                 solo_lectura=False):
+        """
+        Args:
+            archivo (str): Ruta del archivo del índice (se crea si no existe).
+            tam_pagina (int): Bytes por página, potencia de dos >= 512 (solo al crear; al abrir se usa el del archivo).
+            max_entrada (int): Bytes máximos de clave + valor codificados (solo al crear).
+            capacidad_cache (int): Nodos en el buffer pool LRU.
+            sincronizar (bool): Hacer fsync antes y después de escribir cada cabecera.
+            solo_lectura (bool): Abrir un índice existente sin permitir cambios.
+        Raises:
+            ValueError: Si tam_pagina no es válido, no permite t >= 2 o el archivo no tiene cabeceras válidas.
+        """
+        self.archivo = archivo
+        self.capacidad_cache = capacidad_cache
+        self.sincronizar = sincronizar
+        self.solo_lectura = solo_lectura
+        self.cache = OrderedDict() # {página: NodoDisco confirmado}
+        self.aciertos = 0
+        self.fallos = 0
+        self._tx_profundidad = 0
+        self._tx_nodos = {} # {página: NodoDisco} escritos en la transacción en curso
+        self._tx_liberadas = [] # Páginas confirmadas que la transacción deja de usar
+        self._libres = None # Páginas reutilizables; None = se calculan al primer cambio
+
+        existe = os.path.exists(archivo) and os.path.getsize(archivo) > 0
+        if solo_lectura and not existe:
+            raise ValueError(f"'{archivo}' no existe o está vacío")
+        if not existe:
+            if tam_pagina < _TAM_PAGINA_MINIMO or tam_pagina & (tam_pagina - 1):
+                raise ValueError(f"El tamaño de página debe ser una potencia de dos >= {_TAM_PAGINA_MINIMO} (recibido {tam_pagina})")
+            t = ((tam_pagina - _NODO.size - 8) // (max_entrada + 2 * _LARGO.size + 8) + 1) // 2
+            if t < 2:
+                raise ValueError(f"Página de {tam_pagina} bytes insuficiente para entradas de {max_entrada} bytes")
+        self._f = open(archivo, "rb" if solo_lectura else "r+b" if existe else "w+b")
+        if existe:
+            self._leer_cabecera()
+        else:
+            self.tam_pagina = tam_pagina
+            self.t = t
+            self.generacion = 0
+            self.raiz = _PRIMERA_PAGINA_NODO
+            self.paginas = _PRIMERA_PAGINA_NODO + 1
+            self.cantidad = 0
+            self.altura = 1
+            self.nodos = 1
+            self.splits = 0
+            self.merges = 0
+            self._libres = []
+            self._tx_nodos[self.raiz] = NodoDisco(self.raiz, True)
+            self._confirmar()
+        self._confirmado = self._metadatos()
+        self._mapa = None
+        self._mapear()
+
+    # --- Archivo, cabeceras y páginas ---
+
+    def _metadatos(self):
+        return (self.raiz, self.paginas, self.cantidad, self.altura, self.nodos, self.splits, self.merges)
+
+    def _restaurar_metadatos(self, metadatos):
+        (self.raiz, self.paginas, self.cantidad, self.altura, self.nodos, self.splits, self.merges) = metadatos
+
+    def _leer_ranura(self, desplazamiento):
+        """Retorna los campos de la cabecera en `desplazamiento`, o None si no es válida."""
+        self._f.seek(desplazamiento)
+        datos = self._f.read(_CABECERA.size + _CRC.size)
+        if len(datos) < _CABECERA.size + _CRC.size:
+            return None
+        campos = _CABECERA.unpack_from(datos)
+        (crc,) = _CRC.unpack_from(datos, _CABECERA.size)
+        if campos[0] != MAGICO or crc != zlib.crc32(datos[:_CABECERA.size]):
+            return None
+        return campos
+
+    def _leer_cabecera(self):
+        """
+        Carga la cabecera válida de mayor generación de las dos ranuras. La ranura 1 está al
+        comienzo de la página 1; si la ranura 0 está dañada no se conoce el tamaño de página,
+        así que se prueba cada potencia de dos posible (la cabecera debe indicar ese mismo tamaño).
+        """
+        candidatas = []
+        cabecera = self._leer_ranura(0)
+        if cabecera is not None:
+            candidatas.append(cabecera)
+            desplazamientos = [cabecera[2]]
+        else:
+            tamano_archivo = os.path.getsize(self.archivo)
+            desplazamientos = []
+            desplazamiento = _TAM_PAGINA_MINIMO
+            while desplazamiento < tamano_archivo:
+                desplazamientos.append(desplazamiento)
+                desplazamiento *= 2
+        for desplazamiento in desplazamientos:
+            cabecera = self._leer_ranura(desplazamiento)
+            if cabecera is not None and cabecera[2] == desplazamiento:
+                candidatas.append(cabecera)
+                break
+        if not candidatas:
+            raise ValueError(f"'{self.archivo}' no es un índice BTreeDisco válido")
+        (_, self.generacion, self.tam_pagina, self.t, self.raiz, self.paginas, self.cantidad,
+         self.altura, self.nodos, self.splits, self.merges) = max(candidatas, key=lambda c: c[1])
+
+    def _mapear(self):
+        """(Re)crea el mmap de solo lectura, necesario cuando el archivo creció."""
+        if self._mapa is not None:
+            self._mapa.close()
+        self._mapa = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _codificar(self, nodo):
+        partes = [_NODO.pack(nodo.hoja, len(nodo.claves))]
+        for texto in nodo.claves + nodo.valores:
+            datos = texto.encode("utf-8")
+            partes.append(_LARGO.pack(len(datos)))
+            partes.append(datos)
+        if not nodo.hoja:
+            partes.append(struct.pack(f"<{len(nodo.hijos)}Q", *nodo.hijos))
+        pagina = b"".join(partes)
+        if len(pagina) > self.tam_pagina:
+            raise ValueError(f"El nodo de la página {nodo.pagina} no cabe en {self.tam_pagina} bytes")
+        return pagina
+
+    def _decodificar(self, pagina):
+        inicio = pagina * self.tam_pagina
+        if inicio + self.tam_pagina > len(self._mapa):
+            self._mapear()
+        mapa = self._mapa
+        hoja, cantidad = _NODO.unpack_from(mapa, inicio)
+        posicion = inicio + _NODO.size
+        textos = []
+        for _ in range(2 * cantidad):
+            (largo,) = _LARGO.unpack_from(mapa, posicion)
+            posicion += _LARGO.size
+            textos.append(mapa[posicion:posicion + largo].decode("utf-8"))
+            posicion += largo
+        hijos = [] if hoja else list(struct.unpack_from(f"<{cantidad + 1}Q", mapa, posicion))
+        return NodoDisco(pagina, bool(hoja), textos[:cantidad], textos[cantidad:], hijos)
+
+    def _nodo(self, pagina):
+        """Retorna el nodo de una página: el de la transacción en curso o el confirmado (vía caché)."""
+        nodo = self._tx_nodos.get(pagina)
+        if nodo is not None:
+            return nodo
+        nodo = self.cache.get(pagina)
+        if nodo is not None:
+            self.cache.move_to_end(pagina)
+            self.aciertos += 1
+            return nodo
+        self.fallos += 1
+        nodo = self._decodificar(pagina)
+        self._cachear(nodo)
+        return nodo
+
+    def _cachear(self, nodo):
+        self.cache[nodo.pagina] = nodo
+        self.cache.move_to_end(nodo.pagina)
+        if len(self.cache) > self.capacidad_cache:
+            self.cache.popitem(last=False)
+
+    # --- Transacciones (copy-on-write) ---
+
+    @contextmanager
+    def transaccion(self):
+        """
+        Agrupa varias operaciones en una sola confirmación. Si se produce una excepción, la
+        transacción más externa descarta todos los cambios y el árbol vuelve a la última confirmación.
+        Raises:
+            ValueError: Si el índice está abierto en solo lectura.
+        """
+        if self.solo_lectura:
+            raise ValueError(f"El índice '{self.archivo}' está abierto en solo lectura")
+        self._tx_profundidad += 1
+        try:
+            yield self
+        except BaseException:
+            self._tx_profundidad -= 1
+            if self._tx_profundidad == 0:
+                self._deshacer()
+            raise
+        self._tx_profundidad -= 1
+        if self._tx_profundidad == 0:
+            self._confirmar()
+
+    def _asignar(self):
+        """Retorna una página libre (reutilizada o nueva al final del archivo)."""
+        if self._libres is None:
+            self._calcular_libres()
+        if self._libres:
+            return self._libres.pop()
+        self.paginas += 1
+        return self.paginas - 1
+
+    def _calcular_libres(self):
+        """Las páginas libres son las que no se alcanzan desde la raíz confirmada ni usa la transacción."""
+        alcanzables = set()
+        pendientes = [self._confirmado[0]]
+        while pendientes:
+            pagina = pendientes.pop()
+            alcanzables.add(pagina)
+            nodo = self.cache.get(pagina) or self._decodificar(pagina)
+            pendientes.extend(nodo.hijos)
+        self._libres = [p for p in range(self._confirmado[1] - 1, _PRIMERA_PAGINA_NODO - 1, -1)
+                        if p not in alcanzables and p not in self._tx_nodos]
+
+    def _nuevo_nodo(self, hoja):
+        nodo = NodoDisco(self._asignar(), hoja)
+        self._tx_nodos[nodo.pagina] = nodo
+        self.nodos += 1
+        return nodo
+
+    def _mutable(self, pagina):
+        """Retorna una copia modificable del nodo en una página nueva (o el mismo si ya es de la transacción)."""
+        nodo = self._tx_nodos.get(pagina)
+        if nodo is not None:
+            return nodo
+        original = self._nodo(pagina)
+        copia = NodoDisco(self._asignar(), original.hoja, list(original.claves), list(original.valores), list(original.hijos))
+        self._tx_nodos[copia.pagina] = copia
+        self._tx_liberadas.append(pagina)
+        return copia
+
+    def _liberar(self, nodo):
+        """Descarta un nodo que deja de formar parte del árbol."""
+        if self._tx_nodos.pop(nodo.pagina, None) is not None:
+            if self._libres is not None:
+                self._libres.append(nodo.pagina) # Nunca se confirmó: se puede reutilizar ya
+        else:
+            self._tx_liberadas.append(nodo.pagina)
+
+    def _confirmar(self):
+        """Escribe las páginas de la transacción y luego la cabecera nueva en la otra ranura."""
+        if not self._tx_nodos and not self._tx_liberadas and getattr(self, "_confirmado", None) == self._metadatos():
+            return
+        for pagina, nodo in self._tx_nodos.items():
+            self._f.seek(pagina * self.tam_pagina)
+            self._f.write(self._codificar(nodo).ljust(self.tam_pagina, b"\0"))
+        self._f.flush()
+        if self.sincronizar:
+            os.fsync(self._f.fileno())
+
+        self.generacion += 1
+        cabecera = _CABECERA.pack(MAGICO, self.generacion, self.tam_pagina, self.t, self.raiz, self.paginas,
+                                  self.cantidad, self.altura, self.nodos, self.splits, self.merges)
+        self._f.seek((self.generacion % 2) * self.tam_pagina)
+        self._f.write(cabecera + _CRC.pack(zlib.crc32(cabecera)))
+        self._f.flush()
+        if self.sincronizar:
+            os.fsync(self._f.fileno())
+
+        # Las páginas reemplazadas quedan libres recién ahora que la cabecera nueva está escrita
+        for pagina in self._tx_liberadas:
+            self.cache.pop(pagina, None)
+            if self._libres is not None:
+                self._libres.append(pagina)
+        for nodo in self._tx_nodos.values():
+            self._cachear(nodo)
+        self._tx_nodos = {}
+        self._tx_liberadas = []
+        self._confirmado = self._metadatos()
+
+    def _deshacer(self):
+        """Descarta la transacción en curso."""
+        self._restaurar_metadatos(self._confirmado)
+        self._tx_nodos = {}
+        self._tx_liberadas = []
+        self._libres = None
+
+    # --- Operaciones del B-Tree ---
+
+    def tamano(self):
+        """Retorna el número de claves en O(1)."""
+        return self.cantidad
+
+    def __len__(self):
+        return self.cantidad
+
+    def _validar(self, key, value):
+        if not isinstance(key, str) or not isinstance(value, str):
+            raise TypeError("BTreeDisco solo admite claves y valores de tipo str")
+        largo = len(key.encode("utf-8")) + len(value.encode("utf-8"))
+        limite = (self.tam_pagina - _NODO.size - 8) // (2 * self.t - 1) - 2 * _LARGO.size - 8
+        if largo > limite:
+            raise ValueError(f"Clave y valor ocupan {largo} bytes; el máximo es {limite}")
+
+    def insertar(self, key, value):
+        """Inserta una clave-valor en el B-Tree."""
+        self._validar(key, value)
+        maximo = 2 * self.t - 1
+        with self.transaccion():
+            raiz = self._mutable(self.raiz)
+            self.raiz = raiz.pagina
+            nodo = raiz
+            if len(raiz.claves) == maximo: # La raíz está llena, necesita split
+                nodo = self._nuevo_nodo(hoja=False)
+                nodo.hijos.append(raiz.pagina)
+                self.raiz = nodo.pagina
+                self.altura += 1
+                self._split_hijo(nodo, 0, raiz)
+            while not nodo.hoja:
+                i = bisect_right(nodo.claves, key)
+                hijo = self._mutable(nodo.hijos[i])
+                nodo.hijos[i] = hijo.pagina
+                if len(hijo.claves) == maximo: # Hijo está lleno, necesita split
+                    self._split_hijo(nodo, i, hijo)
+                    if key > nodo.claves[i]:
+                        hijo = self._nodo(nodo.hijos[i + 1])
+                nodo = hijo
+            i = bisect_right(nodo.claves, key)
+            nodo.claves.insert(i, key)
+            nodo.valores.insert(i, value)
+            self.cantidad += 1
+
+    def cargar(self, pares):
+        """Inserta muchos pares (clave, valor) en una sola transacción."""
+        with self.transaccion():
+            for key, value in pares:
+                self.insertar(key, value)
+
+    def _split_hijo(self, padre, i, hijo):
+        """Divide un hijo lleno (ya modificable) del nodo padre."""
+        t = self.t
+        self.splits += 1
+        z = self._nuevo_nodo(hijo.hoja)
+        padre.hijos.insert(i + 1, z.pagina)
+        padre.claves.insert(i, hijo.claves[t - 1])
+        padre.valores.insert(i, hijo.valores[t - 1])
+        z.claves = hijo.claves[t:]
+        z.valores = hijo.valores[t:]
+        hijo.claves = hijo.claves[:t - 1]
+        hijo.valores = hijo.valores[:t - 1]
+        if not hijo.hoja:
+            z.hijos = hijo.hijos[t:]
+            hijo.hijos = hijo.hijos[:t]
+
+    def buscar(self, key):
+        """Busca una clave en el B-Tree."""
+        nodo = self._nodo(self.raiz)
+        while True:
+            i = bisect_left(nodo.claves, key)
+            if i < len(nodo.claves) and key == nodo.claves[i]:
+                return nodo.valores[i]
+            if nodo.hoja:
+                return None
+            nodo = self._nodo(nodo.hijos[i])
+
+    def eliminar(self, key):
+        """
+        Elimina una clave del B-Tree (una sola aparición si está repetida), con el mismo
+        rebalanceo en una pasada que BTree.eliminar.
+        Returns:
+            bool: True si la clave existía.
+        """
+        if self.buscar(key) is None:
+            return False
+        t = self.t
+        with self.transaccion():
+            nodo = self._mutable(self.raiz)
+            self.raiz = nodo.pagina
+            while True:
+                i = bisect_left(nodo.claves, key)
+                if i < len(nodo.claves) and key == nodo.claves[i]:
+                    if nodo.hoja:
+                        del nodo.claves[i]
+                        del nodo.valores[i]
+                        break
+                    if len(self._nodo(nodo.hijos[i]).claves) >= t:
+                        # Reemplazar por el predecesor y eliminarlo del hijo izquierdo
+                        hoja = self._nodo(nodo.hijos[i])
+                        while not hoja.hoja:
+                            hoja = self._nodo(hoja.hijos[-1])
+                        key = hoja.claves[-1]
+                        nodo.claves[i], nodo.valores[i] = key, hoja.valores[-1]
+                    elif len(self._nodo(nodo.hijos[i + 1]).claves) >= t:
+                        # Reemplazar por el sucesor y eliminarlo del hijo derecho
+                        hoja = self._nodo(nodo.hijos[i + 1])
+                        while not hoja.hoja:
+                            hoja = self._nodo(hoja.hijos[0])
+                        key = hoja.claves[0]
+                        nodo.claves[i], nodo.valores[i] = key, hoja.valores[0]
+                        i += 1
+                    else:
+                        # Ambos hijos tienen t - 1 claves: fusionarlos con la clave en medio
+                        nodo = self._fusionar_hijos(nodo, i)
+                        continue
+                elif nodo.hoja:
+                    break # No encontrada (no debería ocurrir tras buscar)
+                elif len(self._nodo(nodo.hijos[i]).claves) == t - 1:
+                    i = self._reforzar_hijo(nodo, i)
+                hijo = self._mutable(nodo.hijos[i])
+                nodo.hijos[i] = hijo.pagina
+                nodo = hijo
+            self.cantidad -= 1
+
+            raiz = self._nodo(self.raiz)
+            if not raiz.claves and not raiz.hoja:
+                self._liberar(raiz)
+                self.raiz = raiz.hijos[0]
+                self.nodos -= 1
+                self.altura -= 1
+        return True
+
+    def _reforzar_hijo(self, padre, i):
+        """Igual que BTree._reforzar_hijo, copiando los nodos que modifica. Retorna el índice a descender."""
+        if i > 0 and len(self._nodo(padre.hijos[i - 1]).claves) >= self.t:
+            hijo = self._mutable(padre.hijos[i])
+            hermano = self._mutable(padre.hijos[i - 1])
+            padre.hijos[i], padre.hijos[i - 1] = hijo.pagina, hermano.pagina
+            hijo.claves.insert(0, padre.claves[i - 1])
+            hijo.valores.insert(0, padre.valores[i - 1])
+            padre.claves[i - 1] = hermano.claves.pop()
+            padre.valores[i - 1] = hermano.valores.pop()
+            if not hermano.hoja:
+                hijo.hijos.insert(0, hermano.hijos.pop())
+            return i
+        if i < len(padre.claves) and len(self._nodo(padre.hijos[i + 1]).claves) >= self.t:
+            hijo = self._mutable(padre.hijos[i])
+            hermano = self._mutable(padre.hijos[i + 1])
+            padre.hijos[i], padre.hijos[i + 1] = hijo.pagina, hermano.pagina
+            hijo.claves.append(padre.claves[i])
+            hijo.valores.append(padre.valores[i])
+            padre.claves[i] = hermano.claves.pop(0)
+            padre.valores[i] = hermano.valores.pop(0)
+            if not hermano.hoja:
+                hijo.hijos.append(hermano.hijos.pop(0))
+            return i
+        if i < len(padre.claves):
+            self._fusionar_hijos(padre, i)
+            return i
+        self._fusionar_hijos(padre, i - 1)
+        return i - 1
+
+    def _fusionar_hijos(self, padre, i):
+        """Fusiona padre.hijos[i + 1] y padre.claves[i] dentro de padre.hijos[i]; retorna el nodo fusionado."""
+        izquierdo = self._mutable(padre.hijos[i])
+        padre.hijos[i] = izquierdo.pagina
+        derecho = self._nodo(padre.hijos.pop(i + 1))
+        izquierdo.claves.append(padre.claves.pop(i))
+        izquierdo.valores.append(padre.valores.pop(i))
+        izquierdo.claves.extend(derecho.claves)
+        izquierdo.valores.extend(derecho.valores)
+        izquierdo.hijos.extend(derecho.hijos)
+        self._liberar(derecho)
+        self.nodos -= 1
+        self.merges += 1
+        return izquierdo
+
+    def iterar(self, desde=None, hasta=None):
+        """Generador de (clave, valor) en orden con desde <= clave <= hasta, leyendo solo las páginas necesarias."""
+        pila = []
+        nodo = self._nodo(self.raiz)
+        while True:
+            i = 0 if desde is None else bisect_left(nodo.claves, desde)
+            pila.append((nodo, i))
+            if nodo.hoja:
+                break
+            nodo = self._nodo(nodo.hijos[i])
+
+        while pila:
+            nodo, i = pila.pop()
+            if i >= len(nodo.claves):
+                continue
+            clave = nodo.claves[i]
+            if hasta is not None and clave > hasta:
+                return
+            pila.append((nodo, i + 1))
+            yield clave, nodo.valores[i]
+            if not nodo.hoja:
+                hijo = self._nodo(nodo.hijos[i + 1])
+                pila.append((hijo, 0))
+                while not hijo.hoja:
+                    hijo = self._nodo(hijo.hijos[0])
+                    pila.append((hijo, 0))
+
+    def __iter__(self):
+        return self.iterar()
+
+    def recorrer_en_orden(self):
+        """Recorre el B-Tree en orden y retorna la lista de (clave, valor)."""
+        return list(self.iterar())
+
+    def piso(self, key):
+        """Retorna el par (clave, valor) con la mayor clave <= key, o None."""
+        mejor = None
+        nodo = self._nodo(self.raiz)
+        while True:
+            i = bisect_right(nodo.claves, key)
+            if i > 0:
+                mejor = (nodo.claves[i - 1], nodo.valores[i - 1])
+            if nodo.hoja:
+                return mejor
+            nodo = self._nodo(nodo.hijos[i])
+
+    def techo(self, key):
+        """Retorna el par (clave, valor) con la menor clave >= key, o None."""
+        mejor = None
+        nodo = self._nodo(self.raiz)
+        while True:
+            i = bisect_left(nodo.claves, key)
+            if i < len(nodo.claves):
+                mejor = (nodo.claves[i], nodo.valores[i])
+            if nodo.hoja:
+                return mejor
+            nodo = self._nodo(nodo.hijos[i])
+
+    def obtener_stats(self):
+        """Retorna estadísticas del B-Tree y del archivo paginado."""
+        consultas = self.aciertos + self.fallos
+        return {
+            "orden": self.t,
+            "altura": self.altura,
+            "nodos": self.nodos,
+            "splits": self.splits,
+            "merges": self.merges,
+            "claves": self.cantidad,
+            "archivo": self.archivo,
+            "tam_pagina": self.tam_pagina,
+            "paginas": self.paginas,
+            "generacion": self.generacion,
+            "cache": len(self.cache),
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0
+        }
+
+    def cerrar(self):
+        """Cierra el mmap y el archivo (todas las operaciones ya están confirmadas)."""
+        if not self._f.closed:
+            self._mapa.close()
+            self._f.close()
+
+    def __getstate__(self):
+        return {"archivo": self.archivo, "capacidad_cache": self.capacidad_cache}
+
+    def __setstate__(self, estado):
+        self.__init__(estado["archivo"], capacidad_cache=estado["capacidad_cache"], solo_lectura=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+        return False
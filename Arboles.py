@@ -1,3 +1,55 @@
+from bisect import bisect_left, bisect_right
+from contextlib import nullcontext
+
+# --- Utilidades de direcciones IPv4 ---
+def ip_a_entero(ip_address):
+    """
+    Convierte una dirección IP en notación decimal punteada a un entero de 32 bits.
+    Retorna None si la dirección no es válida.
+    """
+    try:
+        octetos = ip_address.split('.')
+        if len(octetos) != 4:
+            return None
+        valor = 0
+        for octeto in octetos:
+            o = int(octeto)
+            if not 0 <= o <= 255:
+                return None
+            valor = (valor << 8) | o
+        return valor
+    except (ValueError, AttributeError):
+        return None
+
+def entero_a_ip(valor):
+    """Convierte un entero de 32 bits a notación decimal punteada."""
+    return f"{(valor >> 24) & 255}.{(valor >> 16) & 255}.{(valor >> 8) & 255}.{valor & 255}"
+
+def longitud_mascara(mask):
+    """
+    Normaliza una máscara a su longitud CIDR (0-32).
+    Acepta enteros, cadenas numéricas ("24") o máscaras punteadas ("255.255.255.0").
+    Retorna None si la máscara no es válida.
+    """
+    if isinstance(mask, int):
+        return mask if 0 <= mask <= 32 else None
+    mask = str(mask).strip().lstrip('/')
+    if mask.isdigit():
+        longitud = int(mask)
+        return longitud if 0 <= longitud <= 32 else None
+    valor = ip_a_entero(mask)
+    if valor is None:
+        return None
+    longitud = bin(valor).count('1')
+    # Una máscara válida debe tener solo unos seguidos de solo ceros
+    if valor != MASCARAS[longitud]:
+        return None
+    return longitud
+
+# MASCARAS[n] es la máscara de n bits como entero (ej. MASCARAS[24] == 0xFFFFFF00)
+MASCARAS = [(0xFFFFFFFF << (32 - n)) & 0xFFFFFFFF for n in range(33)]
+
+
 # --- Módulo 1: AVL Tree para Tabla de Rutas ---
 class NodoAVL:
     """Representa un nodo en el árbol AVL para la tabla de rutas."""
@@ -6,6 +58,12 @@ class NodoAVL:
         self.mask = mask
         self.next_hop = next_hop
         self.metric = metric
+        # Representación numérica del prefijo para el longest-prefix match
+        self.longitud = longitud_mascara(mask)
+        ip = ip_a_entero(prefix)
+        self.red = ip & MASCARAS[self.longitud] if ip is not None and self.longitud is not None else None
+        # Clave de ordenamiento numérica: (red, longitud de máscara, métrica)
+        self.clave = (self.red, self.longitud, metric)
         self.izquierda = None
         self.derecha = None
         self.altura = 1 # Altura del nodo en el subárbol
@@ -15,17 +73,104 @@ class NodoAVL:
         """Representación en cadena del nodo AVL."""
         return f"[{self.prefix}/{self.mask} via {self.next_hop} metric {self.metric}]"
 
+class IndiceLPM:
+    """
+    Índice de longest-prefix match sobre claves enteras de 32 bits.
+    Mantiene una tabla hash por cada longitud de máscara en uso, de modo que una
+    búsqueda realiza como máximo 33 consultas O(1) sin importar el tamaño de la tabla.
+    """
+    def __init__(self):
+        self.tablas = {} # {longitud: {red: [nodos ordenados por métrica]}}
+        self.longitudes = [] # Longitudes en uso, de la más específica a la menos específica
+
+    def agregar(self, nodo):
+        """Indexa un nodo de ruta. Las rutas con prefijo inválido se ignoran."""
+        if nodo.red is None:
+            return
+        tabla = self.tablas.get(nodo.longitud)
+        if tabla is None:
+            tabla = self.tablas[nodo.longitud] = {}
+            self.longitudes = sorted(self.tablas, reverse=True)
+        rutas = tabla.setdefault(nodo.red, [])
+        # Mantener las rutas del mismo prefijo ordenadas por métrica (la mejor primero)
+        i = len(rutas)
+        while i > 0 and rutas[i - 1].metric > nodo.metric:
+            i -= 1
+        rutas.insert(i, nodo)
+
+    def quitar(self, nodo):
+        """Elimina un nodo de ruta del índice."""
+        tabla = self.tablas.get(nodo.longitud)
+        if tabla is None:
+            return
+        rutas = tabla.get(nodo.red)
+        if not rutas:
+            return
+        for i, existente in enumerate(rutas):
+            if existente is nodo:
+                del rutas[i]
+                break
+        if not rutas:
+            del tabla[nodo.red]
+            if not tabla:
+                del self.tablas[nodo.longitud]
+                self.longitudes = sorted(self.tablas, reverse=True)
+
+    def buscar(self, ip, longitud_maxima=32):
+        """
+        Retorna la ruta más específica y de menor métrica para una IP entera, o None.
+        Con longitud_maxima solo se consideran prefijos de esa longitud o menor.
+        """
+        tablas = self.tablas
+        for longitud in self.longitudes:
+            if longitud > longitud_maxima:
+                continue
+            rutas = tablas[longitud].get(ip & MASCARAS[longitud])
+            if rutas:
+                return rutas[0]
+        return None
+
+    def limpiar(self):
+        """Vacía el índice."""
+        self.tablas = {}
+        self.longitudes = []
+
 class AVLTree:
     """Implementación de un árbol AVL para la tabla de enrutamiento."""
+    MAX_CAMBIOS_PENDIENTES = 16 # Más cambios sin consumir provocan una reconstrucción completa
     def __init__(self):
         self.raiz = None
         self.nodos = 0
+        self.indice_lpm = IndiceLPM() # Índice auxiliar para longest-prefix match
+        # Control de cambios para las tablas derivadas (FIB): la generación aumenta con cada
+        # modificación y cambios_pendientes acumula los prefijos (red, longitud) afectados.
+        # None indica que hubo demasiados cambios y conviene reconstruir todo.
+        self.generacion = 0
+        self.cambios_pendientes = []
         # Contadores para fines didácticos
         self.rotaciones_ll = 0
         self.rotaciones_lr = 0
         self.rotaciones_rl = 0
         self.rotaciones_rr = 0
 
+    def _registrar_cambio(self, red, longitud):
+        """Registra la modificación de un prefijo para que las tablas derivadas se actualicen."""
+        self.generacion += 1
+        if self.cambios_pendientes is not None:
+            if len(self.cambios_pendientes) >= self.MAX_CAMBIOS_PENDIENTES:
+                self.cambios_pendientes = None
+            else:
+                self.cambios_pendientes.append((red, longitud))
+
+    def tomar_cambios(self):
+        """
+        Retorna y vacía los cambios pendientes (lista de (red, longitud), o None si
+        se requiere una reconstrucción completa).
+        """
+        cambios = self.cambios_pendientes
+        self.cambios_pendientes = []
+        return cambios
+
     def _altura(self, nodo):
         """Retorna la altura de un nodo."""
         return nodo.altura if nodo else 0
@@ -83,75 +228,161 @@ class AVLTree:
         return nodo
 
     def insertar(self, prefix, mask, next_hop, metric):
-        """Inserta una nueva ruta en el AVL."""
-        def _insertar(nodo, prefix, mask, next_hop, metric):
+        """
+        Inserta una nueva ruta en el AVL.
+        Las rutas se ordenan numéricamente por (red, longitud de máscara, métrica),
+        con la red como entero de 32 bits, de modo que "9.0.0.0" < "10.0.0.0".
+        Returns:
+            bool: True si se insertó, False si el prefijo/máscara es inválido o la ruta ya existía.
+        """
+        nuevo = NodoAVL(prefix, mask, next_hop, metric)
+        if nuevo.red is None:
+            return False
+        clave = nuevo.clave
+        insertado = False
+
+        def _insertar(nodo):
+            nonlocal insertado
             if not nodo:
                 self.nodos += 1
-                return NodoAVL(prefix, mask, next_hop, metric)
-            
-            # Comparación principal por prefijo, secundaria por métrica
-            # NOTA: La comparación de prefijos IP es más compleja que una simple < o >.
-            # Para una implementación real, se necesitaría una función de comparación de IP/máscara.
-            # Aquí se usa una comparación lexicográfica simple para el esqueleto.
-            if prefix < nodo.prefix:
-                nodo.izquierda = _insertar(nodo.izquierda, prefix, mask, next_hop, metric)
-            elif prefix > nodo.prefix:
-                nodo.derecha = _insertar(nodo.derecha, prefix, mask, next_hop, metric)
-            else: # Prefijos iguales, comparar por métrica
-                if metric < nodo.metric:
-                    nodo.izquierda = _insertar(nodo.izquierda, prefix, mask, next_hop, metric)
-                elif metric > nodo.metric:
-                    nodo.derecha = _insertar(nodo.derecha, prefix, mask, next_hop, metric)
-                else:
-                    # Si prefijo y métrica son iguales, se considera un duplicado o actualización.
-                    # Para este simulador, asumimos que no se insertan duplicados exactos.
-                    return nodo 
+                self.indice_lpm.agregar(nuevo)
+                self._registrar_cambio(nuevo.red, nuevo.longitud)
+                insertado = True
+                return nuevo
+
+            if clave < nodo.clave:
+                nodo.izquierda = _insertar(nodo.izquierda)
+            elif clave > nodo.clave:
+                nodo.derecha = _insertar(nodo.derecha)
+            else:
+                # Si prefijo, máscara y métrica son iguales, se considera un duplicado.
+                # Para este simulador, asumimos que no se insertan duplicados exactos.
+                return nodo
 
             return self._balancear(nodo)
 
-        self.raiz = _insertar(self.raiz, prefix, mask, next_hop, metric)
+        self.raiz = _insertar(self.raiz)
+        return insertado
 
-    def eliminar(self, prefix, mask):
-        """Elimina una ruta del AVL."""
-        def _eliminar(nodo, prefix, mask):
-            if not nodo:
-                return nodo
+    def cargar_masivo(self, rutas):
+        """
+        Carga un lote de rutas (prefix, mask, next_hop, metric) de una sola vez.
+        Las rutas se ordenan una vez, se fusionan linealmente con las existentes y el
+        árbol se reconstruye perfectamente balanceado en O(n), sin rotaciones.
+        Returns:
+            tuple: (int, int) - Rutas cargadas y rutas descartadas (inválidas o duplicadas).
+        """
+        nuevos = []
+        descartadas = 0
+        for prefix, mask, next_hop, metric in rutas:
+            nodo = NodoAVL(prefix, mask, next_hop, metric)
+            if nodo.red is None:
+                descartadas += 1
+            else:
+                nuevos.append(nodo)
+        nuevos.sort(key=lambda nodo: nodo.clave)
 
-            # Buscar el nodo a eliminar
-            if prefix < nodo.prefix:
-                nodo.izquierda = _eliminar(nodo.izquierda, prefix, mask)
-            elif prefix > nodo.prefix:
-                nodo.derecha = _eliminar(nodo.derecha, prefix, mask)
-            else: # Prefijo encontrado
-                if mask != nodo.mask:
-                    # Si el prefijo coincide pero la máscara no, no es el nodo exacto.
-                    # En un sistema real, podría haber múltiples entradas para el mismo prefijo con diferentes máscaras.
-                    return nodo 
-
-                # Nodo con un solo hijo o sin hijos
-                if not nodo.izquierda:
-                    temp = nodo.derecha
-                    self.nodos -= 1
-                    return temp
-                elif not nodo.derecha:
-                    temp = nodo.izquierda
-                    self.nodos -= 1
-                    return temp
-
-                # Nodo con dos hijos: obtener el sucesor inorden (el más pequeño en el subárbol derecho)
-                temp = self._get_min_value_node(nodo.derecha)
-                nodo.prefix = temp.prefix
-                nodo.mask = temp.mask
-                nodo.next_hop = temp.next_hop
-                nodo.metric = temp.metric
-                nodo.derecha = _eliminar(nodo.derecha, temp.prefix, temp.mask) # Eliminar el sucesor inorden
-            
-            if not nodo: # Si el árbol se vació después de la eliminación
-                return nodo
+        # Fusión lineal con las rutas existentes (ya ordenadas); ante claves repetidas se conserva la primera
+        existentes = list(self.recorrer_en_orden())
+        ordenados = []
+        agregar_indice = self.indice_lpm.agregar
+        i = j = 0
+        total_existentes, total_nuevos = len(existentes), len(nuevos)
+        while i < total_existentes or j < total_nuevos:
+            if j == total_nuevos or (i < total_existentes and existentes[i].clave <= nuevos[j].clave):
+                nodo = existentes[i]
+                i += 1
+            else:
+                nodo = nuevos[j]
+                j += 1
+                if ordenados and ordenados[-1].clave == nodo.clave:
+                    descartadas += 1
+                    continue
+                agregar_indice(nodo)
+            ordenados.append(nodo)
 
-            return self._balancear(nodo)
+        def _construir(inicio, fin):
+            if inicio > fin:
+                return None
+            medio = (inicio + fin) // 2
+            nodo = ordenados[medio]
+            izquierda = nodo.izquierda = _construir(inicio, medio - 1)
+            derecha = nodo.derecha = _construir(medio + 1, fin)
+            altura_izq = izquierda.altura if izquierda else 0
+            altura_der = derecha.altura if derecha else 0
+            nodo.altura = 1 + max(altura_izq, altura_der)
+            nodo.balance = altura_izq - altura_der
+            return nodo
+
+        self.raiz = _construir(0, len(ordenados) - 1)
+        self.nodos = len(ordenados)
+        if total_nuevos:
+            self.generacion += 1
+            self.cambios_pendientes = None
+        return self.nodos - len(existentes), descartadas
+
+    def eliminar(self, prefix, mask, metric=None):
+        """
+        Elimina del AVL las rutas de un prefijo/máscara.
+        Si se indica una métrica, solo se elimina la ruta con esa métrica.
+        Returns:
+            int: Número de rutas eliminadas.
+        """
+        longitud = longitud_mascara(mask)
+        ip = ip_a_entero(prefix)
+        if longitud is None or ip is None:
+            return 0
+        red = ip & MASCARAS[longitud]
+
+        if metric is not None:
+            objetivos = [(red, longitud, metric)]
+        else:
+            objetivos = [nodo.clave for nodo in self._rango((red, longitud, float("-inf")), (red, longitud, float("inf")))]
+
+        eliminadas = 0
+        for clave in objetivos:
+            antes = self.nodos
+            self.raiz = self._eliminar_clave(self.raiz, clave)
+            eliminadas += antes - self.nodos
+        return eliminadas
+
+    def _eliminar_clave(self, nodo, clave):
+        """Elimina el nodo con la clave exacta del subárbol y retorna el subárbol rebalanceado."""
+        if not nodo:
+            return nodo
+
+        # Buscar el nodo a eliminar
+        if clave < nodo.clave:
+            nodo.izquierda = self._eliminar_clave(nodo.izquierda, clave)
+        elif clave > nodo.clave:
+            nodo.derecha = self._eliminar_clave(nodo.derecha, clave)
+        else: # Clave encontrada
+            self.nodos -= 1
+            self.indice_lpm.quitar(nodo)
+            self._registrar_cambio(nodo.red, nodo.longitud)
+
+            # Nodo con un solo hijo o sin hijos
+            if not nodo.izquierda:
+                return nodo.derecha
+            elif not nodo.derecha:
+                return nodo.izquierda
+
+            # Nodo con dos hijos: el sucesor inorden (el más pequeño en el subárbol derecho)
+            # ocupa su lugar. Se reenlaza el nodo en vez de copiar sus campos para que
+            # las referencias del índice LPM sigan siendo válidas.
+            sucesor = self._get_min_value_node(nodo.derecha)
+            sucesor.derecha = self._eliminar_minimo(nodo.derecha)
+            sucesor.izquierda = nodo.izquierda
+            nodo = sucesor
+
+        return self._balancear(nodo)
 
-        self.raiz = _eliminar(self.raiz, prefix, mask)
+    def _eliminar_minimo(self, nodo):
+        """Desenlaza el nodo mínimo de un subárbol y retorna el subárbol rebalanceado."""
+        if nodo.izquierda is None:
+            return nodo.derecha
+        nodo.izquierda = self._eliminar_minimo(nodo.izquierda)
+        return self._balancear(nodo)
 
     def _get_min_value_node(self, nodo):
         """Encuentra el nodo con el valor mínimo en un subárbol."""
@@ -161,43 +392,85 @@ class AVLTree:
 
     def buscar(self, dest_ip):
         """
-        Busca la mejor ruta (longest-prefix match simplificado) para una IP de destino.
-        NOTA: Un AVL no es la estructura más eficiente para Longest-Prefix Match (LPM) real.
-        Un Trie (Módulo 3) es mucho más adecuado para LPM.
-        Aquí, la búsqueda es una búsqueda binaria estándar por la clave del nodo.
-        Para simular LPM con AVL, se necesitaría iterar sobre todas las rutas que coinciden
-        y seleccionar la más específica (mayor longitud de máscara) o con mejor métrica.
-        Esta implementación es una búsqueda binaria simple por prefijo.
-        """
-        # Implementación simplificada: busca una ruta que contenga la IP de destino.
-        # Esto no es un LPM real, sino una búsqueda de coincidencia.
-        # Para LPM, se debería recorrer el árbol y encontrar la coincidencia más larga.
-        # Se devuelve el primer nodo que "coincida" (simplificado).
-        
-        # Placeholder para la lógica de búsqueda de ruta.
-        # En un escenario real, se necesitaría una función para comparar si una IP
-        # cae dentro de un prefijo/máscara.
-        
-        # Ejemplo muy simplificado:
-        def _buscar(nodo, ip):
-            if not nodo:
-                return None
-            
-            # Lógica de comparación de IP con prefijo del nodo
-            # Esto es una simplificación. Debería ser una función de utilidad de red.
-            # Por ejemplo, si ip_en_rango(ip, nodo.prefix, nodo.mask):
-            # return nodo
-            
-            # Si no hay coincidencia directa, se podría buscar en subárboles
-            # basándose en la estructura del AVL (prefijo < o >).
-            # Para LPM, se buscaría en ambos lados y se elegiría la mejor coincidencia.
-            
-            # Para este esqueleto, solo se devuelve la raíz si existe.
-            # La implementación real de LPM es compleja.
-            return nodo # Retorna la raíz como un placeholder de "ruta encontrada"
+        Busca la mejor ruta para una IP de destino mediante longest-prefix match:
+        retorna la ruta de máscara más larga que contiene la IP y, entre rutas del
+        mismo prefijo, la de menor métrica. Retorna None si ninguna ruta coincide.
+        La búsqueda se resuelve en el índice LPM (una tabla hash por longitud de
+        máscara), por lo que su costo no depende del tamaño de la tabla ni de la
+        forma del árbol.
+        """
+        ip = ip_a_entero(dest_ip)
+        if ip is None:
+            return None
+        return self.indice_lpm.buscar(ip)
 
-        return _buscar(self.raiz, dest_ip)
+    def _rango(self, desde, hasta):
+        """
+        Generador en orden de los nodos con desde <= clave <= hasta.
+        Solo desciende a los subárboles que pueden contener claves del rango,
+        por lo que cuesta O(log n + k).
+        """
+        pila = []
+        nodo = self.raiz
+        while pila or nodo:
+            if nodo:
+                if nodo.clave < desde:
+                    nodo = nodo.derecha # Todo el subárbol izquierdo queda fuera del rango
+                else:
+                    pila.append(nodo)
+                    nodo = nodo.izquierda
+            else:
+                nodo = pila.pop()
+                if nodo.clave > hasta:
+                    return
+                yield nodo
+                nodo = nodo.derecha
 
+    def recorrer_en_orden(self):
+        """Generador de todas las rutas en orden numérico de prefijo."""
+        return self._rango((float("-inf"),), (float("inf"),))
+
+    def rutas_que_cubren(self, dest_ip):
+        """
+        Retorna las rutas cuyo prefijo contiene la IP de destino, de la menos
+        específica a la más específica (la última es la elegida por LPM si empata en métrica).
+        """
+        ip = ip_a_entero(dest_ip)
+        if ip is None:
+            return []
+        rutas = []
+        for longitud in sorted(self.indice_lpm.longitudes):
+            red = ip & MASCARAS[longitud]
+            rutas.extend(self._rango((red, longitud, float("-inf")), (red, longitud, float("inf"))))
+        return rutas
+
+    def rutas_contenidas(self, prefix, mask):
+        """
+        Retorna las rutas contenidas en la superred prefix/mask (incluida ella misma),
+        en orden numérico. Es un recorrido por rango O(log n + k).
+        """
+        longitud = longitud_mascara(mask)
+        ip = ip_a_entero(prefix)
+        if longitud is None or ip is None:
+            return []
+        inicio = ip & MASCARAS[longitud]
+        fin = inicio | (~MASCARAS[longitud] & 0xFFFFFFFF)
+        return [nodo for nodo in self._rango((inicio, longitud, float("-inf")), (fin, 32, float("inf")))
+                if nodo.longitud >= longitud]
+
+    def reconstruir_indice(self):
+        """Reconstruye el índice LPM a partir de los nodos del árbol (ej. tras cargar desde JSON)."""
+        self.indice_lpm.limpiar()
+        pendientes = [self.raiz] if self.raiz else []
+        while pendientes:
+            nodo = pendientes.pop()
+            self.indice_lpm.agregar(nodo)
+            if nodo.izquierda:
+                pendientes.append(nodo.izquierda)
+            if nodo.derecha:
+                pendientes.append(nodo.derecha)
+        self.generacion += 1
+        self.cambios_pendientes = None
 
     def obtener_stats(self):
         """Retorna estadísticas del árbol AVL."""
@@ -243,20 +516,96 @@ class NodoBTree:
         self.hijos = []  # Lista de nodos hijos
         self.hoja = hoja # True si es un nodo hoja, False si es interno
 
+# Grado mínimo por defecto del B-Tree, elegido con `python Benchmarks.py btree`: con la
+# búsqueda binaria dentro de cada nodo, órdenes mayores reducen la altura sin encarecer
+# la búsqueda; con 200k-500k claves t=64 deja el árbol en altura 3 y a partir de ahí
+# las ganancias son marginales.
+ORDEN_BTREE = 64
+
 class BTree:
     """Implementación de un B-Tree para indexar snapshots de configuración."""
-    def __init__(self, t):
+    def __init__(self, t=ORDEN_BTREE):
         self.raiz = NodoBTree(t, True)
         self.t = t # Grado mínimo
         self.altura = 1
         self.nodos = 1 # Contar la raíz
         self.splits = 0
         self.merges = 0
+        self.cantidad = 0 # Número de claves, mantenido en cada inserción y eliminación
+
+    def tamano(self):
+        """Retorna el número de claves en O(1)."""
+        return self.cantidad
+
+    def __len__(self):
+        return self.cantidad
+
+    def transaccion(self):
+        """Agrupa operaciones; en memoria no hay nada que confirmar (misma interfaz que BTreeDisco)."""
+        return nullcontext(self)
+
+    @classmethod
+    def desde_ordenados(cls, pares, t=ORDEN_BTREE):
+        """
+        Construye un B-Tree de abajo hacia arriba a partir de pares (clave, valor) ya ordenados
+        por clave (puede ser un generador), en O(n) y sin splits. Los nodos se llenan por
+        completo de izquierda a derecha: cuando el nodo de un nivel está lleno, la clave
+        siguiente sube como separadora al nivel de arriba y se abre un nodo nuevo. Al final
+        se completan los nodos del borde derecho con claves de su hermano izquierdo.
+        Raises:
+            ValueError: Si las claves no están en orden no decreciente.
+        """
+        arbol = cls(t)
+        maximo = 2 * t - 1
+        niveles = [arbol.raiz] # Nodo abierto (el de más a la derecha) de cada nivel, desde las hojas
+        anterior = None
+        for clave, valor in pares:
+            if arbol.cantidad and clave < anterior:
+                raise ValueError(f"Claves fuera de orden: {clave!r} después de {anterior!r}")
+            anterior = clave
+            arbol.cantidad += 1
+            hijo_derecho = None
+            nivel = 0
+            while True:
+                nodo = niveles[nivel]
+                if len(nodo.claves) < maximo:
+                    nodo.claves.append(clave)
+                    nodo.valores.append(valor)
+                    if hijo_derecho is not None:
+                        nodo.hijos.append(hijo_derecho)
+                    break
+                # Nodo lleno: la clave sube y este nivel continúa en un nodo nuevo
+                if nivel + 1 == len(niveles): # Nueva raíz sobre el nodo lleno
+                    raiz = NodoBTree(t, hoja=False)
+                    raiz.hijos.append(nodo)
+                    niveles.append(raiz)
+                    arbol.nodos += 1
+                nuevo = NodoBTree(t, hoja=(nivel == 0))
+                if hijo_derecho is not None:
+                    nuevo.hijos.append(hijo_derecho)
+                niveles[nivel] = nuevo
+                arbol.nodos += 1
+                hijo_derecho = nuevo
+                nivel += 1
+
+        arbol.raiz = niveles[-1]
+        arbol.altura = len(niveles)
+        # Completar el borde derecho: cada último hijo con menos de t - 1 claves recibe
+        # claves de su hermano izquierdo (que está lleno) rotándolas a través del padre
+        for padre in reversed(niveles[1:]):
+            hijo, hermano = padre.hijos[-1], padre.hijos[-2]
+            while len(hijo.claves) < t - 1:
+                hijo.claves.insert(0, padre.claves[-1])
+                hijo.valores.insert(0, padre.valores[-1])
+                padre.claves[-1] = hermano.claves.pop()
+                padre.valores[-1] = hermano.valores.pop()
+                if not hermano.hoja:
+                    hijo.hijos.insert(0, hermano.hijos.pop())
+        return arbol
 
     def insertar(self, key, value):
         """Inserta una clave-valor en el B-Tree."""
-        # Lógica de inserción en B-Tree, incluyendo splits.
-        # Esta es una implementación compleja y se deja como un placeholder.
+        self.cantidad += 1
         # Si la raíz se divide, la altura del árbol aumenta.
         r = self.raiz
         if len(r.claves) == (2 * self.t) - 1: # La raíz está llena, necesita split
@@ -271,26 +620,17 @@ class BTree:
             self._insertar_no_lleno(r, key, value)
 
     def _insertar_no_lleno(self, nodo, key, value):
-        """Inserta en un nodo que no está lleno."""
-        i = len(nodo.claves) - 1
-        if nodo.hoja:
-            nodo.claves.append(None) # Espacio para la nueva clave
-            nodo.valores.append(None) # Espacio para el nuevo valor
-            while i >= 0 and key < nodo.claves[i]:
-                nodo.claves[i + 1] = nodo.claves[i]
-                nodo.valores[i + 1] = nodo.valores[i]
-                i -= 1
-            nodo.claves[i + 1] = key
-            nodo.valores[i + 1] = value
-        else:
-            while i >= 0 and key < nodo.claves[i]:
-                i -= 1
-            i += 1
+        """Inserta en un nodo que no está lleno (las claves iguales quedan a la derecha de las existentes)."""
+        while not nodo.hoja:
+            i = bisect_right(nodo.claves, key)
             if len(nodo.hijos[i].claves) == (2 * self.t) - 1: # Hijo está lleno, necesita split
                 self._split_hijo(nodo, i, nodo.hijos[i])
                 if key > nodo.claves[i]:
                     i += 1
-            self._insertar_no_lleno(nodo.hijos[i], key, value)
+            nodo = nodo.hijos[i]
+        i = bisect_right(nodo.claves, key)
+        nodo.claves.insert(i, key)
+        nodo.valores.insert(i, value)
 
     def _split_hijo(self, padre, i, hijo):
         """Divide un hijo lleno del nodo padre."""
@@ -312,35 +652,178 @@ class BTree:
 
     def buscar(self, key):
         """Busca una clave en el B-Tree."""
-        def _buscar(nodo, key):
-            i = 0
-            while i < len(nodo.claves) and key > nodo.claves[i]:
-                i += 1
+        nodo = self.raiz
+        while True:
+            i = bisect_left(nodo.claves, key)
             if i < len(nodo.claves) and key == nodo.claves[i]:
                 return nodo.valores[i] # Clave encontrada
             if nodo.hoja:
                 return None # No encontrado en nodo hoja
-            return _buscar(nodo.hijos[i], key)
-        
-        return _buscar(self.raiz, key)
+            nodo = nodo.hijos[i]
 
     def eliminar(self, key):
-        """Elimina una clave del B-Tree."""
-        # Lógica de eliminación en B-Tree, incluyendo merges.
-        # Esta es una implementación compleja y se deja como un placeholder.
-        pass
+        """
+        Elimina una clave del B-Tree (una sola aparición si está repetida).
+        Desciende en una sola pasada garantizando que cada nodo visitado tenga al menos t
+        claves, tomando prestada una clave de un hermano o fusionando con él cuando hace falta;
+        si la raíz queda vacía, su único hijo pasa a ser la raíz y la altura disminuye.
+        Returns:
+            bool: True si la clave existía.
+        """
+        eliminado = self._eliminar(self.raiz, key)
+        if eliminado:
+            self.cantidad -= 1
+        if not self.raiz.claves and not self.raiz.hoja:
+            self.raiz = self.raiz.hijos[0]
+            self.nodos -= 1
+            self.altura -= 1
+        return eliminado
+
+    def _eliminar(self, nodo, key):
+        """Elimina key del subárbol de nodo, que tiene al menos t claves (o es la raíz)."""
+        t = self.t
+        while True:
+            i = bisect_left(nodo.claves, key)
+            if i < len(nodo.claves) and key == nodo.claves[i]:
+                if nodo.hoja:
+                    del nodo.claves[i]
+                    del nodo.valores[i]
+                    return True
+                izquierdo, derecho = nodo.hijos[i], nodo.hijos[i + 1]
+                if len(izquierdo.claves) >= t:
+                    # Reemplazar por el predecesor y eliminarlo del hijo izquierdo
+                    hoja = izquierdo
+                    while not hoja.hoja:
+                        hoja = hoja.hijos[-1]
+                    key = hoja.claves[-1]
+                    nodo.claves[i], nodo.valores[i] = key, hoja.valores[-1]
+                    nodo = izquierdo
+                elif len(derecho.claves) >= t:
+                    # Reemplazar por el sucesor y eliminarlo del hijo derecho
+                    hoja = derecho
+                    while not hoja.hoja:
+                        hoja = hoja.hijos[0]
+                    key = hoja.claves[0]
+                    nodo.claves[i], nodo.valores[i] = key, hoja.valores[0]
+                    nodo = derecho
+                else:
+                    # Ambos hijos tienen t - 1 claves: fusionarlos con la clave en medio
+                    self._fusionar_hijos(nodo, i)
+                    nodo = izquierdo
+                continue
+
+            if nodo.hoja:
+                return False # No encontrado
+            if len(nodo.hijos[i].claves) == t - 1:
+                i = self._reforzar_hijo(nodo, i)
+            nodo = nodo.hijos[i]
+
+    def _reforzar_hijo(self, padre, i):
+        """
+        Asegura que padre.hijos[i] tenga al menos t claves antes de descender a él,
+        rotando una clave desde un hermano con claves de sobra o fusionándolo con un hermano.
+        Returns:
+            int: Índice del hijo al que hay que descender (cambia si se fusionó con el izquierdo).
+        """
+        hijo = padre.hijos[i]
+        if i > 0 and len(padre.hijos[i - 1].claves) >= self.t:
+            hermano = padre.hijos[i - 1]
+            hijo.claves.insert(0, padre.claves[i - 1])
+            hijo.valores.insert(0, padre.valores[i - 1])
+            padre.claves[i - 1] = hermano.claves.pop()
+            padre.valores[i - 1] = hermano.valores.pop()
+            if not hermano.hoja:
+                hijo.hijos.insert(0, hermano.hijos.pop())
+            return i
+        if i < len(padre.claves) and len(padre.hijos[i + 1].claves) >= self.t:
+            hermano = padre.hijos[i + 1]
+            hijo.claves.append(padre.claves[i])
+            hijo.valores.append(padre.valores[i])
+            padre.claves[i] = hermano.claves.pop(0)
+            padre.valores[i] = hermano.valores.pop(0)
+            if not hermano.hoja:
+                hijo.hijos.append(hermano.hijos.pop(0))
+            return i
+        if i < len(padre.claves):
+            self._fusionar_hijos(padre, i)
+            return i
+        self._fusionar_hijos(padre, i - 1)
+        return i - 1
+
+    def _fusionar_hijos(self, padre, i):
+        """Fusiona padre.hijos[i + 1] y la clave padre.claves[i] dentro de padre.hijos[i]."""
+        izquierdo = padre.hijos[i]
+        derecho = padre.hijos.pop(i + 1)
+        izquierdo.claves.append(padre.claves.pop(i))
+        izquierdo.valores.append(padre.valores.pop(i))
+        izquierdo.claves.extend(derecho.claves)
+        izquierdo.valores.extend(derecho.valores)
+        izquierdo.hijos.extend(derecho.hijos)
+        self.nodos -= 1
+        self.merges += 1
+
+    def iterar(self, desde=None, hasta=None):
+        """
+        Generador que recorre en orden los pares (clave, valor) con desde <= clave <= hasta
+        (sin límite si son None). Desciende una sola vez hasta la primera clave del rango y
+        luego avanza con una pila de (nodo, índice), así que cuesta O(log n + k) para k claves
+        y no materializa el árbol. El árbol no debe modificarse mientras se itera.
+        """
+        pila = [] # (nodo, índice de la próxima clave a entregar de ese nodo)
+        nodo = self.raiz
+        while True:
+            i = 0 if desde is None else bisect_left(nodo.claves, desde)
+            pila.append((nodo, i))
+            if nodo.hoja:
+                break
+            nodo = nodo.hijos[i]
+
+        while pila:
+            nodo, i = pila.pop()
+            if i >= len(nodo.claves):
+                continue
+            clave = nodo.claves[i]
+            if hasta is not None and clave > hasta:
+                return
+            pila.append((nodo, i + 1))
+            yield clave, nodo.valores[i]
+            if not nodo.hoja: # Bajar al extremo izquierdo del subárbol siguiente
+                hijo = nodo.hijos[i + 1]
+                pila.append((hijo, 0))
+                while not hijo.hoja:
+                    hijo = hijo.hijos[0]
+                    pila.append((hijo, 0))
+
+    def __iter__(self):
+        return self.iterar()
 
     def recorrer_en_orden(self):
-        """Generador para recorrer el B-Tree en orden (claves y valores)."""
-        def _recorrer(nodo):
-            for i, clave in enumerate(nodo.claves):
-                if not nodo.hoja:
-                    yield from _recorrer(nodo.hijos[i])
-                yield (clave, nodo.valores[i])
-            if not nodo.hoja:
-                yield from _recorrer(nodo.hijos[len(nodo.claves)])
-        
-        return list(_recorrer(self.raiz))
+        """Recorre el B-Tree en orden y retorna la lista de (clave, valor)."""
+        return list(self.iterar())
+
+    def piso(self, key):
+        """Retorna el par (clave, valor) con la mayor clave <= key, o None."""
+        mejor = None
+        nodo = self.raiz
+        while True:
+            i = bisect_right(nodo.claves, key)
+            if i > 0:
+                mejor = (nodo.claves[i - 1], nodo.valores[i - 1]) # En hijos[i] solo puede haber una mayor
+            if nodo.hoja:
+                return mejor
+            nodo = nodo.hijos[i]
+
+    def techo(self, key):
+        """Retorna el par (clave, valor) con la menor clave >= key, o None."""
+        mejor = None
+        nodo = self.raiz
+        while True:
+            i = bisect_left(nodo.claves, key)
+            if i < len(nodo.claves):
+                mejor = (nodo.claves[i], nodo.valores[i]) # En hijos[i] solo puede haber una menor
+            if nodo.hoja:
+                return mejor
+            nodo = nodo.hijos[i]
 
     def obtener_stats(self):
         """Retorna estadísticas del B-Tree."""
@@ -349,7 +832,8 @@ class BTree:
             "altura": self.altura,
             "nodos": self.nodos,
             "splits": self.splits,
-            "merges": self.merges
+            "merges": self.merges,
+            "claves": self.cantidad
         }
 
 
@@ -470,4 +954,197 @@ class Trie:
                 print(new_indent, end="")
                 _print_trie(node.hijos[bit], child_prefix_bits, next_indent)
         
-        _print_trie(self.raiz)
\ No newline at end of file
+        _print_trie(self.raiz)
+
+class NodoTrieComprimido:
+    """
+    Nodo de un trie binario con compresión de caminos (Patricia).
+    Cada nodo guarda el prefijo completo que representa, de modo que las cadenas
+    de nodos con un solo hijo se colapsan en una única arista.
+    """
+    __slots__ = ("red", "longitud", "hijos", "es_fin_prefijo", "politicas")
+
+    def __init__(self, red, longitud):
+        self.red = red # Prefijo como entero de 32 bits (bits fuera de la máscara en cero)
+        self.longitud = longitud # Longitud del prefijo en bits
+        self.hijos = [None, None] # Hijo por el bit siguiente al prefijo ('0' o '1')
+        self.es_fin_prefijo = False
+        self.politicas = None # Diccionario de políticas si es fin de prefijo
+
+class TrieComprimido:
+    """
+    Trie de prefijos IP con compresión de caminos (Patricia) para políticas jerárquicas.
+    Ofrece la misma interfaz que Trie, pero almacena como máximo 2n-1 nodos para n
+    prefijos (un /24 cuesta uno o dos nodos en vez de 24) y una consulta solo visita
+    los nodos que corresponden a prefijos o bifurcaciones reales.
+    Con 10k políticas aleatorias (Benchmarks.py politicas) usa unas 5,3 veces menos nodos
+    y 7 veces menos memoria que Trie, no 10: la cota de 2n-1 nodos deja unos dos nodos por
+    prefijo frente a los ~10 del trie de un bit por nodo, y los diccionarios de políticas,
+    que ambas variantes guardan, son buena parte de la memoria restante.
+    """
+    def __init__(self):
+        self.raiz = NodoTrieComprimido(0, 0)
+        self.nodos = 1
+        self.prefijos = 0
+        self.generacion = 0 # Aumenta con cada modificación (para invalidar cachés)
+
+    @staticmethod
+    def _bit(valor, posicion):
+        """Retorna el bit en la posición indicada (0 = bit más significativo)."""
+        return (valor >> (31 - posicion)) & 1
+
+    def _normalizar(self, prefix_ip, mask_length):
+        """Convierte prefijo y máscara a (red, longitud) enteros, o None si son inválidos."""
+        ip = ip_a_entero(prefix_ip)
+        longitud = longitud_mascara(mask_length)
+        if ip is None or longitud is None:
+            return None
+        return ip & MASCARAS[longitud], longitud
+
+    def insertar_prefijo(self, prefix_ip, mask_length, politicas=None):
+        """Inserta un prefijo IP en el Trie y asocia políticas."""
+        normalizado = self._normalizar(prefix_ip, mask_length)
+        if normalizado is None:
+            return False # IP o máscara inválida
+        red, longitud = normalizado
+
+        nodo = self.raiz
+        while True:
+            if nodo.longitud == longitud:
+                break # El nodo representa exactamente el prefijo
+            bit = self._bit(red, nodo.longitud)
+            hijo = nodo.hijos[bit]
+            if hijo is None:
+                hijo = nodo.hijos[bit] = NodoTrieComprimido(red, longitud)
+                self.nodos += 1
+                nodo = hijo
+                break
+
+            # Longitud del prefijo común entre el nuevo prefijo y la arista hacia el hijo
+            diferencia = (red ^ hijo.red) & 0xFFFFFFFF
+            comun = min(longitud, hijo.longitud, 32 - diferencia.bit_length())
+            if comun == hijo.longitud:
+                nodo = hijo
+                continue
+
+            # Dividir la arista: nodo intermedio en el punto de bifurcación
+            intermedio = NodoTrieComprimido(red & MASCARAS[comun], comun)
+            intermedio.hijos[self._bit(hijo.red, comun)] = hijo
+            nodo.hijos[bit] = intermedio
+            self.nodos += 1
+            if comun == longitud:
+                nodo = intermedio
+            else:
+                nodo = intermedio.hijos[self._bit(red, comun)] = NodoTrieComprimido(red, longitud)
+                self.nodos += 1
+            break
+
+        if not nodo.es_fin_prefijo:
+            nodo.es_fin_prefijo = True
+            nodo.politicas = {}
+            self.prefijos += 1
+        if politicas:
+            nodo.politicas.update(politicas)
+        self.generacion += 1
+        return True
+
+    def obtener_politica(self, dest_ip):
+        """
+        Realiza un longest-prefix match para obtener la política más específica
+        para una IP de destino, aplicando herencia.
+        """
+        ip = ip_a_entero(dest_ip)
+        if ip is None:
+            return {} # IP inválida
+
+        longest_match_politicas = {}
+        nodo = self.raiz
+        while nodo is not None and (ip & MASCARAS[nodo.longitud]) == nodo.red:
+            if nodo.es_fin_prefijo:
+                # Heredar políticas: las políticas del prefijo más largo sobrescriben las anteriores
+                longest_match_politicas.update(nodo.politicas)
+            if nodo.longitud == 32:
+                break
+            nodo = nodo.hijos[(ip >> (31 - nodo.longitud)) & 1]
+        return longest_match_politicas
+
+    def eliminar_prefijo(self, prefix_ip, mask_length):
+        """
+        Elimina un prefijo del Trie y sus políticas.
+        Los nodos que dejan de ser necesarios se eliminan o se fusionan con su único hijo.
+        """
+        normalizado = self._normalizar(prefix_ip, mask_length)
+        if normalizado is None:
+            return False
+        red, longitud = normalizado
+
+        padre = None
+        nodo = self.raiz
+        while nodo is not None and nodo.longitud < longitud:
+            padre = nodo
+            nodo = nodo.hijos[self._bit(red, nodo.longitud)]
+        if nodo is None or nodo.longitud != longitud or nodo.red != red or not nodo.es_fin_prefijo:
+            return False # El prefijo no existe
+
+        nodo.es_fin_prefijo = False
+        nodo.politicas = None
+        self.prefijos -= 1
+        self.generacion += 1
+        if padre is None:
+            return True # La raíz nunca se elimina
+
+        # Compactar: un nodo sin prefijo con menos de dos hijos sobra
+        hijos = [h for h in nodo.hijos if h is not None]
+        if len(hijos) < 2:
+            padre.hijos[self._bit(red, padre.longitud)] = hijos[0] if hijos else None
+            self.nodos -= 1
+            # El padre puede haber quedado como bifurcación inútil
+            if padre is not self.raiz and not padre.es_fin_prefijo and not hijos:
+                self._compactar(padre)
+        return True
+
+    def _compactar(self, nodo):
+        """Fusiona un nodo intermedio sin prefijo y con un solo hijo con su padre."""
+        padre = self.raiz
+        while True:
+            siguiente = padre.hijos[self._bit(nodo.red, padre.longitud)]
+            if siguiente is nodo:
+                break
+            padre = siguiente
+        restantes = [h for h in nodo.hijos if h is not None]
+        padre.hijos[self._bit(nodo.red, padre.longitud)] = restantes[0] if restantes else None
+        self.nodos -= 1
+
+    def recorrer_prefijos(self):
+        """Generador de (prefijo, longitud, politicas) para cada prefijo almacenado, en orden."""
+        pila = [self.raiz]
+        while pila:
+            nodo = pila.pop()
+            if nodo.es_fin_prefijo:
+                yield entero_a_ip(nodo.red), nodo.longitud, nodo.politicas
+            for hijo in (nodo.hijos[1], nodo.hijos[0]):
+                if hijo is not None:
+                    pila.append(hijo)
+
+    def obtener_stats(self):
+        """Retorna estadísticas del Trie."""
+        return {"nodos": self.nodos, "prefijos": self.prefijos}
+
+    def imprimir_arbol_ascii(self):
+        """Imprime el Trie en formato ASCII."""
+        def _print_trie(nodo, indent=""):
+            etiqueta = f"[{entero_a_ip(nodo.red)}/{nodo.longitud}]"
+            if nodo.es_fin_prefijo:
+                print(f"{etiqueta} {{politicas: {nodo.politicas}}}")
+            else:
+                print(etiqueta)
+            hijos = [h for h in nodo.hijos if h is not None]
+            for i, hijo in enumerate(hijos):
+                if i == len(hijos) - 1: # Último hijo
+                    print(indent + "└── ", end="")
+                    _print_trie(hijo, indent + "    ")
+                else:
+                    print(indent + "├── ", end="")
+                    _print_trie(hijo, indent + "|   ")
+
+        _print_trie(self.raiz)
@@ -0,0 +1,719 @@
+# Benchmarks.py
+"""
+Benchmarks de rendimiento de las estructuras de datos del simulador.
+Uso:
+    python Benchmarks.py suite [--tamanos 1000,10000] [--filtro avl] [--repeticiones 3]
+                               [--json resultados.json] [--baseline base.json] [--tolerancia 0.1]
+    python Benchmarks.py lpm [tamaños...]
+    python Benchmarks.py politicas [tamaños...]
+    python Benchmarks.py lista [tamaños...]
+    python Benchmarks.py btree [claves] [órdenes...]
+    python Benchmarks.py envio [paquetes]
+    python Benchmarks.py asincrono [bordes]
+    python Benchmarks.py paralelo [procesos_max]
+    python Benchmarks.py escala [--routers 100] [--switches 200] [--hosts 2000] [--rutas 1000]
+                                [--politicas 100] [--factores 1,2,4] [--json f] [--baseline f]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from Arboles import AVLTree, BTree, Trie, TrieComprimido, ip_a_entero, MASCARAS
+from Almacenamiento import BTreeDisco
+from Reenvio import FIB
+from Estructuras import Cola, ListaEnlazada
+from Topologias import generar_rutas, generar_destinos, topologia_estrella, medir_escala, memoria_objetos
+from Red import Red, np
+from Eventos import SumideroNulo, SumideroConsola, SumideroMemoria, SumideroJSONL
+from Simulacion import RedAsincrona, SimulacionParalela
+from CLI import CLI
+from Persistencia import guardar_configuracion, cargar_configuracion
+
+def _lpm_por_recorrido(avl, dest_ip):
+    """
+    LPM sobre el AVL sin índice: recorre todo el árbol buscando la ruta más
+    específica. Es la única forma correcta de hacer LPM con el AVL ordenado por
+    prefijo, y sirve de línea base para comparar con el índice LPM.
+    """
+    ip = ip_a_entero(dest_ip)
+    mejor = None
+    pendientes = [avl.raiz] if avl.raiz else []
+    while pendientes:
+        nodo = pendientes.pop()
+        if nodo.red is not None and ip & MASCARAS[nodo.longitud] == nodo.red:
+            if (mejor is None or nodo.longitud > mejor.longitud
+                    or (nodo.longitud == mejor.longitud and nodo.metric < mejor.metric)):
+                mejor = nodo
+        if nodo.izquierda:
+            pendientes.append(nodo.izquierda)
+        if nodo.derecha:
+            pendientes.append(nodo.derecha)
+    return mejor
+
+def _medir(funcion, destinos, tiempo_max=2.0):
+    """Ejecuta funcion sobre los destinos hasta agotarlos o superar tiempo_max; retorna ops/seg."""
+    inicio = time.perf_counter()
+    hechas = 0
+    for ip in destinos:
+        funcion(ip)
+        hechas += 1
+        if hechas % 64 == 0 and time.perf_counter() - inicio > tiempo_max:
+            break
+    transcurrido = time.perf_counter() - inicio
+    return hechas / transcurrido if transcurrido > 0 else float("inf")
+
+def bench_lpm(tamanos=(1000, 100000, 1000000), consultas=100000):
+    """
+    Compara búsquedas por segundo del índice LPM (AVLTree.buscar) y de la FIB
+    compilada contra el recorrido completo del AVL para distintos tamaños de tabla.
+    """
+    resultados = []
+    print(f"{'rutas':>10} {'carga (s)':>10} {'LPM índice (ops/s)':>20} {'FIB (ops/s)':>14} {'AVL recorrido (ops/s)':>22}")
+    for tamano in tamanos:
+        rutas = generar_rutas(tamano)
+        avl = AVLTree()
+        inicio = time.perf_counter()
+        for ruta in rutas:
+            avl.insertar(*ruta)
+        carga = time.perf_counter() - inicio
+        destinos = generar_destinos(rutas, consultas)
+
+        # Verificación cruzada de resultados sobre una muestra
+        for ip in destinos[:50]:
+            a, b = avl.buscar(ip), _lpm_por_recorrido(avl, ip)
+            assert (a is None and b is None) or (a.longitud, a.metric) == (b.longitud, b.metric), ip
+
+        indice = _medir(avl.buscar, destinos)
+        fib = FIB(avl)
+        fib.sincronizar()
+        compilada = _medir(fib.buscar, destinos)
+        recorrido = _medir(lambda ip: _lpm_por_recorrido(avl, ip), destinos)
+        resultados.append({"rutas": tamano, "carga_s": carga, "lpm_ops": indice, "fib_ops": compilada,
+                           "recorrido_ops": recorrido})
+        print(f"{tamano:>10} {carga:>10.2f} {indice:>20,.0f} {compilada:>14,.0f} {recorrido:>22,.1f}")
+    return resultados
+
+def _contar_nodos_trie(trie):
+    """Cuenta los nodos del Trie de un bit por nivel."""
+    total = 0
+    pendientes = [trie.raiz]
+    while pendientes:
+        nodo = pendientes.pop()
+        total += 1
+        pendientes.extend(nodo.hijos.values())
+    return total
+
+def bench_politicas(tamanos=(1000, 10000, 50000), consultas=50000):
+    """
+    Compara el Trie de un bit por nodo contra el TrieComprimido (Patricia):
+    número de nodos, memoria usada (tracemalloc) y consultas obtener_politica por segundo.
+    """
+    resultados = []
+    print(f"{'políticas':>10} {'variante':>16} {'nodos':>10} {'memoria (KiB)':>14} {'consultas/s':>14}")
+    for tamano in tamanos:
+        rutas = generar_rutas(tamano)
+        destinos = generar_destinos(rutas, consultas)
+        for clase in (Trie, TrieComprimido):
+            tracemalloc.start()
+            trie = clase()
+            for prefix, mask, _, metric in rutas:
+                trie.insertar_prefijo(prefix, int(mask), {"ttl-min": metric} if metric % 2 else {"block": True})
+            memoria, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            nodos = trie.nodos if isinstance(trie, TrieComprimido) else _contar_nodos_trie(trie)
+            ops = _medir(trie.obtener_politica, destinos)
+            resultados.append({"politicas": tamano, "variante": clase.__name__, "nodos": nodos,
+                               "memoria_bytes": memoria, "consultas_ops": ops})
+            print(f"{tamano:>10} {clase.__name__:>16} {nodos:>10} {memoria / 1024:>14,.0f} {ops:>14,.0f}")
+    return resultados
+
+def bench_lista(tamanos=(10000, 100000, 1000000), consultas=100000):
+    """
+    Mide la ListaEnlazada: construcción con agregar, con extender y en modo indexable
+    (skip list), y accesos obtener_por_indice por segundo en el modo básico (recorrido
+    lineal) y en el indexable.
+    """
+    resultados = []
+    print(f"{'elementos':>10} {'agregar (s)':>12} {'extender (s)':>13} {'indexable (s)':>14} {'índice lineal (ops/s)':>22} {'índice skip (ops/s)':>20}")
+    for tamano in tamanos:
+        rng = random.Random(5)
+        indices = [rng.randrange(tamano) for _ in range(consultas)]
+
+        lista = ListaEnlazada()
+        agregar = _cronometrar(_en_bucle, lista.agregar, range(tamano))
+        extender = _cronometrar(ListaEnlazada().extender, range(tamano))
+        indexable = ListaEnlazada(indexable=True)
+        construccion = _cronometrar(indexable.extender, range(tamano))
+
+        for i in indices[:50]:
+            assert lista.obtener_por_indice(i) == indexable.obtener_por_indice(i) == i, i
+        lineal = _medir(lista.obtener_por_indice, indices)
+        skip = _medir(indexable.obtener_por_indice, indices)
+        resultados.append({"elementos": tamano, "agregar_s": agregar, "extender_s": extender,
+                           "indexable_s": construccion, "lineal_ops": lineal, "skip_ops": skip})
+        print(f"{tamano:>10} {agregar:>12.2f} {extender:>13.2f} {construccion:>14.2f} {lineal:>22,.1f} {skip:>20,.0f}")
+    return resultados
+
+def bench_btree(tamano=200000, ordenes=(2, 4, 8, 16, 32, 64, 128, 256), consultas=50000):
+    """
+    Compara órdenes (grado mínimo t) del B-Tree de snapshots: inserciones en orden aleatorio,
+    búsquedas y recorridos de rango por segundo, carga masiva con desde_ordenados y altura.
+    Sirve para elegir ORDEN_BTREE.
+    """
+    claves = _claves_snapshots(tamano)
+    ordenadas = sorted(claves)
+    rng = random.Random(9)
+    buscadas = [clave for clave, _ in rng.sample(claves, min(consultas, tamano))]
+    rangos = [(f"snap_{i:08d}", f"snap_{i + 10:08d}") for i in (rng.randrange(tamano) for _ in range(5000))]
+    resultados = []
+    print(f"{'t':>5} {'altura':>7} {'insertar (ops/s)':>17} {'buscar (ops/s)':>15} {'rango (ops/s)':>14} {'carga masiva (claves/s)':>24}")
+    for t in ordenes:
+        btree = BTree(t)
+        insertar = tamano / _cronometrar(_en_bucle, btree.insertar, claves)
+        buscar = _medir(btree.buscar, buscadas)
+        rango = len(rangos) / _cronometrar(lambda: [sum(1 for _ in btree.iterar(a, b)) for a, b in rangos])
+        carga = tamano / _cronometrar(BTree.desde_ordenados, ordenadas, t)
+        resultados.append({"t": t, "altura": btree.altura, "insertar_ops": insertar, "buscar_ops": buscar,
+                           "rango_ops": rango, "carga_ops": carga})
+        print(f"{t:>5} {btree.altura:>7} {insertar:>17,.0f} {buscar:>15,.0f} {rango:>14,.0f} {carga:>24,.0f}")
+    return resultados
+
+def bench_envio(paquetes=50000, rutas=10000):
+    """
+    Mide paquetes por segundo de Red.enviar_paquete con cada sumidero de eventos.
+    La salida de consola se redirige a un buffer para no medir la terminal.
+    """
+    red = Red()
+    red.agregar_dispositivo("router", "R1")
+    router = red.obtener_dispositivo("R1")
+    tabla = generar_rutas(rutas)
+    router.tabla_rutas_avl.cargar_masivo(tabla)
+    destinos = generar_destinos(tabla, paquetes)
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as directorio:
+        sumideros = [("nulo", SumideroNulo()), ("memoria", SumideroMemoria()),
+                     ("jsonl", SumideroJSONL(os.path.join(directorio, "eventos.jsonl"))),
+                     ("consola", SumideroConsola())]
+        print(f"{'sumidero':>10} {'paquetes/s':>14}")
+        for nombre, sumidero in sumideros:
+            red.establecer_sumidero(sumidero)
+            with contextlib.redirect_stdout(io.StringIO()):
+                ops = _medir(lambda ip: red.enviar_paquete("R1", ip, "x"), destinos)
+            resultados.append({"sumidero": nombre, "paquetes_ops": ops})
+            print(f"{nombre:>10} {ops:>14,.0f}")
+        red.establecer_sumidero(SumideroNulo())
+    return resultados
+
+def bench_asincrono(bordes=200, hosts_por_borde=8, concurrencias=(1, 10, 100, 1000), paquetes=20000, semilla=5):
+    """
+    Mide paquetes por segundo de RedAsincrona con distintos números de flujos concurrentes
+    entre hosts al azar (host -> borde -> núcleo -> borde -> host), sobre una topología de
+    bordes * (hosts_por_borde + 2) + 1 dispositivos, cada uno atendido por su propia tarea.
+    """
+    red = Red()
+    red.establecer_sumidero(SumideroNulo())
+    hosts = topologia_estrella(red, bordes, hosts_por_borde)
+    rng = random.Random(semilla)
+    print(f"dispositivos: {len(red.dispositivos)}")
+    print(f"{'flujos':>8} {'paquetes/s':>14} {'entregados':>12}")
+
+    async def medir(flujos):
+        async with RedAsincrona(red) as runtime:
+            por_flujo = max(paquetes // flujos, 1)
+            pares = [(rng.choice(hosts)[0], rng.choice(hosts)[1]) for _ in range(flujos)]
+            inicio = time.perf_counter()
+            resultados = await asyncio.gather(*(runtime.flujo(origen, destino, por_flujo) for origen, destino in pares))
+            transcurrido = time.perf_counter() - inicio
+        enviados = por_flujo * flujos
+        entregados = sum(r.entregado for flujo in resultados for r in flujo)
+        return enviados / transcurrido, entregados, enviados
+
+    resultados = []
+    for flujos in concurrencias:
+        ops, entregados, enviados = asyncio.run(medir(flujos))
+        resultados.append({"flujos": flujos, "paquetes_ops": ops, "entregados": entregados, "enviados": enviados})
+        print(f"{flujos:>8} {ops:>14,.0f} {entregados:>6}/{enviados:<6}")
+    return resultados
+
+def bench_paralelo(procesos_max=None, bordes=400, hosts_por_borde=8, paquetes=200000, semilla=9):
+    """
+    Mide la escalabilidad de SimulacionParalela de 1 a `procesos_max` procesos (por defecto,
+    los núcleos disponibles) con tráfico entre hosts al azar de la topología en estrella.
+    Reporta paquetes por segundo, aceleración respecto de 1 proceso, rondas y paquetes
+    que cruzaron de fragmento.
+    """
+    procesos_max = procesos_max or os.cpu_count() or 1
+    red = Red()
+    red.establecer_sumidero(SumideroNulo())
+    hosts = topologia_estrella(red, bordes, hosts_por_borde)
+    rng = random.Random(semilla)
+    lote = [(rng.choice(hosts)[0], rng.choice(hosts)[1], "x") for _ in range(paquetes)]
+    print(f"dispositivos: {len(red.dispositivos)}  núcleos: {os.cpu_count()}")
+    print(f"{'procesos':>8} {'paquetes/s':>14} {'aceleración':>12} {'rondas':>7} {'cruces':>10}")
+
+    niveles = [2 ** i for i in range(procesos_max.bit_length()) if 2 ** i <= procesos_max]
+    if niveles[-1] != procesos_max:
+        niveles.append(procesos_max)
+    resultados = []
+    base = None
+    for procesos in niveles:
+        with SimulacionParalela(red, procesos=procesos) as simulacion:
+            simulacion.ejecutar(lote[:1000]) # Calentamiento: arranque de los procesos y cachés
+            inicio = time.perf_counter()
+            resultado = simulacion.ejecutar(lote)
+            transcurrido = time.perf_counter() - inicio
+        ops = paquetes / transcurrido
+        base = base or ops
+        resultados.append({"procesos": procesos, "paquetes_ops": ops, "aceleracion": ops / base,
+                           "rondas": resultado["rondas"], "cruces": resultado["cruces"]})
+        print(f"{procesos:>8} {ops:>14,.0f} {ops / base:>12.2f} {resultado['rondas']:>7} {resultado['cruces']:>10}")
+    return resultados
+
+# --- Suite de microbenchmarks ---
+
+# Registro: nombre -> (preparar(tamaño) -> (correr, operaciones), unidad). correr() ejecuta
+# la operación medida y retorna los segundos transcurridos, sin contar su propia preparación.
+MICROBENCHMARKS = {}
+
+def microbenchmark(nombre, unidad="ops"):
+    """Decorador que registra una función de preparación en MICROBENCHMARKS."""
+    def registrar(preparar):
+        MICROBENCHMARKS[nombre] = (preparar, unidad)
+        return preparar
+    return registrar
+
+def _cronometrar(funcion, *args):
+    """Ejecuta funcion(*args) y retorna los segundos transcurridos."""
+    inicio = time.perf_counter()
+    funcion(*args)
+    return time.perf_counter() - inicio
+
+def _en_bucle(funcion, argumentos):
+    """Llama a funcion con cada argumento (o tupla de argumentos) de la lista."""
+    for argumento in argumentos:
+        funcion(*argumento) if isinstance(argumento, tuple) else funcion(argumento)
+
+@microbenchmark("avl.insertar", "rutas")
+def _avl_insertar(tamano):
+    rutas = generar_rutas(tamano)
+    return (lambda: _cronometrar(_en_bucle, AVLTree().insertar, rutas)), tamano
+
+@microbenchmark("avl.eliminar", "rutas")
+def _avl_eliminar(tamano):
+    rutas = generar_rutas(tamano)
+    claves = [(prefix, mask, metric) for prefix, mask, _, metric in rutas]
+    def correr():
+        avl = AVLTree()
+        avl.cargar_masivo(rutas)
+        return _cronometrar(_en_bucle, avl.eliminar, claves)
+    return correr, tamano
+
+@microbenchmark("avl.buscar", "consultas")
+def _avl_buscar(tamano):
+    rutas = generar_rutas(tamano)
+    avl = AVLTree()
+    avl.cargar_masivo(rutas)
+    destinos = generar_destinos(rutas, 20000)
+    return (lambda: _cronometrar(_en_bucle, avl.buscar, destinos)), len(destinos)
+
+def _politicas_de(rutas):
+    """Convierte rutas generadas en (prefix, longitud, políticas) para los tries."""
+    return [(prefix, int(mask), {"ttl-min": metric} if metric % 2 else {"block": True}) for prefix, mask, _, metric in rutas]
+
+@microbenchmark("trie.insertar_prefijo", "prefijos")
+def _trie_insertar(tamano):
+    politicas = _politicas_de(generar_rutas(tamano))
+    return (lambda: _cronometrar(_en_bucle, Trie().insertar_prefijo, politicas)), tamano
+
+@microbenchmark("trie.obtener_politica", "consultas")
+def _trie_obtener(tamano):
+    rutas = generar_rutas(tamano)
+    trie = Trie()
+    _en_bucle(trie.insertar_prefijo, _politicas_de(rutas))
+    destinos = generar_destinos(rutas, 20000)
+    return (lambda: _cronometrar(_en_bucle, trie.obtener_politica, destinos)), len(destinos)
+
+@microbenchmark("trie_comprimido.insertar_prefijo", "prefijos")
+def _trie_comprimido_insertar(tamano):
+    politicas = _politicas_de(generar_rutas(tamano))
+    return (lambda: _cronometrar(_en_bucle, TrieComprimido().insertar_prefijo, politicas)), tamano
+
+@microbenchmark("trie_comprimido.obtener_politica", "consultas")
+def _trie_comprimido_obtener(tamano):
+    rutas = generar_rutas(tamano)
+    trie = TrieComprimido()
+    _en_bucle(trie.insertar_prefijo, _politicas_de(rutas))
+    destinos = generar_destinos(rutas, 20000)
+    return (lambda: _cronometrar(_en_bucle, trie.obtener_politica, destinos)), len(destinos)
+
+def _claves_snapshots(tamano, semilla=3):
+    """Genera claves y archivos de snapshot en orden aleatorio."""
+    claves = [(f"snap_{i:08d}", f"snap_{i:08d}.cfg") for i in range(tamano)]
+    random.Random(semilla).shuffle(claves)
+    return claves
+
+@microbenchmark("btree.insertar", "claves")
+def _btree_insertar(tamano):
+    claves = _claves_snapshots(tamano)
+    return (lambda: _cronometrar(_en_bucle, BTree().insertar, claves)), tamano
+
+@microbenchmark("btree.desde_ordenados", "claves")
+def _btree_desde_ordenados(tamano):
+    claves = sorted(_claves_snapshots(tamano))
+    return (lambda: _cronometrar(BTree.desde_ordenados, claves)), tamano
+
+@microbenchmark("btree.buscar", "consultas")
+def _btree_buscar(tamano):
+    claves = _claves_snapshots(tamano)
+    btree = BTree()
+    _en_bucle(btree.insertar, claves)
+    consultas = [clave for clave, _ in claves[:20000]]
+    return (lambda: _cronometrar(_en_bucle, btree.buscar, consultas)), len(consultas)
+
+@microbenchmark("btree.iterar_rango", "consultas")
+def _btree_iterar_rango(tamano):
+    claves = _claves_snapshots(tamano)
+    btree = BTree()
+    _en_bucle(btree.insertar, claves)
+    rng = random.Random(8)
+    rangos = []
+    for _ in range(5000):
+        i = rng.randrange(tamano)
+        rangos.append((f"snap_{i:08d}", f"snap_{i + 10:08d}")) # Unas 10 claves por rango
+    def recorrer():
+        for desde, hasta in rangos:
+            for _ in btree.iterar(desde, hasta):
+                pass
+    return (lambda: _cronometrar(recorrer)), len(rangos)
+
+@microbenchmark("btree.recorrer_en_orden", "claves")
+def _btree_recorrer(tamano):
+    btree = BTree()
+    _en_bucle(btree.insertar, _claves_snapshots(tamano))
+    return (lambda: _cronometrar(btree.recorrer_en_orden)), tamano
+
+@microbenchmark("btree_disco.cargar", "claves")
+def _btree_disco_cargar(tamano):
+    claves = _claves_snapshots(tamano)
+    def correr():
+        with tempfile.TemporaryDirectory() as directorio:
+            with BTreeDisco(os.path.join(directorio, "indice.db"), sincronizar=False) as indice:
+                return _cronometrar(indice.cargar, claves)
+    return correr, tamano
+
+@microbenchmark("btree_disco.buscar", "consultas")
+def _btree_disco_buscar(tamano):
+    claves = _claves_snapshots(tamano)
+    consultas = [clave for clave, _ in claves[:20000]]
+    def correr():
+        with tempfile.TemporaryDirectory() as directorio:
+            with BTreeDisco(os.path.join(directorio, "indice.db"), sincronizar=False) as indice:
+                indice.cargar(claves)
+                return _cronometrar(_en_bucle, indice.buscar, consultas)
+    return correr, len(consultas)
+
+@microbenchmark("lista.agregar", "elementos")
+def _lista_agregar(tamano):
+    elementos = list(range(tamano))
+    return (lambda: _cronometrar(_en_bucle, ListaEnlazada().agregar, elementos)), tamano
+
+@microbenchmark("lista.obtener_por_indice", "consultas")
+def _lista_obtener_por_indice(tamano):
+    lista = ListaEnlazada(indexable=True)
+    lista.extender(range(tamano))
+    rng = random.Random(5)
+    indices = [rng.randrange(tamano) for _ in range(20000)]
+    return (lambda: _cronometrar(_en_bucle, lista.obtener_por_indice, indices)), len(indices)
+
+@microbenchmark("cola.encolar_desencolar", "elementos")
+def _cola_encolar_desencolar(tamano):
+    elementos = list(range(tamano))
+    def vaciar():
+        cola = Cola()
+        _en_bucle(cola.encolar, elementos)
+        while not cola.esta_vacia():
+            cola.desencolar()
+    return (lambda: _cronometrar(vaciar)), tamano
+
+@microbenchmark("cola.desencolar_lote", "elementos")
+def _cola_desencolar_lote(tamano):
+    elementos = list(range(tamano))
+    def vaciar():
+        cola = Cola()
+        _en_bucle(cola.encolar, elementos)
+        while not cola.esta_vacia():
+            cola.desencolar_lote(256)
+    return (lambda: _cronometrar(vaciar)), tamano
+
+def _red_estrella(tamano):
+    """Red en estrella de unos `tamano` dispositivos (10 por router de borde) sin eventos."""
+    red = Red()
+    red.establecer_sumidero(SumideroNulo())
+    hosts = topologia_estrella(red, max(1, tamano // 10), 8)
+    return red, hosts
+
+@microbenchmark("red.enviar_paquete", "paquetes")
+def _red_enviar_paquete(tamano, paquetes=20000):
+    red, hosts = _red_estrella(tamano)
+    rng = random.Random(11)
+    lote = [(rng.choice(hosts)[0], rng.choice(hosts)[1], "x") for _ in range(paquetes)]
+    return (lambda: _cronometrar(_en_bucle, red.enviar_paquete, lote)), paquetes
+
+def _comprobar_motores_lote(red, lote, ttls=(3, 7, 12, 64)):
+    """Verifica que el motor NumPy y el escalar de enviar_lote den el mismo motivo, saltos y dispositivo."""
+    if np is None:
+        return
+    for ttl in ttls:
+        motivo, saltos, dispositivo = red._enviar_lote_numpy(lote, ttl)
+        esperado = red._enviar_lote_python(lote, ttl)
+        assert (motivo.tolist(), saltos.tolist(), list(dispositivo)) == esperado, f"motores de lote distintos con TTL {ttl}"
+
+def _red_anillo(routers=5):
+    """Anillo de routers cuyas rutas por defecto apuntan al siguiente: todo destino desconocido da un bucle."""
+    red = Red()
+    red.establecer_sumidero(SumideroNulo())
+    for i in range(routers):
+        red.agregar_dispositivo("router", f"R{i}")
+        red.obtener_dispositivo(f"R{i}").agregar_interfaz("a")
+        red.obtener_dispositivo(f"R{i}").agregar_interfaz("b")
+    for i in range(routers):
+        siguiente = f"R{(i + 1) % routers}"
+        red.conectar(f"R{i}", "a", siguiente, "b")
+        red.asignar_ip(f"R{i}", "a", f"10.0.{i}.1", 30)
+        red.asignar_ip(siguiente, "b", f"10.0.{i}.2", 30)
+        red.obtener_dispositivo(f"R{i}").tabla_rutas_avl.insertar("0.0.0.0", "0", f"10.0.{i}.2", 1)
+    return red, [(f"R{i % routers}", f"8.8.{i}.8", "x") for i in range(4 * routers)]
+
+@microbenchmark("red.enviar_lote", "paquetes")
+def _red_enviar_lote(tamano, paquetes=20000):
+    red, hosts = _red_estrella(tamano)
+    rng = random.Random(11)
+    lote = [(rng.choice(hosts)[0], rng.choice(hosts)[1], "x") for _ in range(paquetes)]
+    _comprobar_motores_lote(red, lote[:2000])
+    _comprobar_motores_lote(*_red_anillo())
+    return (lambda: _cronometrar(red.enviar_lote, lote)), paquetes
+
+@microbenchmark("red.conectar_masivo", "enlaces")
+def _red_conectar_masivo(tamano):
+    enlaces = [(f"S{i // 48}", f"p{i % 48}", f"H{i}", "eth0") for i in range(tamano)]
+    def correr():
+        red = Red()
+        for s in range(tamano // 48 + 1):
+            red.agregar_dispositivo("switch", f"S{s}")
+        for i in range(tamano):
+            red.agregar_dispositivo("host", f"H{i}")
+        return _cronometrar(red.conectar_masivo, enlaces, True)
+    return correr, tamano
+
+@microbenchmark("cli.procesar_comando", "comandos")
+def _cli_procesar(tamano, comandos=10000):
+    red = Red()
+    red.establecer_sumidero(SumideroNulo())
+    red.agregar_dispositivo("router", "R1")
+    rutas = generar_rutas(tamano)
+    red.obtener_dispositivo("R1").tabla_rutas_avl.cargar_masivo(rutas)
+    cli = CLI(red)
+    cli.procesar_comando("console R1")
+    cli.procesar_comando("enable")
+    destinos = generar_destinos(rutas, comandos)
+    plantillas = ("show ip route {}", "send R1 {} x", "show ip cache")
+    lista = [plantillas[i % len(plantillas)].format(ip) for i, ip in enumerate(destinos)]
+    return (lambda: _cronometrar(_en_bucle, cli.procesar_comando, lista)), comandos
+
+@microbenchmark("persistencia.guardar_configuracion", "dispositivos")
+def _persistencia_guardar(tamano):
+    red, _ = _red_estrella(tamano)
+    def correr():
+        with tempfile.TemporaryDirectory() as directorio, contextlib.redirect_stdout(io.StringIO()):
+            return _cronometrar(guardar_configuracion, red, os.path.join(directorio, "red.json"))
+    return correr, len(red.dispositivos)
+
+@microbenchmark("persistencia.cargar_configuracion", "dispositivos")
+def _persistencia_cargar(tamano):
+    red, _ = _red_estrella(tamano)
+    def correr():
+        with tempfile.TemporaryDirectory() as directorio, contextlib.redirect_stdout(io.StringIO()):
+            archivo = os.path.join(directorio, "red.json")
+            guardar_configuracion(red, archivo)
+            return _cronometrar(cargar_configuracion, archivo)
+    return correr, len(red.dispositivos)
+
+def ejecutar_suite(tamanos=(1000, 10000), filtro=None, repeticiones=3):
+    """
+    Ejecuta los microbenchmarks registrados (los que contienen `filtro` en su nombre)
+    para cada tamaño, tomando el mejor tiempo de `repeticiones` ejecuciones.
+    Returns:
+        dict: {"meta": {...}, "resultados": {nombre: {tamaño (str): {"ops_por_s", "segundos",
+               "operaciones", "unidad"}}}}, serializable a JSON.
+    """
+    resultados = {}
+    print(f"{'benchmark':<36} {'tamaño':>8} {'ops/s':>14} {'unidad':>12}")
+    for nombre, (preparar, unidad) in MICROBENCHMARKS.items():
+        if filtro and filtro not in nombre:
+            continue
+        for tamano in tamanos:
+            correr, operaciones = preparar(tamano)
+            segundos = min(correr() for _ in range(repeticiones))
+            ops = operaciones / segundos if segundos > 0 else float("inf")
+            resultados.setdefault(nombre, {})[str(tamano)] = {
+                "ops_por_s": ops, "segundos": segundos, "operaciones": operaciones, "unidad": unidad}
+            print(f"{nombre:<36} {tamano:>8} {ops:>14,.0f} {unidad:>12}")
+    return {
+        "meta": {"fecha": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                 "plataforma": platform.platform(), "repeticiones": repeticiones, "tamanos": list(tamanos)},
+        "resultados": resultados
+    }
+
+def comparar_con_base(actual, base, tolerancia=0.10):
+    """
+    Compara los resultados de la suite contra una ejecución base e imprime la comparación.
+    Una medición es regresión si sus ops/s bajaron más que `tolerancia` (fracción).
+    Returns:
+        list: Regresiones como tuplas (nombre, tamaño, ops_base, ops_actual).
+    """
+    regresiones = []
+    print(f"\n{'benchmark':<36} {'tamaño':>8} {'base ops/s':>14} {'ops/s':>14} {'cambio':>8}  estado")
+    for nombre, por_tamano in actual["resultados"].items():
+        for tamano, medicion in por_tamano.items():
+            previa = base.get("resultados", {}).get(nombre, {}).get(tamano)
+            if previa is None:
+                print(f"{nombre:<36} {tamano:>8} {'-':>14} {medicion['ops_por_s']:>14,.0f} {'-':>8}  NUEVO")
+                continue
+            cambio = medicion["ops_por_s"] / previa["ops_por_s"] - 1
+            if cambio < -tolerancia:
+                estado = "REGRESIÓN"
+                regresiones.append((nombre, tamano, previa["ops_por_s"], medicion["ops_por_s"]))
+            else:
+                estado = "MEJORA" if cambio > tolerancia else "OK"
+            print(f"{nombre:<36} {tamano:>8} {previa['ops_por_s']:>14,.0f} {medicion['ops_por_s']:>14,.0f} {cambio:>+8.1%}  {estado}")
+    return regresiones
+
+def main_suite(argumentos):
+    """Punto de entrada de 'python Benchmarks.py suite ...'. Retorna el código de salida (1 si hay regresiones)."""
+    parser = argparse.ArgumentParser(prog="Benchmarks.py suite", description="Suite de microbenchmarks del simulador.")
+    parser.add_argument("--tamanos", default="1000,10000", help="Tamaños separados por comas")
+    parser.add_argument("--filtro", help="Ejecutar solo los benchmarks cuyo nombre contiene este texto")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--json", help="Archivo donde guardar los resultados")
+    parser.add_argument("--baseline", help="Resultados previos (JSON) contra los que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.10, help="Caída de ops/s tolerada (fracción)")
+    opciones = parser.parse_args(argumentos)
+
+    tamanos = [int(t) for t in opciones.tamanos.split(",") if t]
+    resultados = ejecutar_suite(tamanos, opciones.filtro, opciones.repeticiones)
+    if opciones.json:
+        with open(opciones.json, "w") as f:
+            json.dump(resultados, f, indent=2)
+    if opciones.baseline:
+        with open(opciones.baseline) as f:
+            base = json.load(f)
+        regresiones = comparar_con_base(resultados, base, opciones.tolerancia)
+        if regresiones:
+            print(f"\n{len(regresiones)} regresiones de rendimiento.")
+            return 1
+    return 0
+
+# --- Escala y memoria ---
+
+def bench_escala(routers=100, switches=200, hosts=2000, rutas=1000, politicas=100, factores=(1,)):
+    """
+    Construye topologías sintéticas multiplicando todos los conteos por cada factor y
+    reporta tiempo de construcción, pico de memoria y bytes por objeto de cada clase.
+    Returns:
+        dict: {"objetos": {clase: bytes}, "escalas": [resultado de medir_escala por factor]}
+    """
+    objetos = memoria_objetos()
+    print(f"{'clase':<20} {'bytes/objeto':>12}")
+    for clase, tamano in objetos.items():
+        print(f"{clase:<20} {tamano:>12,.0f}")
+
+    escalas = []
+    print(f"\n{'dispositivos':>12} {'interfaces':>10} {'nodos AVL':>10} {'nodos trie':>10} {'construcción (s)':>17} {'pico (MiB)':>11} {'final (MiB)':>12}")
+    for factor in factores:
+        r = medir_escala(routers * factor, switches * factor, hosts * factor, rutas, politicas)
+        escalas.append(r)
+        print(f"{r['dispositivos']:>12} {r['interfaces']:>10} {r['nodos_avl']:>10} {r['nodos_trie']:>10} "
+              f"{r['segundos']:>17.2f} {r['memoria_pico'] / 2**20:>11.1f} {r['memoria_final'] / 2**20:>12.1f}")
+    return {"objetos": objetos, "escalas": escalas}
+
+def comparar_memoria(actual, base, tolerancia=0.10):
+    """
+    Compara bytes por objeto y picos de memoria contra una ejecución base.
+    Returns:
+        list: Descripciones de los valores que crecieron más que `tolerancia` (fracción).
+    """
+    regresiones = []
+    for clase, tamano in actual["objetos"].items():
+        previo = base.get("objetos", {}).get(clase)
+        if previo and tamano > previo * (1 + tolerancia):
+            regresiones.append(f"{clase}: {previo:,.0f} -> {tamano:,.0f} bytes/objeto")
+    previas = {e["dispositivos"]: e for e in base.get("escalas", [])}
+    for escala in actual["escalas"]:
+        previa = previas.get(escala["dispositivos"])
+        if previa and escala["memoria_pico"] > previa["memoria_pico"] * (1 + tolerancia):
+            regresiones.append(f"{escala['dispositivos']} dispositivos: pico {previa['memoria_pico'] / 2**20:.1f} -> {escala['memoria_pico'] / 2**20:.1f} MiB")
+    return regresiones
+
+def main_escala(argumentos):
+    """Punto de entrada de 'python Benchmarks.py escala ...'. Retorna el código de salida (1 si hay regresiones)."""
+    parser = argparse.ArgumentParser(prog="Benchmarks.py escala", description="Escala y memoria con topologías sintéticas.")
+    parser.add_argument("--routers", type=int, default=100)
+    parser.add_argument("--switches", type=int, default=200)
+    parser.add_argument("--hosts", type=int, default=2000)
+    parser.add_argument("--rutas", type=int, default=1000, help="Rutas por router")
+    parser.add_argument("--politicas", type=int, default=100, help="Políticas por router")
+    parser.add_argument("--factores", default="1", help="Multiplicadores de routers/switches/hosts separados por comas")
+    parser.add_argument("--json", help="Archivo donde guardar los resultados")
+    parser.add_argument("--baseline", help="Resultados previos (JSON) contra los que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.10, help="Crecimiento de memoria tolerado (fracción)")
+    opciones = parser.parse_args(argumentos)
+
+    resultados = bench_escala(opciones.routers, opciones.switches, opciones.hosts, opciones.rutas, opciones.politicas,
+                              [int(f) for f in opciones.factores.split(",") if f])
+    if opciones.json:
+        with open(opciones.json, "w") as f:
+            json.dump(resultados, f, indent=2)
+    if opciones.baseline:
+        with open(opciones.baseline) as f:
+            regresiones = comparar_memoria(resultados, json.load(f), opciones.tolerancia)
+        for regresion in regresiones:
+            print(f"REGRESIÓN DE MEMORIA: {regresion}")
+        if regresiones:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "suite":
+        sys.exit(main_suite(sys.argv[2:]))
+    elif len(sys.argv) >= 2 and sys.argv[1] == "escala":
+        sys.exit(main_escala(sys.argv[2:]))
+    elif len(sys.argv) < 2 or sys.argv[1] == "lpm":
+        tamanos = [int(t) for t in sys.argv[2:]] or [1000, 100000, 1000000]
+        bench_lpm(tamanos)
+    elif sys.argv[1] == "politicas":
+        tamanos = [int(t) for t in sys.argv[2:]] or [1000, 10000, 50000]
+        bench_politicas(tamanos)
+    elif sys.argv[1] == "lista":
+        tamanos = [int(t) for t in sys.argv[2:]] or [10000, 100000, 1000000]
+        bench_lista(tamanos)
+    elif sys.argv[1] == "btree":
+        bench_btree(int(sys.argv[2]) if len(sys.argv) > 2 else 200000,
+                    [int(t) for t in sys.argv[3:]] or (2, 4, 8, 16, 32, 64, 128, 256))
+    elif sys.argv[1] == "envio":
+        bench_envio(int(sys.argv[2]) if len(sys.argv) > 2 else 50000)
+    elif sys.argv[1] == "asincrono":
+        bench_asincrono(int(sys.argv[2]) if len(sys.argv) > 2 else 200)
+    elif sys.argv[1] == "paralelo":
+        bench_paralelo(int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    else:
+        print(__doc__)
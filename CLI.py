@@ -1,7 +1,13 @@
 # CLI.py
 from Errores import error_logger # Importar el logger de errores
 import re # Para validación de IP y máscara
+from datetime import datetime
 from Dispositivos import Router, Switch, Host
+from Arboles import longitud_mascara, entero_a_ip
+from Persistencia import leer_rutas_desde_archivo, leer_enlaces_desde_archivo
+from Eventos import SumideroNulo, SumideroConsola, SumideroMemoria, SumideroJSONL
+from Red import TTL_POR_DEFECTO
+from Simulacion import Simulador
 
 class CLI:
     """
@@ -109,13 +115,29 @@ Comandos disponibles:
   configure terminal - Entrar en modo configuración
   show interfaces    - Mostrar interfaces del dispositivo
   show ip route      - Mostrar tabla de rutas (AVL)
+  show ip route <ip> - Mostrar rutas que cubren una IP
+  show ip route <prefix> <mask> longer-prefixes - Mostrar rutas dentro de una superred
+  show ip cache      - Mostrar estadísticas de la caché de búsqueda
+  show ip owner <ip> - Mostrar la interfaz dueña de una IP y su subred conectada
+  show path <origen> <destino> [hops] - Camino de menor costo (o menos saltos) entre dispositivos
   show route avl-stats - Mostrar estadísticas AVL
   show ip route-tree - Mostrar árbol AVL
   show snapshots     - Mostrar snapshots de configuración (B-Tree)
+  show snapshots from <a> to <b> - Mostrar snapshots con clave en un rango
+  show snapshots at-or-before <key> - Último snapshot con clave <= key
+  show snapshots at-or-after <key> - Primer snapshot con clave >= key
   btree stats        - Mostrar estadísticas B-Tree
   show ip prefix-tree - Mostrar árbol de prefijos (Trie)
   show error-log [n] - Mostrar registro de errores
-  send <origen> <destino_ip> <mensaje> - Enviar paquete (simulado)
+  show error-log stats - Mostrar contadores de errores por tipo
+  show error-log [type <T>] [since <ts>] [until <ts>] [last <n>] - Filtrar errores (memoria y disco)
+  error-log spill <directorio> - Volcar a disco los errores desalojados de memoria
+  no error-log spill - Desactivar el volcado a disco
+  send <origen> <destino_ip> <mensaje> [ttl <N>] - Enviar paquete salto a salto
+  simulate <origen> <destino_ip> <cantidad> [interval <ms>] [size <bytes>] - Simular un flujo con eventos discretos
+  debug ip packet [console | memory | file <archivo>] - Destino de los eventos de paquetes
+  no debug ip packet - Desactivar los eventos de paquetes
+  show packet-events [n] - Mostrar eventos guardados en memoria
   disable            - Volver a modo usuario
   help               - Mostrar esta ayuda
   exit               - Volver a modo usuario / Salir
@@ -128,20 +150,31 @@ Comandos disponibles:
   hostname <NOMBRE>  - Cambiar nombre del dispositivo (en desarrollo)
   ip route add <prefix> <mask> via <next-hop> [metric N] - Añadir ruta AVL
   ip route del <prefix> <mask> - Eliminar ruta AVL
+  ip route import <archivo> - Importar rutas en bloque desde un archivo
+  link import <archivo> [create-interfaces] - Conectar enlaces en bloque desde un CSV o JSONL
+  ip cache size <N>  - Cambiar la capacidad de la caché de búsqueda
   policy set <prefix> <mask> ttl-min <N> - Establecer política TTL (Trie)
   policy set <prefix> <mask> block - Establecer política de bloqueo (Trie)
   policy unset <prefix> <mask> - Eliminar política (Trie)
   save snapshot <key> - Guardar configuración como snapshot (B-Tree)
   load config <key>  - Cargar configuración desde snapshot (B-Tree)
+  delete snapshot <key> - Eliminar un snapshot del índice (B-Tree)
+  snapshot-index file <archivo> - Mantener el índice de snapshots en un archivo paginado
+  prune snapshots keep <N> - Conservar solo los N snapshots más recientes
+  prune snapshots older-than <N>[s|m|h|d] - Eliminar snapshots más antiguos que N
   exit               - Volver a modo privilegiado
   end                - Salir a modo privilegiado"""
         
         elif self.contexto["modo"] == "interfaz":
             ayuda = """
 Comandos disponibles:
-  ip address <IP>    - Asignar dirección IP
+  ip address <IP> [<MASK>] - Asignar dirección IP (y subred conectada)
+  no ip address      - Quitar la dirección IP
   shutdown           - Desactivar interfaz
   no shutdown        - Activar interfaz
+  cost <N>           - Costo de los enlaces de la interfaz
+  latency <ms>       - Latencia del enlace saliente
+  bandwidth <kbps>   - Ancho de banda del enlace saliente
   exit               - Volver a modo configuración
   end                - Salir a modo privilegiado"""
 
@@ -202,7 +235,7 @@ Comandos disponibles:
                     interfaces = []
                     for nombre, intf in dispositivo.interfaces.items():
                         estado = "ACTIVA" if intf.estado else "INACTIVA"
-                        ip = intf.ip or "Sin dirección IP"
+                        ip = (intf.ip + (f"/{intf.mascara}" if intf.mascara is not None else "")) if intf.ip else "Sin dirección IP"
                         conexiones = "\n    ".join([f"{d}/{i}" for d, i in intf.conexiones])
                         
                         interfaz_info = [
@@ -219,20 +252,66 @@ Comandos disponibles:
                 # --- Módulo 1: AVL (Tabla de Rutas) ---
                 elif args[0] == "ip" and len(args) > 1 and args[1] == "route":
                     if isinstance(dispositivo, Router):
-                        rutas = []
-                        # Recorrido inorden del AVL para mostrar rutas
-                        def _inorden_display(nodo):
-                            if nodo:
-                                _inorden_display(nodo.izquierda)
-                                rutas.append(f"{nodo.prefix}/{nodo.mask} via {nodo.next_hop} metric {nodo.metric}")
-                                _inorden_display(nodo.derecha)
-                        dispositivo.tabla_rutas_avl._inorden_display = _inorden_display # Adjuntar para usar
-                        dispositivo.tabla_rutas_avl._inorden_display(dispositivo.tabla_rutas_avl.raiz)
-                        
-                        return False, self._mostrar_banner(f"TABLA DE RUTAS DE {disp_nombre}") + "\n" + "\n".join(rutas) + "\nDefault: none\n"
+                        tabla = dispositivo.tabla_rutas_avl
+                        titulo = f"TABLA DE RUTAS DE {disp_nombre}"
+                        if len(args) == 3:
+                            # show ip route <ip>: rutas que cubren la IP
+                            if not self._validar_ip(args[2]):
+                                error_logger.registrar_error("SyntaxError", "Formato de IP inválido.", comando_completo)
+                                return False, "Error: Formato de IP inválido."
+                            nodos = tabla.rutas_que_cubren(args[2])
+                            titulo = f"RUTAS QUE CUBREN {args[2]} EN {disp_nombre}"
+                        elif len(args) == 5 and args[4] == "longer-prefixes":
+                            # show ip route <prefix> <mask> longer-prefixes: rutas dentro de la superred
+                            if not self._validar_ip(args[2]) or longitud_mascara(args[3]) is None:
+                                error_logger.registrar_error("SyntaxError", "Formato de IP/máscara inválido.", comando_completo)
+                                return False, "Error: Formato de IP/máscara inválido."
+                            nodos = tabla.rutas_contenidas(args[2], args[3])
+                            titulo = f"RUTAS DENTRO DE {args[2]}/{args[3]} EN {disp_nombre}"
+                        elif len(args) == 2:
+                            nodos = tabla.recorrer_en_orden()
+                        else:
+                            error_logger.registrar_error("SyntaxError", "Uso: show ip route [<ip> | <prefix> <mask> longer-prefixes]", comando_completo)
+                            return False, "Uso: show ip route [<ip> | <prefix> <mask> longer-prefixes]"
+
+                        rutas = [f"{entero_a_ip(n.red)}/{n.longitud} via {n.next_hop} metric {n.metric}" for n in nodos]
+                        defecto = tabla.indice_lpm.buscar(0, longitud_maxima=0) # Solo la ruta /0, aunque haya otras que cubran 0.0.0.0
+                        defecto = f"Default: via {defecto.next_hop}" if defecto else "Default: none"
+                        return False, self._mostrar_banner(titulo) + "\n" + "\n".join(rutas) + f"\n{defecto}\n"
                     error_logger.registrar_error("TypeError", "El dispositivo no es un router y no tiene tabla de rutas.", comando_completo)
                     return False, "Error: Este dispositivo no es un router."
                 
+                elif args[0] == "ip" and len(args) > 1 and args[1] == "cache":
+                    if isinstance(dispositivo, Router):
+                        stats = dispositivo.cache_busqueda.obtener_stats()
+                        return False, (f"size={stats['entradas']}/{stats['capacidad']} hits={stats['aciertos']} misses={stats['fallos']} "
+                                       f"evictions={stats['desalojos']} invalidations={stats['invalidaciones']} hit-rate={stats['tasa_aciertos']:.1%}\n")
+                    error_logger.registrar_error("TypeError", "El dispositivo no es un router y no tiene caché de búsqueda.", comando_completo)
+                    return False, "Error: Este dispositivo no es un router."
+
+                elif args[0] == "path" and (len(args) == 3 or (len(args) == 4 and args[3] == "hops")):
+                    # show path <origen> <destino> [hops]: Dijkstra (o BFS) sobre la instantánea CSR
+                    camino, costo = self.red.camino_mas_corto(args[1], args[2], por_costo=len(args) == 3)
+                    if camino is None:
+                        error_logger.registrar_error("PathError", f"No hay camino activo entre {args[1]} y {args[2]}.", comando_completo)
+                        return False, f"No hay camino activo entre {args[1]} y {args[2]}.\n"
+                    medida = f"costo {costo:g}" if len(args) == 3 else f"{costo} saltos"
+                    return False, " -> ".join(camino) + f" ({medida})\n"
+
+                elif args[0] == "ip" and len(args) == 3 and args[1] == "owner":
+                    # show ip owner <ip>: consulta O(1) a los índices de IPs y subredes de la red
+                    if not self._validar_ip(args[2]):
+                        error_logger.registrar_error("SyntaxError", "Formato de dirección IP inválido.", comando_completo)
+                        return False, "Error: Formato de dirección IP inválido."
+                    lineas = []
+                    propietario = self.red.resolver_ip(args[2])
+                    lineas.append(f"{args[2]} asignada a {propietario[0]}:{propietario[1]}" if propietario else f"{args[2]} no está asignada a ninguna interfaz")
+                    subred = self.red.resolver_subred(args[2])
+                    if subred:
+                        miembros = ", ".join(f"{d}:{i}" for d, i in sorted(subred[1]))
+                        lineas.append(f"Subred conectada {subred[0]}: {miembros}")
+                    return False, "\n".join(lineas) + "\n"
+
                 elif args[0] == "route" and len(args) > 1 and args[1] == "avl-stats":
                     if isinstance(dispositivo, Router):
                         stats = dispositivo.tabla_rutas_avl.obtener_stats()
@@ -249,12 +328,26 @@ Comandos disponibles:
                     return False, "Error: Este dispositivo no es un router."
 
                 # --- Módulo 2: B-Tree (Snapshots) ---
+                elif args[0] == "snapshots" and len(args) == 3 and args[1] in ("at-or-before", "at-or-after"):
+                    # show snapshots at-or-before <key> | at-or-after <key>
+                    if args[1] == "at-or-before":
+                        encontrado = self.red.b_tree_snapshots.piso(args[2])
+                    else:
+                        encontrado = self.red.b_tree_snapshots.techo(args[2])
+                    if encontrado:
+                        return False, f"{encontrado[0]} -> {encontrado[1]}\n"
+                    return False, f"No hay snapshots {'hasta' if args[1] == 'at-or-before' else 'desde'} la clave '{args[2]}'.\n"
                 elif args[0] == "snapshots":
-                    snapshots = self.red.b_tree_snapshots.recorrer_en_orden()
-                    if snapshots:
-                        output = "\n".join([f"{k} -> {v}" for k, v in snapshots]) # Asumiendo que recorrer_en_orden devuelve (key, value)
+                    # show snapshots [from <a>] [to <b>]
+                    limites = dict(zip(args[1::2], args[2::2]))
+                    if len(args) % 2 == 0 or set(limites) - {"from", "to"}:
+                        error_logger.registrar_error("SyntaxError", "Uso: show snapshots [from <a>] [to <b>] | at-or-before <key> | at-or-after <key>", comando_completo)
+                        return False, "Uso: show snapshots [from <a>] [to <b>] | at-or-before <key> | at-or-after <key>"
+                    snapshots = self.red.b_tree_snapshots.iterar(limites.get("from"), limites.get("to"))
+                    output = "\n".join(f"{k} -> {v}" for k, v in snapshots)
+                    if output:
                         return False, self._mostrar_banner("SNAPSHOTS DE CONFIGURACIÓN") + "\n" + output + "\n"
-                    return False, "No hay snapshots guardados.\n"
+                    return False, "No hay snapshots guardados.\n" if not limites else "No hay snapshots en el rango.\n"
                 
                 # --- Módulo 3: Trie (Prefijos IP y Políticas) ---
                 elif args[0] == "ip" and len(args) > 1 and args[1] == "prefix-tree":
@@ -265,20 +358,61 @@ Comandos disponibles:
                     error_logger.registrar_error("TypeError", "El dispositivo no es un router y no tiene árbol de prefijos.", comando_completo)
                     return False, "Error: Este dispositivo no es un router."
 
+                elif args[0] == "packet-events":
+                    if not isinstance(self.red.sumidero, SumideroMemoria):
+                        error_logger.registrar_error("StateError", "Los eventos de paquetes no se están guardando en memoria.", comando_completo)
+                        return False, "Error: Use 'debug ip packet memory' para guardar eventos.\n"
+                    cantidad = int(args[1]) if len(args) > 1 and args[1].isdigit() else None
+                    eventos = self.red.sumidero.obtener_eventos(cantidad)
+                    if eventos:
+                        output = "\n".join(f"{e.tipo} {e.dispositivo} {e.destino} {e.detalle if e.detalle is not None else ''}".rstrip() for e in eventos)
+                        return False, self._mostrar_banner("EVENTOS DE PAQUETES") + "\n" + output + "\n"
+                    return False, "No hay eventos registrados.\n"
+
                 # --- Módulo 4: Registro de Errores ---
+                elif args[0] == "error-log" and len(args) == 2 and args[1] == "stats":
+                    stats = error_logger.obtener_stats()
+                    output = (f"Entradas: {stats['entradas']}/{stats['capacidad']}\n"
+                              f"Errores totales: {stats['total']} (acumulados: {stats['agregados']}, desalojados: {stats['desalojados']})\n"
+                              + (f"En disco: {stats['en_disco']} en {stats['segmentos']} segmentos\n" if stats['segmentos'] else "")
+                              + "".join(f"  {tipo}: {n}\n" for tipo, n in sorted(stats['por_tipo'].items())))
+                    return False, self._mostrar_banner("ESTADÍSTICAS DE ERRORES") + "\n" + output
                 elif args[0] == "error-log":
+                    # show error-log [n]
+                    # show error-log [type <T>] [since <ts>] [until <ts>] [last <n>]
                     cantidad = None
-                    if len(args) > 1:
+                    filtros = {}
+                    if len(args) == 2:
                         try:
                             cantidad = int(args[1])
                         except ValueError:
                             error_logger.registrar_error("SyntaxError", "Cantidad inválida para show error-log.", comando_completo)
                             return False, "Error: La cantidad debe ser un número entero."
-                    
-                    errores = error_logger.obtener_errores(cantidad)
+                    elif len(args) > 2:
+                        opciones = dict(zip(args[1::2], args[2::2]))
+                        try:
+                            if len(args) % 2 == 0 or set(opciones) - {"type", "since", "until", "last"}:
+                                raise ValueError
+                            if "type" in opciones:
+                                filtros["tipo"] = opciones["type"]
+                            if "since" in opciones:
+                                filtros["desde"] = self._parsear_instante(opciones["since"])
+                            if "until" in opciones:
+                                filtros["hasta"] = self._parsear_instante(opciones["until"])
+                            if "last" in opciones:
+                                cantidad = int(opciones["last"])
+                        except ValueError:
+                            error_logger.registrar_error("SyntaxError", "Uso: show error-log [type <T>] [since <ts>] [until <ts>] [last <n>]", comando_completo)
+                            return False, "Uso: show error-log [type <T>] [since <ts>] [until <ts>] [last <n>] (ts: ISO 8601 o segundos epoch)"
+
+                    if filtros:
+                        errores = error_logger.filtrar_errores(cantidad=cantidad, **filtros)
+                    else:
+                        errores = error_logger.obtener_errores(cantidad)
                     if errores:
                         output = "\n".join([
                             f"[{e['timestamp']}] {e['tipo']}: {e['mensaje']} (Comando: {e['comando'] or 'N/A'})"
+                            + (f" x{e['repeticiones']}, última: {e['ultima_vez']}" if e['repeticiones'] > 1 else "")
                             for e in errores
                         ])
                         return False, self._mostrar_banner("REGISTRO DE ERRORES") + "\n" + output + "\n"
@@ -287,19 +421,83 @@ Comandos disponibles:
             error_logger.registrar_error("SyntaxError", "Comando 'show' incompleto o inválido.", comando_completo)
             return False, "Error: Comando 'show' no válido. Escriba 'help' para ayuda."
 
+        elif cmd == "error-log" and len(args) == 2 and args[0] == "spill":
+            # error-log spill <directorio>
+            try:
+                error_logger.habilitar_disco(args[1])
+            except (OSError, ValueError) as e:
+                error_logger.registrar_error("FileError", f"No se pudo abrir el log de errores en '{args[1]}': {e}", comando_completo)
+                return False, f"Error: No se pudo abrir el log de errores en '{args[1]}'.\n"
+            return False, f"[OK] Errores desalojados de memoria se vuelcan a {args[1]}.\n"
+
+        elif cmd == "no" and args == ["error-log", "spill"]:
+            error_logger.deshabilitar_disco()
+            return False, "[OK] Volcado del registro de errores a disco desactivado.\n"
+
+        elif cmd == "debug" and len(args) >= 2 and args[0] == "ip" and args[1] == "packet":
+            # debug ip packet [console | memory | file <archivo>]
+            destino = args[2] if len(args) > 2 else "console"
+            if destino == "console" and len(args) <= 3:
+                self.red.establecer_sumidero(SumideroConsola())
+            elif destino == "memory" and len(args) == 3:
+                self.red.establecer_sumidero(SumideroMemoria())
+            elif destino == "file" and len(args) == 4:
+                try:
+                    self.red.establecer_sumidero(SumideroJSONL(args[3]))
+                except OSError as e:
+                    error_logger.registrar_error("FileError", f"No se pudo abrir '{args[3]}': {e}", comando_completo)
+                    return False, f"Error: No se pudo abrir '{args[3]}'.\n"
+            else:
+                error_logger.registrar_error("SyntaxError", "Uso: debug ip packet [console | memory | file <archivo>]", comando_completo)
+                return False, "Uso: debug ip packet [console | memory | file <archivo>]"
+            return False, f"Eventos de paquetes dirigidos a: {destino}\n"
+
+        elif cmd == "no" and args == ["debug", "ip", "packet"]:
+            self.red.establecer_sumidero(SumideroNulo())
+            return False, "Eventos de paquetes desactivados.\n"
+
         elif cmd == "btree" and len(args) > 0 and args[0] == "stats":
             stats = self.red.b_tree_snapshots.obtener_stats()
-            return False, f"order={stats['orden']} height={stats['altura']} nodes={stats['nodos']} splits={stats['splits']} merges={stats['merges']}\n"
+            output = f"order={stats['orden']} height={stats['altura']} nodes={stats['nodos']} keys={stats['claves']} splits={stats['splits']} merges={stats['merges']}"
+            if "paginas" in stats: # Índice en disco (BTreeDisco)
+                output += (f"\nfile={stats['archivo']} page_size={stats['tam_pagina']} pages={stats['paginas']}"
+                           f" generation={stats['generacion']} cached={stats['cache']} hit_rate={stats['tasa_aciertos']:.1%}")
+            return False, output + "\n"
 
         elif cmd == "send":
-            if len(args) == 3:
+            # send <origen> <destino_ip> <mensaje> [ttl <N>]
+            if len(args) == 3 or (len(args) == 5 and args[3] == "ttl" and args[4].isdigit()):
                 origen = args[0]
                 destino_ip = args[1]
                 mensaje = args[2]
-                exito, msg = self.red.enviar_paquete(origen, destino_ip, mensaje)
+                ttl = int(args[4]) if len(args) == 5 else TTL_POR_DEFECTO
+                exito, msg = self.red.enviar_paquete(origen, destino_ip, mensaje, ttl)
                 return False, msg
-            error_logger.registrar_error("SyntaxError", "Uso: send <origen> <destino_ip> <mensaje>", comando_completo)
-            return False, "Uso: send <origen> <destino_ip> <mensaje>"
+            error_logger.registrar_error("SyntaxError", "Uso: send <origen> <destino_ip> <mensaje> [ttl <N>]", comando_completo)
+            return False, "Uso: send <origen> <destino_ip> <mensaje> [ttl <N>]"
+
+        elif cmd == "simulate":
+            # simulate <origen> <destino_ip> <cantidad> [interval <ms>] [size <bytes>]
+            opciones = dict(zip(args[3::2], args[4::2]))
+            if (len(args) >= 3 and len(args) % 2 == 1 and args[2].isdigit()
+                    and set(opciones) <= {"interval", "size"}):
+                try:
+                    intervalo = float(opciones.get("interval", 1)) / 1000
+                    tamano = int(opciones.get("size", 1500))
+                except ValueError:
+                    intervalo = tamano = None
+                if intervalo is not None and intervalo >= 0 and tamano > 0:
+                    simulador = Simulador(self.red)
+                    simulador.programar_flujo(args[0], args[1], int(args[2]), intervalo, tamano=tamano)
+                    r = simulador.ejecutar()
+                    descartes = ", ".join(f"{motivo}={n}" for motivo, n in r["descartados"].items()) or "ninguno"
+                    latencia = f"{r['latencia_media'] * 1000:.3f} ms" if r["latencia_media"] is not None else "-"
+                    return False, (f"Entregados: {r['entregados']}  Descartados: {descartes}\n"
+                                   f"Latencia media: {latencia}  Saltos medios: {r['saltos_medios'] or 0:.1f}\n"
+                                   f"Tiempo simulado: {r['tiempo_simulado']:.6f} s  Tiempo real: {r['tiempo_real']:.3f} s  "
+                                   f"({r['eventos']} eventos, {r['eventos_por_segundo'] or 0:,.0f} eventos/s)\n")
+            error_logger.registrar_error("SyntaxError", "Uso: simulate <origen> <destino_ip> <cantidad> [interval <ms>] [size <bytes>]", comando_completo)
+            return False, "Uso: simulate <origen> <destino_ip> <cantidad> [interval <ms>] [size <bytes>]"
 
         elif cmd == "disable":
             self.contexto["modo"] = "usuario"
@@ -327,9 +525,13 @@ Comandos disponibles:
             banner = self._mostrar_banner(f"CONFIGURANDO INTERFAZ {args[0]}")
             ayuda = """
 Comandos disponibles:
-  ip address <IP>    - Asignar dirección IP
+  ip address <IP> [<MASK>] - Asignar dirección IP (y subred conectada)
+  no ip address      - Quitar la dirección IP
   shutdown           - Desactivar interfaz
   no shutdown        - Activar interfaz
+  cost <N>           - Costo de los enlaces de la interfaz
+  latency <ms>       - Latencia del enlace saliente
+  bandwidth <kbps>   - Ancho de banda del enlace saliente
   exit               - Volver a modo configuración"""
             return False, banner + ayuda + "\n" + "="*60 + "\n"
 
@@ -347,25 +549,27 @@ Comandos disponibles:
 
             if args[1] == "add":
                 # ip route add <prefix> <mask> via <next-hop> [metric N]
-                if len(args) >= 7 and args[5] == "via":
-                    prefix = args[3]
-                    mask = args[4]
-                    next_hop = args[6]
+                if len(args) >= 6 and args[4] == "via":
+                    prefix = args[2]
+                    mask = args[3]
+                    next_hop = args[5]
                     metric = 1 # Valor por defecto
 
                     # Validar IP y máscara (simplificado)
-                    if not self._validar_ip(prefix) or not self._validar_ip(mask) or not self._validar_ip(next_hop):
+                    if not self._validar_ip(prefix) or longitud_mascara(mask) is None or not self._validar_ip(next_hop):
                         error_logger.registrar_error("SyntaxError", "Formato de IP/máscara/next-hop inválido.", comando_completo)
                         return False, "Error: Formato de IP/máscara/next-hop inválido."
 
-                    if len(args) >= 9 and args[7] == "metric":
+                    if len(args) >= 8 and args[6] == "metric":
                         try:
-                            metric = int(args[8])
+                            metric = int(args[7])
                         except ValueError:
                             error_logger.registrar_error("SyntaxError", "Métrica debe ser un número entero.", comando_completo)
                             return False, "Error: Métrica debe ser un número entero."
 
-                    dispositivo.tabla_rutas_avl.insertar(prefix, mask, next_hop, metric)
+                    if not dispositivo.tabla_rutas_avl.insertar(prefix, mask, next_hop, metric):
+                        error_logger.registrar_error("ConfigError", f"La ruta {prefix}/{mask} metric {metric} ya existe.", comando_completo)
+                        return False, f"Error: La ruta {prefix}/{mask} metric {metric} ya existe.\n"
                     return False, f"Ruta {prefix}/{mask} via {next_hop} metric {metric} añadida.\n"
                 error_logger.registrar_error("SyntaxError", "Uso: ip route add <prefix> <mask> via <next-hop> [metric N]", comando_completo)
                 return False, "Uso: ip route add <prefix> <mask> via <next-hop> [metric N]"
@@ -376,18 +580,67 @@ Comandos disponibles:
                     prefix = args[2]
                     mask = args[3]
                     
-                    if not self._validar_ip(prefix) or not self._validar_ip(mask):
+                    if not self._validar_ip(prefix) or longitud_mascara(mask) is None:
                         error_logger.registrar_error("SyntaxError", "Formato de IP/máscara inválido.", comando_completo)
                         return False, "Error: Formato de IP/máscara inválido."
 
-                    dispositivo.tabla_rutas_avl.eliminar(prefix, mask)
-                    return False, f"Ruta {prefix}/{mask} eliminada (si existía).\n"
+                    eliminadas = dispositivo.tabla_rutas_avl.eliminar(prefix, mask)
+                    return False, f"Ruta {prefix}/{mask} eliminada ({eliminadas} entradas).\n"
                 error_logger.registrar_error("SyntaxError", "Uso: ip route del <prefix> <mask>", comando_completo)
                 return False, "Uso: ip route del <prefix> <mask>"
             
+            elif args[1] == "import":
+                # ip route import <archivo>
+                if len(args) == 3:
+                    lineas_invalidas = []
+                    try:
+                        cargadas, descartadas = dispositivo.tabla_rutas_avl.cargar_masivo(
+                            leer_rutas_desde_archivo(args[2], lineas_invalidas))
+                    except OSError as e:
+                        error_logger.registrar_error("FileError", f"No se pudo leer '{args[2]}': {e}", comando_completo)
+                        return False, f"Error: No se pudo leer '{args[2]}'.\n"
+                    descartadas += len(lineas_invalidas)
+                    if descartadas:
+                        error_logger.registrar_error("ConfigError", f"{descartadas} rutas descartadas al importar '{args[2]}' (inválidas o duplicadas).", comando_completo)
+                    return False, f"[OK] {cargadas} rutas importadas desde {args[2]} ({descartadas} descartadas).\n"
+                error_logger.registrar_error("SyntaxError", "Uso: ip route import <archivo>", comando_completo)
+                return False, "Uso: ip route import <archivo>"
+
             error_logger.registrar_error("SyntaxError", "Comando 'ip route' no válido.", comando_completo)
             return False, "Error: Comando 'ip route' no válido."
 
+        elif cmd == "ip" and len(args) >= 1 and args[0] == "cache":
+            # ip cache size <N>
+            if not isinstance(dispositivo, Router):
+                error_logger.registrar_error("TypeError", "Este dispositivo no es un router y no tiene caché de búsqueda.", comando_completo)
+                return False, "Error: Este dispositivo no es un router."
+            if len(args) == 3 and args[1] == "size" and args[2].isdigit() and int(args[2]) > 0:
+                dispositivo.cache_busqueda.redimensionar(int(args[2]))
+                return False, f"Capacidad de la caché de búsqueda: {args[2]} entradas.\n"
+            error_logger.registrar_error("SyntaxError", "Uso: ip cache size <N>", comando_completo)
+            return False, "Uso: ip cache size <N>"
+
+        elif cmd == "link" and len(args) >= 1 and args[0] == "import":
+            # link import <archivo> [create-interfaces]
+            if len(args) == 2 or (len(args) == 3 and args[2] == "create-interfaces"):
+                lineas_invalidas = []
+                try:
+                    resultado = self.red.conectar_masivo(
+                        leer_enlaces_desde_archivo(args[1], lineas_invalidas),
+                        crear_interfaces=len(args) == 3, origen=comando_completo)
+                except OSError as e:
+                    error_logger.registrar_error("FileError", f"No se pudo leer '{args[1]}': {e}", comando_completo)
+                    return False, f"Error: No se pudo leer '{args[1]}'.\n"
+                if lineas_invalidas:
+                    error_logger.registrar_error("SyntaxError", f"{len(lineas_invalidas)} líneas mal formadas en '{args[1]}' (primera: {lineas_invalidas[0]}).", comando_completo)
+                descartados = sum(resultado["descartados"].values()) + len(lineas_invalidas)
+                detalle = ", ".join(f"{motivo}: {cantidad}" for motivo, cantidad in resultado["descartados"].items())
+                return False, (f"[OK] {resultado['conectados']} enlaces conectados desde {args[1]} "
+                               f"({resultado['existentes']} ya existían, {descartados} descartados"
+                               + (f"; {detalle}" if detalle else "") + ").\n")
+            error_logger.registrar_error("SyntaxError", "Uso: link import <archivo> [create-interfaces]", comando_completo)
+            return False, "Uso: link import <archivo> [create-interfaces]"
+
         # --- Módulo 3: Trie (Comandos de Política) ---
         elif cmd == "policy" and len(args) >= 2:
             if not isinstance(dispositivo, Router):
@@ -442,7 +695,7 @@ Comandos disponibles:
                         error_logger.registrar_error("SyntaxError", "Máscara de subred inválida.", comando_completo)
                         return False, "Error: Máscara de subred inválida."
 
-                    dispositivo.trie_politicas.eliminar_prefijo(prefix, mask_length) # Esto solo desmarca el fin de prefijo
+                    dispositivo.trie_politicas.eliminar_prefijo(prefix, mask_length)
                     return False, f"Política para {prefix}/{mask} eliminada (si existía).\n"
                 error_logger.registrar_error("SyntaxError", "Uso: policy unset <prefix> <mask>", comando_completo)
                 return False, "Uso: policy unset <prefix> <mask>"
@@ -457,10 +710,44 @@ Comandos disponibles:
             # En un sistema real, aquí se guardaría la configuración actual a un archivo
             # y se obtendría un puntero/nombre de archivo.
             # Por ahora, solo se simula el guardado y se indexa.
-            file_name = f"snap_{len(self.red.b_tree_snapshots.recorrer_en_orden()) + 1:05d}.cfg"
-            self.red.b_tree_snapshots.insertar(key, file_name)
+            try:
+                file_name = self.red.guardar_snapshot(key)
+            except ValueError as e: # Clave demasiado larga para una página del índice en disco
+                error_logger.registrar_error("ConfigError", f"No se pudo indexar el snapshot '{key}': {e}", comando_completo)
+                return False, f"Error: No se pudo indexar el snapshot '{key}'.\n"
             return False, f"[OK] snapshot {key} -> file: {file_name} (indexed)\n"
 
+        elif cmd == "snapshot-index" and len(args) == 2 and args[0] == "file":
+            # snapshot-index file <archivo>
+            try:
+                indice = self.red.usar_indice_disco(args[1])
+            except (OSError, ValueError) as e:
+                error_logger.registrar_error("FileError", f"No se pudo abrir el índice de snapshots '{args[1]}': {e}", comando_completo)
+                return False, f"Error: No se pudo abrir el índice de snapshots '{args[1]}'.\n"
+            return False, f"[OK] Índice de snapshots en {args[1]} ({indice.tamano()} snapshots, {indice.paginas} páginas).\n"
+
+        elif cmd == "delete" and len(args) == 2 and args[0] == "snapshot":
+            # delete snapshot <key>
+            if self.red.eliminar_snapshot(args[1]):
+                return False, f"[OK] snapshot {args[1]} eliminado.\n"
+            error_logger.registrar_error("ConfigError", f"Snapshot con clave '{args[1]}' no encontrado.", comando_completo)
+            return False, f"Error: Snapshot con clave '{args[1]}' no encontrado.\n"
+
+        elif cmd == "prune" and len(args) >= 1 and args[0] == "snapshots":
+            # prune snapshots keep <N>
+            # prune snapshots older-than <N>[s|m|h|d]
+            if len(args) == 3 and args[1] == "keep" and args[2].isdigit():
+                eliminadas = self.red.podar_snapshots(mantener=int(args[2]))
+            elif len(args) == 3 and args[1] == "older-than" and self._parsear_duracion(args[2]) is not None:
+                eliminadas = self.red.podar_snapshots(antiguedad=self._parsear_duracion(args[2]))
+            else:
+                error_logger.registrar_error("SyntaxError", "Uso: prune snapshots keep <N> | older-than <N>[s|m|h|d]", comando_completo)
+                return False, "Uso: prune snapshots keep <N> | older-than <N>[s|m|h|d]"
+            stats = self.red.b_tree_snapshots.obtener_stats()
+            return False, (f"[OK] {len(eliminadas)} snapshots eliminados"
+                           + (f" ({', '.join(eliminadas)})" if 0 < len(eliminadas) <= 10 else "")
+                           + f". Índice: altura {stats['altura']}, {stats['nodos']} nodos.\n")
+
         elif cmd == "load" and len(args) >= 2 and args[0] == "config":
             # load config <key>
             key = args[1]
@@ -484,27 +771,64 @@ Comandos disponibles:
         intf = disp.interfaces[self.contexto["interfaz_actual"]]
 
         if cmd == "ip" and len(args) >= 2 and args[0] == "address":
+            # ip address <IP> [<MASK>]
             ip_address = args[1]
             if not self._validar_ip(ip_address):
                 error_logger.registrar_error("SyntaxError", "Formato de dirección IP inválido.", comando_completo)
                 return False, "Error: Formato de dirección IP inválido."
+            longitud = longitud_mascara(args[2]) if len(args) >= 3 else None
+            if len(args) >= 3 and longitud is None:
+                error_logger.registrar_error("SyntaxError", "Máscara inválida.", comando_completo)
+                return False, "Error: Máscara inválida."
             
-            intf.ip = ip_address
-            intf.estado = True # Asume que al asignar IP, la interfaz se activa
-            return False, f"\nDirección IP {ip_address} asignada a {self.contexto['interfaz_actual']}\n"
+            # Al asignar IP, la interfaz se activa y la IP queda en los índices de la red
+            exito, msg = self.red.asignar_ip(self.contexto["dispositivo"], intf.nombre, ip_address, longitud)
+            return False, f"\n{msg}\n"
+
+        elif cmd == "no" and len(args) == 2 and args[0] == "ip" and args[1] == "address":
+            exito, msg = self.red.quitar_ip(self.contexto["dispositivo"], intf.nombre)
+            return False, f"\n{msg}\n"
 
         elif cmd == "shutdown":
-            intf.estado = False
-            return False, f"\nInterfaz {self.contexto['interfaz_actual']} DESACTIVADA (shutdown)\n"
+            exito, msg = self.red.establecer_estado_interfaz(self.contexto["dispositivo"], intf.nombre, False)
+            return False, f"\n{msg}\n"
 
         elif cmd == "no" and len(args) == 1 and args[0] == "shutdown":
-            intf.estado = True
-            return False, f"\nInterfaz {self.contexto['interfaz_actual']} ACTIVADA (no shutdown)\n"
+            exito, msg = self.red.establecer_estado_interfaz(self.contexto["dispositivo"], intf.nombre, True)
+            return False, f"\n{msg}\n"
+
+        elif cmd == "cost" and len(args) == 1 and args[0].isdigit():
+            exito, msg = self.red.establecer_costo_interfaz(self.contexto["dispositivo"], intf.nombre, int(args[0]))
+            return False, f"\n{msg}\n"
+
+        elif cmd == "latency" and len(args) == 1 and args[0].replace(".", "", 1).isdigit():
+            exito, msg = self.red.configurar_enlace(self.contexto["dispositivo"], intf.nombre, latencia=float(args[0]) / 1000)
+            return False, f"\n{msg}\n"
+
+        elif cmd == "bandwidth" and len(args) == 1 and args[0].isdigit() and int(args[0]) > 0:
+            exito, msg = self.red.configurar_enlace(self.contexto["dispositivo"], intf.nombre, ancho_banda=int(args[0]) * 1000)
+            return False, f"\n{msg}\n"
 
         error_logger.registrar_error("SyntaxError", "Comando no válido en modo interfaz.", comando_completo)
         return False, "Error: Comando no válido. Escriba 'help' para ayuda"
 
     # --- Funciones de utilidad para validación ---
+    def _parsear_instante(self, texto):
+        """Convierte un instante en segundos epoch o ISO 8601 (2024-05-01T10:00:00) a segundos epoch."""
+        try:
+            return float(texto)
+        except ValueError:
+            return datetime.fromisoformat(texto).timestamp()
+
+    def _parsear_duracion(self, texto):
+        """Convierte una duración como 90, 90s, 15m, 12h o 7d a segundos; None si es inválida."""
+        unidades = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+        factor = unidades.get(texto[-1:], None)
+        numero = texto[:-1] if factor else texto
+        if not numero.isdigit():
+            return None
+        return int(numero) * (factor or 1)
+
     def _validar_ip(self, ip_str):
         """Valida si una cadena es una dirección IP válida (IPv4 simple)."""
         pattern = r"^(?:[0-9]{1,3}\.){3}[0-9]{1,3}$"
@@ -1,23 +1,61 @@
 # Dispositivos.py
-from Arboles import AVLTree, Trie # Importar las nuevas estructuras de árboles
+from Arboles import AVLTree, TrieComprimido # Importar las nuevas estructuras de árboles
+from Reenvio import FIB, CacheBusqueda, TablaPoliticas
+from collections import deque
 
 class Interfaz:
     """Representa una interfaz de red en un dispositivo."""
     def __init__(self, nombre):
         self.nombre = nombre
         self.ip = None
+        self.mascara = None # Longitud de prefijo de la subred conectada (None = solo la dirección)
         self.estado = False  # False = shutdown (inactiva), True = no shutdown (activa)
-        self.conexiones = [] # Lista de tuplas (nombre_dispositivo_remoto, nombre_interfaz_remota)
+        self.costo = 1 # Costo del enlace saliente por esta interfaz (para caminos de menor costo)
+        self.latencia = 0.001 # Retardo de propagación del enlace saliente, en segundos
+        self.ancho_banda = 1_000_000_000 # Velocidad del enlace saliente, en bits por segundo
+        self.conexiones = {} # Conexiones {(nombre_dispositivo_remoto, nombre_interfaz_remota): Enlace}
 
-    def conectar(self, dispositivo_remoto_nombre, interfaz_remota_nombre):
-        """Añade una conexión a esta interfaz."""
-        if (dispositivo_remoto_nombre, interfaz_remota_nombre) not in self.conexiones:
-            self.conexiones.append((dispositivo_remoto_nombre, interfaz_remota_nombre))
+    def conectar(self, dispositivo_remoto_nombre, interfaz_remota_nombre, enlace=None):
+        """Añade una conexión a esta interfaz (si ya existía, actualiza su enlace)."""
+        self.conexiones[(dispositivo_remoto_nombre, interfaz_remota_nombre)] = enlace
     
     def desconectar(self, dispositivo_remoto_nombre, interfaz_remota_nombre):
         """Elimina una conexión de esta interfaz."""
-        if (dispositivo_remoto_nombre, interfaz_remota_nombre) in self.conexiones:
-            self.conexiones.remove((dispositivo_remoto_nombre, interfaz_remota_nombre))
+        self.conexiones.pop((dispositivo_remoto_nombre, interfaz_remota_nombre), None)
+
+class Enlace:
+    """
+    Enlace bidireccional entre dos interfaces. Los extremos se guardan en orden canónico,
+    de modo que `clave` es la misma sin importar en qué sentido se haya conectado.
+    """
+    __slots__ = ("extremo_a", "extremo_b")
+
+    def __init__(self, disp1_nombre, int1_nombre, disp2_nombre, int2_nombre):
+        extremo_1 = (disp1_nombre, int1_nombre)
+        extremo_2 = (disp2_nombre, int2_nombre)
+        if extremo_2 < extremo_1:
+            extremo_1, extremo_2 = extremo_2, extremo_1
+        self.extremo_a = extremo_1 # (nombre_dispositivo, nombre_interfaz)
+        self.extremo_b = extremo_2
+
+    @staticmethod
+    def clave_de(disp1_nombre, int1_nombre, disp2_nombre, int2_nombre):
+        """Retorna la clave canónica del enlace entre dos interfaces, sin crear el objeto."""
+        extremo_1 = (disp1_nombre, int1_nombre)
+        extremo_2 = (disp2_nombre, int2_nombre)
+        return (extremo_1, extremo_2) if extremo_1 <= extremo_2 else (extremo_2, extremo_1)
+
+    @property
+    def clave(self):
+        """Clave del enlace en Red.enlaces: ((disp_a, intf_a), (disp_b, intf_b))."""
+        return (self.extremo_a, self.extremo_b)
+
+    def otro_extremo(self, disp_nombre, intf_nombre):
+        """Retorna el extremo opuesto al indicado."""
+        return self.extremo_b if (disp_nombre, intf_nombre) == self.extremo_a else self.extremo_a
+
+    def __repr__(self):
+        return f"Enlace({self.extremo_a[0]}:{self.extremo_a[1]} <-> {self.extremo_b[0]}:{self.extremo_b[1]})"
 
 class Dispositivo:
     """Clase base para todos los dispositivos de red."""
@@ -27,7 +65,7 @@ class Dispositivo:
         self.interfaces = {} # Diccionario de interfaces por nombre
         self.estado = True  # True = encendido, False = apagado
         self.historial = []  # Para logs de actividad específicos del dispositivo
-        self.cola_paquetes = [] # Cola de paquetes pendientes para procesamiento
+        self.cola_paquetes = deque() # Cola FIFO de paquetes pendientes de procesar (usada por Simulacion)
 
     def agregar_interfaz(self, nombre):
         """Agrega una nueva interfaz al dispositivo si no existe."""
@@ -44,8 +82,11 @@ class Router(Dispositivo):
     """Representa un dispositivo Router."""
     def __init__(self, nombre):
         super().__init__(nombre, "router")
-        self.tabla_rutas_avl = AVLTree() # Módulo 1: Tabla de enrutamiento con AVL
-        self.trie_politicas = Trie()     # Módulo 3: Trie para prefijos IP y políticas
+        self.tabla_rutas_avl = AVLTree() # Módulo 1: Tabla de enrutamiento con AVL (RIB, plano de control)
+        self.fib = FIB(self.tabla_rutas_avl) # Tabla de reenvío compilada desde la RIB (plano de datos)
+        self.trie_politicas = TrieComprimido() # Módulo 3: Trie (Patricia) para prefijos IP y políticas
+        self.cache_busqueda = CacheBusqueda(self.fib, self.trie_politicas) # Caché LRU de destino -> (next_hop, políticas)
+        self.tabla_politicas = TablaPoliticas(self.trie_politicas) # Políticas compiladas para el envío en lote
         # self.bst_arp = BST() # Placeholder: Si se implementa un BST para ARP
 
 class Switch(Dispositivo):
@@ -1,50 +1,427 @@
 # Errores.py
+import json
+import mmap
+import os
+import time
+from collections import deque
 from datetime import datetime
 from Estructuras import Cola
 
+class EntradaError:
+    """
+    Un error registrado. Los instantes se guardan como segundos epoch y solo se formatean
+    al mostrarlos. Si el mismo error se repite dentro de la ventana de agregación del registro,
+    se reutiliza la entrada: aumenta `repeticiones` y se actualiza `ultima_vez`.
+    Admite acceso por clave como el diccionario que reemplaza: e['timestamp'], e['tipo'],
+    e['mensaje'], e['comando'], e['repeticiones'], e['primera_vez'], e['ultima_vez'].
+    """
+    __slots__ = ("tipo", "mensaje", "comando", "primera_vez", "ultima_vez", "repeticiones")
+
+    def __init__(self, tipo, mensaje, comando, instante):
+        self.tipo = tipo
+        self.mensaje = mensaje
+        self.comando = comando
+        self.primera_vez = instante
+        self.ultima_vez = instante
+        self.repeticiones = 1
+
+    @staticmethod
+    def formatear(instante):
+        """Convierte un instante epoch en texto ISO 8601 (hora local)."""
+        return datetime.fromtimestamp(instante).isoformat()
+
+    @property
+    def timestamp(self):
+        """Instante de la primera aparición, formateado."""
+        return self.formatear(self.primera_vez)
+
+    def __getitem__(self, clave):
+        if clave in ("timestamp", "tipo", "mensaje", "comando", "repeticiones"):
+            return getattr(self, clave)
+        if clave in ("primera_vez", "ultima_vez"):
+            return self.formatear(getattr(self, clave))
+        raise KeyError(clave)
+
+    def a_registro(self):
+        """Retorna la entrada como diccionario con los instantes en segundos epoch (formato en disco)."""
+        return {"tipo": self.tipo, "mensaje": self.mensaje, "comando": self.comando,
+                "primera_vez": self.primera_vez, "ultima_vez": self.ultima_vez, "repeticiones": self.repeticiones}
+
+    @classmethod
+    def desde_registro(cls, datos):
+        """Reconstruye una entrada a partir de a_registro()."""
+        entrada = cls(datos["tipo"], datos["mensaje"], datos["comando"], datos["primera_vez"])
+        entrada.ultima_vez = datos["ultima_vez"]
+        entrada.repeticiones = datos["repeticiones"]
+        return entrada
+
+    def a_dict(self):
+        """Retorna la entrada como diccionario con los instantes formateados."""
+        return {clave: self[clave] for clave in ("timestamp", "tipo", "mensaje", "comando",
+                                                 "repeticiones", "primera_vez", "ultima_vez")}
+
+class SegmentosErrores:
+    """
+    Almacén en disco, solo de anexado, de entradas de error: archivos JSONL numerados
+    (errores-000001.jsonl, errores-000002.jsonl, ...) que rotan al superar `tam_segmento` bytes.
+    Cada segmento tiene un índice (errores-NNNNNN.idx): una primera línea con su resumen
+    (cantidad de entradas, rango de instantes y entradas por tipo) y una línea por tipo con
+    los desplazamientos de sus líneas. En memoria se guardan solo los resúmenes, más los
+    desplazamientos del segmento activo; los de los segmentos cerrados se leen de su índice
+    al filtrar por tipo. El filtrado salta los segmentos cuyo resumen no puede coincidir, y
+    las lecturas se hacen sobre mmap. Las escrituras se acumulan en un buffer de `tam_buffer` líneas.
+    """
+    PREFIJO = "errores-"
+
+    def __init__(self, directorio, tam_segmento=4 * 1024 * 1024, tam_buffer=256, max_segmentos=None):
+        """
+        Args:
+            directorio (str): Carpeta de los segmentos (se crea si no existe).
+            tam_segmento (int): Bytes a partir de los cuales se rota al siguiente segmento.
+            tam_buffer (int): Líneas acumuladas en memoria antes de escribir al archivo.
+            max_segmentos (int, optional): Segmentos a conservar; los más antiguos se borran al rotar.
+        """
+        os.makedirs(directorio, exist_ok=True)
+        self.directorio = directorio
+        self.tam_segmento = tam_segmento
+        self.tam_buffer = tam_buffer
+        self.max_segmentos = max_segmentos
+        self.buffer = []
+        self.indices = [] # Resumen de cada segmento, del más antiguo al activo
+        self.desplazamientos = {} # {tipo: [desplazamientos]} del segmento activo
+        numeros = sorted(int(nombre[len(self.PREFIJO):-6]) for nombre in os.listdir(directorio)
+                         if nombre.startswith(self.PREFIJO) and nombre.endswith(".jsonl"))
+        for numero in numeros:
+            self.indices.append(self._cargar_indice(numero))
+        if not self.indices or self.indices[-1]["bytes"] >= tam_segmento:
+            self.indices.append(self._indice_vacio(numeros[-1] + 1 if numeros else 1))
+        else:
+            self.desplazamientos = self._cargar_desplazamientos(self.indices[-1])
+        self._f = open(self._ruta(self.indices[-1]["numero"]), "ab")
+
+    def _ruta(self, numero, extension=".jsonl"):
+        return os.path.join(self.directorio, f"{self.PREFIJO}{numero:06d}{extension}")
+
+    @staticmethod
+    def _indice_vacio(numero):
+        return {"numero": numero, "bytes": 0, "entradas": 0, "desde": None, "hasta": None, "tipos": {}}
+
+    @staticmethod
+    def _indexar(indice, desplazamientos, datos, desplazamiento, largo):
+        """Agrega una línea (ya decodificada) al resumen y a los desplazamientos de su segmento."""
+        tipo = datos["tipo"]
+        indice["tipos"][tipo] = indice["tipos"].get(tipo, 0) + 1
+        desplazamientos.setdefault(tipo, []).append(desplazamiento)
+        indice["entradas"] += 1
+        indice["bytes"] = desplazamiento + largo
+        if indice["desde"] is None or datos["primera_vez"] < indice["desde"]:
+            indice["desde"] = datos["primera_vez"]
+        if indice["hasta"] is None or datos["ultima_vez"] > indice["hasta"]:
+            indice["hasta"] = datos["ultima_vez"]
+
+    def _cargar_indice(self, numero):
+        """
+        Retorna el resumen de un segmento leyendo solo la primera línea de su índice. Si el
+        índice falta o no coincide con el segmento, lo reconstruye recorriéndolo y lo guarda.
+        """
+        tamano = os.path.getsize(self._ruta(numero))
+        try:
+            with open(self._ruta(numero, ".idx"), "r", encoding="utf-8") as f:
+                indice = json.loads(f.readline())
+            if indice["bytes"] == tamano:
+                if any(isinstance(n, list) for n in indice["tipos"].values()):
+                    # Índice de una sola línea con los desplazamientos dentro del resumen
+                    desplazamientos = indice["tipos"]
+                    indice["tipos"] = {tipo: len(lista) for tipo, lista in desplazamientos.items()}
+                    self._guardar_indice(indice, desplazamientos)
+                return indice
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        indice = self._indice_vacio(numero)
+        desplazamientos = {}
+        with open(self._ruta(numero), "rb") as f:
+            desplazamiento = 0
+            for linea in f:
+                if not linea.endswith(b"\n"):
+                    break
+                self._indexar(indice, desplazamientos, json.loads(linea), desplazamiento, len(linea))
+                desplazamiento += len(linea)
+        if indice["bytes"] < tamano: # Línea final incompleta de una escritura interrumpida
+            os.truncate(self._ruta(numero), indice["bytes"])
+        self._guardar_indice(indice, desplazamientos)
+        return indice
+
+    def _cargar_desplazamientos(self, indice, tipo=None):
+        """
+        Lee del índice de un segmento los desplazamientos de `tipo` (solo esa línea se
+        decodifica) o, si es None, los de todos sus tipos como {tipo: [desplazamientos]}.
+        """
+        with open(self._ruta(indice["numero"], ".idx"), "r", encoding="utf-8") as f:
+            f.readline() # Resumen
+            if tipo is not None:
+                for actual in indice["tipos"]:
+                    linea = f.readline()
+                    if actual == tipo:
+                        return json.loads(linea)
+                return []
+            return {actual: json.loads(f.readline()) for actual in indice["tipos"]}
+
+    def escribir(self, entrada):
+        """Anexa una EntradaError al segmento activo, rotando si supera el tamaño máximo."""
+        datos = entrada.a_registro()
+        linea = (json.dumps(datos, ensure_ascii=False) + "\n").encode("utf-8")
+        indice = self.indices[-1]
+        self._indexar(indice, self.desplazamientos, datos, indice["bytes"], len(linea))
+        self.buffer.append(linea)
+        if len(self.buffer) >= self.tam_buffer:
+            self.vaciar()
+        if indice["bytes"] >= self.tam_segmento:
+            self.rotar()
+
+    def vaciar(self):
+        """Escribe las líneas pendientes en el segmento activo."""
+        if self.buffer:
+            self._f.write(b"".join(self.buffer))
+            self._f.flush()
+            self.buffer = []
+
+    def rotar(self):
+        """Cierra el segmento activo guardando su índice y abre uno nuevo."""
+        self.vaciar()
+        self._f.close()
+        self._guardar_indice(self.indices[-1], self.desplazamientos)
+        self.indices.append(self._indice_vacio(self.indices[-1]["numero"] + 1))
+        self.desplazamientos = {}
+        self._f = open(self._ruta(self.indices[-1]["numero"]), "ab")
+        if self.max_segmentos is not None:
+            while len(self.indices) > self.max_segmentos:
+                antiguo = self.indices.pop(0)
+                for extension in (".jsonl", ".idx"):
+                    try:
+                        os.remove(self._ruta(antiguo["numero"], extension))
+                    except FileNotFoundError:
+                        pass
+
+    def _guardar_indice(self, indice, desplazamientos):
+        """Escribe el resumen y, en el orden de sus tipos, una línea de desplazamientos por tipo."""
+        with open(self._ruta(indice["numero"], ".idx"), "w", encoding="utf-8") as f:
+            f.write(json.dumps(indice) + "\n")
+            for tipo in indice["tipos"]:
+                f.write(json.dumps(desplazamientos[tipo]) + "\n")
+
+    def _abrir(self, indice):
+        """Retorna un mmap de solo lectura del segmento, o None si está vacío."""
+        if indice["bytes"] == 0:
+            return None
+        with open(self._ruta(indice["numero"]), "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def entradas(self):
+        """Número de entradas guardadas en disco."""
+        return sum(indice["entradas"] for indice in self.indices)
+
+    def ultimos(self, cantidad):
+        """
+        Retorna las `cantidad` entradas más recientes (de la más antigua a la más nueva)
+        leyendo los segmentos desde el final, sin cargarlos completos.
+        """
+        self.vaciar()
+        lineas = []
+        for indice in reversed(self.indices):
+            if len(lineas) >= cantidad:
+                break
+            mapa = self._abrir(indice)
+            if mapa is None:
+                continue
+            with mapa:
+                fin = indice["bytes"] - 1 # Posición del salto de línea final
+                while fin > 0 and len(lineas) < cantidad:
+                    inicio = mapa.rfind(b"\n", 0, fin) + 1
+                    lineas.append(mapa[inicio:fin])
+                    fin = inicio - 1
+        return [EntradaError.desde_registro(json.loads(linea)) for linea in reversed(lineas)]
+
+    def filtrar(self, tipo=None, desde=None, hasta=None):
+        """
+        Recorre, en orden de escritura, las entradas de un tipo y/o activas en un rango de
+        instantes epoch [desde, hasta]. Se saltan los segmentos cuyo resumen no puede coincidir;
+        con `tipo` se leen solo sus líneas, y sin él se recorre el segmento línea a línea.
+        Yields:
+            EntradaError
+        """
+        self.vaciar()
+        for indice in list(self.indices):
+            if indice["entradas"] == 0 or (tipo is not None and tipo not in indice["tipos"]):
+                continue
+            if (desde is not None and indice["hasta"] < desde) or (hasta is not None and indice["desde"] > hasta):
+                continue
+            mapa = self._abrir(indice)
+            with mapa:
+                if tipo is not None:
+                    if indice is self.indices[-1]:
+                        desplazamientos = self.desplazamientos[tipo]
+                    else:
+                        desplazamientos = self._cargar_desplazamientos(indice, tipo)
+                    lineas = (mapa[d:mapa.find(b"\n", d)] for d in desplazamientos)
+                else:
+                    lineas = iter(mapa.readline, b"")
+                for linea in lineas:
+                    datos = json.loads(linea)
+                    if (desde is None or datos["ultima_vez"] >= desde) and (hasta is None or datos["primera_vez"] <= hasta):
+                        yield EntradaError.desde_registro(datos)
+
+    def cerrar(self):
+        """Escribe lo pendiente, guarda el índice del segmento activo y cierra el archivo."""
+        if not self._f.closed:
+            self.vaciar()
+            self._f.close()
+            self._guardar_indice(self.indices[-1], self.desplazamientos)
+
 class RegistroErrores:
-    """Clase para gestionar el registro cronológico de errores del simulador."""
-    def __init__(self):
-        self.cola_errores = Cola()
+    """
+    Clase para gestionar el registro cronológico de errores del simulador.
+    El registro es acotado: al superar `capacidad` entradas se desalojan las más antiguas.
+    Un error idéntico (mismo tipo, mensaje y comando) que se repite dentro de `ventana`
+    segundos desde su última aparición no crea una entrada nueva, sino que se acumula en
+    la existente. Los contadores por tipo cuentan todas las apariciones, incluidas las
+    acumuladas y las ya desalojadas. Con habilitar_disco, las entradas desalojadas no se
+    pierden: se vuelcan a un log segmentado en disco que se sigue consultando.
+    """
+    def __init__(self, capacidad=10000, ventana=60.0):
+        """
+        Args:
+            capacidad (int): Máximo de entradas guardadas.
+            ventana (float): Segundos durante los que un error repetido se acumula en la misma
+                             entrada; 0 desactiva la agregación.
+        """
+        self.capacidad = capacidad
+        self.ventana = ventana
+        self.cola_errores = Cola(capacidad, Cola.DESCARTAR_ANTIGUO)
+        self._recientes = {} # {(tipo, mensaje, comando): EntradaError} de las entradas aún guardadas
+        self.contadores = {} # {tipo: apariciones totales}
+        self.agregados = 0 # Apariciones acumuladas en una entrada existente
+        self.disco = None # SegmentosErrores donde se vuelcan las entradas desalojadas (ver habilitar_disco)
 
     def registrar_error(self, tipo_error, mensaje, comando_provocador=None):
         """
         Registra un nuevo error en la cola.
-        
+
         Args:
             tipo_error (str): Categoría del error (ej. "SyntaxError", "ConnectionError").
             mensaje (str): Descripción detallada del problema.
             comando_provocador (str, optional): El comando que causó el error. Defaults to None.
         """
-        error_info = {
-            "timestamp": datetime.now().isoformat(),
-            "tipo": tipo_error,
-            "mensaje": mensaje,
-            "comando": comando_provocador
-        }
-        self.cola_errores.encolar(error_info)
+        instante = time.time()
+        self.contadores[tipo_error] = self.contadores.get(tipo_error, 0) + 1
+        clave = (tipo_error, mensaje, comando_provocador)
+        entrada = self._recientes.get(clave)
+        if entrada is not None and instante - entrada.ultima_vez <= self.ventana:
+            entrada.repeticiones += 1
+            entrada.ultima_vez = instante
+            self.agregados += 1
+            return
+
+        if self.cola_errores.esta_llena():
+            # La cola desaloja el frente al encolar; olvidarlo también en el índice de recientes
+            desalojada = self.cola_errores.peek()
+            clave_desalojada = (desalojada.tipo, desalojada.mensaje, desalojada.comando)
+            if self._recientes.get(clave_desalojada) is desalojada:
+                del self._recientes[clave_desalojada]
+            if self.disco is not None:
+                self.disco.escribir(desalojada)
+        entrada = EntradaError(tipo_error, mensaje, comando_provocador, instante)
+        self.cola_errores.encolar(entrada)
+        self._recientes[clave] = entrada
         # Opcional: imprimir en consola para feedback inmediato
-        # print(f"ERROR REGISTRADO: [{error_info['timestamp']}] {tipo_error} - {mensaje}")
+        # print(f"ERROR REGISTRADO: [{entrada.timestamp}] {tipo_error} - {mensaje}")
 
     def obtener_errores(self, cantidad=None):
         """
-        Retorna una lista de errores registrados.
-        
+        Retorna una lista de errores registrados, del más antiguo al más reciente.
+        Si hay un almacén en disco y se piden más errores de los que hay en memoria,
+        los anteriores se leen del final de los segmentos.
+
         Args:
             cantidad (int, optional): Número máximo de errores recientes a retornar.
-                                      Si es None, retorna todos. Defaults to None.
+                                      Si es None, retorna todos los que están en memoria. Defaults to None.
         Returns:
-            list: Lista de diccionarios, cada uno representando un error.
+            list: Lista de EntradaError (accesibles por clave como diccionarios).
         """
         # Se obtienen los errores más recientes si se especifica una cantidad
         if cantidad is not None and cantidad > 0:
-            return self.cola_errores.items[-cantidad:]
+            recientes = self.cola_errores.ultimos(cantidad)
+            if self.disco is not None and len(recientes) < cantidad:
+                return self.disco.ultimos(cantidad - len(recientes)) + recientes
+            return recientes
         return self.cola_errores.items
 
+    def filtrar_errores(self, tipo=None, desde=None, hasta=None, cantidad=None):
+        """
+        Retorna los errores de un tipo y/o activos en un rango de tiempo, buscando en disco
+        (con los índices de los segmentos) y en memoria.
+
+        Args:
+            tipo (str, optional): Categoría del error.
+            desde, hasta (float, optional): Límites del rango en segundos epoch; una entrada
+                                            coincide si alguna de sus apariciones cae en él.
+            cantidad (int, optional): Quedarse solo con las `cantidad` coincidencias más recientes.
+        Returns:
+            list: Lista de EntradaError, de la más antigua a la más reciente.
+        """
+        resultado = deque(maxlen=cantidad if cantidad is not None and cantidad > 0 else None)
+        if self.disco is not None:
+            resultado.extend(self.disco.filtrar(tipo, desde, hasta))
+        resultado.extend(e for e in self.cola_errores
+                         if (tipo is None or e.tipo == tipo)
+                         and (desde is None or e.ultima_vez >= desde)
+                         and (hasta is None or e.primera_vez <= hasta))
+        return list(resultado)
+
+    def habilitar_disco(self, directorio, tam_segmento=4 * 1024 * 1024, tam_buffer=256, max_segmentos=None):
+        """
+        Activa el volcado a disco: las entradas que se desalojan de memoria se anexan a los
+        segmentos de `directorio` (ver SegmentosErrores), que se reabren si ya existían.
+        """
+        self.deshabilitar_disco()
+        self.disco = SegmentosErrores(directorio, tam_segmento, tam_buffer, max_segmentos)
+
+    def deshabilitar_disco(self):
+        """Cierra el almacén en disco; las entradas en memoria no se modifican."""
+        if self.disco is not None:
+            self.disco.cerrar()
+            self.disco = None
+
+    def cerrar(self):
+        """
+        Al terminar el programa: vuelca a disco las entradas que siguen en memoria (si hay
+        almacén en disco) y lo cierra. El registro queda vacío en memoria.
+        """
+        if self.disco is not None:
+            for entrada in self.cola_errores.desencolar_lote():
+                self.disco.escribir(entrada)
+            self._recientes = {}
+            self.deshabilitar_disco()
+
+    def obtener_stats(self):
+        """Retorna estadísticas del registro: ocupación, apariciones totales, acumuladas, desalojadas, por tipo y en disco."""
+        return {
+            "capacidad": self.capacidad,
+            "entradas": self.cola_errores.tamano(),
+            "total": sum(self.contadores.values()),
+            "agregados": self.agregados,
+            "desalojados": self.cola_errores.descartados,
+            "por_tipo": dict(self.contadores),
+            "en_disco": self.disco.entradas() if self.disco is not None else 0,
+            "segmentos": len(self.disco.indices) if self.disco is not None else 0
+        }
+
     def limpiar_errores(self):
         """Limpia todos los errores del registro."""
-        self.cola_errores = Cola()
+        self.cola_errores = Cola(self.capacidad, Cola.DESCARTAR_ANTIGUO)
+        self._recientes = {}
+        self.contadores = {}
+        self.agregados = 0
         print("Registro de errores limpiado.")
 
 # Instancia global para el registro de errores, accesible desde cualquier parte del código.
-error_logger = RegistroErrores()
\ No newline at end of file
+error_logger = RegistroErrores()
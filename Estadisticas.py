@@ -58,12 +58,12 @@ class Estadisticas:
         
         # Estadísticas del registro de errores
         from Errores import error_logger
-        errores = error_logger.obtener_errores()
+        errores = error_logger.obtener_errores(5)
         reporte.append("4. REGISTRO DE ERRORES:")
-        reporte.append(f"   - Número total de errores registrados: {len(errores)}")
+        reporte.append(f"   - Número total de errores registrados: {error_logger.obtener_stats()['total']}")
         if errores:
             reporte.append("   - Últimos 5 errores:")
-            for error in errores[-5:]:
+            for error in errores:
                 reporte.append(f"     [{error['timestamp']}] {error['tipo']}: {error['mensaje']}")
         reporte.append("")
         
@@ -76,12 +76,8 @@ class Estadisticas:
         return reporte_completo
     
     def _contar_conexiones(self):
-        """Cuenta el número total de conexiones en la red."""
-        total_conexiones = 0
-        for dispositivo in self.red.dispositivos.values():
-            for interfaz in dispositivo.interfaces.values():
-                total_conexiones += len(interfaz.conexiones)
-        return total_conexiones // 2  # Cada conexión se cuenta dos veces (bidireccional)
+        """Cuenta el número total de conexiones (enlaces bidireccionales) en la red."""
+        return len(self.red.enlaces)
 
     def mostrar_historial_reportes(self):
         """
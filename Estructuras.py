@@ -1,29 +1,99 @@
 # Estructuras.py
+import heapq
+from array import array
+from collections import deque
+from itertools import islice
 
 class NodoLista:
     """Representa un nodo en una lista enlazada."""
+    __slots__ = ("dato", "siguiente")
+
     def __init__(self, dato):
         self.dato = dato
         self.siguiente = None
 
+class NodoSalto(NodoLista):
+    """
+    Nodo de una ListaEnlazada indexable. Además de `siguiente` (nivel 0), guarda en `saltos`
+    los punteros de los niveles superiores: saltos[k - 1] es el siguiente nodo del nivel k,
+    que está 2**k posiciones más adelante. Es None si el nodo solo está en el nivel 0.
+    """
+    __slots__ = ("saltos",)
+
+    def __init__(self, dato, altura=1):
+        super().__init__(dato)
+        self.saltos = [None] * (altura - 1) if altura > 1 else None
+
 class ListaEnlazada:
-    """Implementación básica de una lista enlazada."""
-    def __init__(self):
+    """
+    Implementación básica de una lista enlazada con puntero al último nodo (agregar es O(1)).
+    En modo `indexable` es además una skip list determinista: el nodo de la posición p
+    (contando desde 1) participa en tantos niveles como ceros finales tiene p en binario más
+    uno, así que el nivel k une nodos separados por 2**k posiciones y obtener_por_indice
+    baja de nivel en nivel en O(log n).
+    """
+    __slots__ = ("cabeza", "cola", "longitud", "indexable", "_saltos_cabeza", "_ultimos")
+
+    def __init__(self, indexable=False):
         self.cabeza = None
+        self.cola = None # Último nodo
         self.longitud = 0
+        self.indexable = indexable
+        self._saltos_cabeza = [] # Primer nodo de cada nivel superior (índice k - 1)
+        self._ultimos = [] # Último nodo de cada nivel superior
 
     def agregar(self, dato):
         """Agrega un nuevo nodo al final de la lista."""
+        if self.indexable:
+            self._agregar_indexado(dato)
+            return
         nuevo = NodoLista(dato)
-        if not self.cabeza:
+        if self.cola is None:
             self.cabeza = nuevo
         else:
-            actual = self.cabeza
-            while actual.siguiente:
-                actual = actual.siguiente
-            actual.siguiente = nuevo
+            self.cola.siguiente = nuevo
+        self.cola = nuevo
         self.longitud += 1
 
+    def _agregar_indexado(self, dato):
+        """Agrega al final enlazando el nodo en todos los niveles que le corresponden."""
+        posicion = self.longitud + 1
+        altura = (posicion & -posicion).bit_length()
+        nuevo = NodoSalto(dato, altura)
+        if self.cola is None:
+            self.cabeza = nuevo
+        else:
+            self.cola.siguiente = nuevo
+        self.cola = nuevo
+        ultimos = self._ultimos
+        for k in range(altura - 1):
+            if k < len(ultimos):
+                ultimos[k].saltos[k] = nuevo
+                ultimos[k] = nuevo
+            else: # Primer nodo de un nivel nuevo
+                self._saltos_cabeza.append(nuevo)
+                ultimos.append(nuevo)
+        self.longitud = posicion
+
+    def extender(self, iterable):
+        """Agrega al final todos los elementos de un iterable, en orden."""
+        if self.indexable:
+            for dato in iterable:
+                self._agregar_indexado(dato)
+            return
+        cola = self.cola
+        agregados = 0
+        for dato in iterable:
+            nuevo = NodoLista(dato)
+            if cola is None:
+                self.cabeza = nuevo
+            else:
+                cola.siguiente = nuevo
+            cola = nuevo
+            agregados += 1
+        self.cola = cola
+        self.longitud += agregados
+
     def __iter__(self):
         """Permite iterar sobre los elementos de la lista."""
         actual = self.cabeza
@@ -31,49 +101,141 @@ class ListaEnlazada:
             yield actual.dato
             actual = actual.siguiente
 
+    def __len__(self):
+        return self.longitud
+
     def esta_vacia(self):
         """Verifica si la lista está vacía."""
         return self.cabeza is None
 
     def obtener_por_indice(self, indice):
-        """Obtiene el dato de un nodo por su índice."""
+        """
+        Obtiene el dato de un nodo por su índice.
+        Es O(log n) en modo indexable y O(n) en el modo básico (salvo para el último elemento).
+        """
         if indice < 0 or indice >= self.longitud:
             return None
+        if indice == self.longitud - 1:
+            return self.cola.dato
+        if self.indexable:
+            return self._nodo_indexado(indice + 1).dato
         actual = self.cabeza
         for _ in range(indice):
             actual = actual.siguiente
         return actual.dato
 
+    def _nodo_indexado(self, posicion):
+        """Retorna el nodo de la posición dada (desde 1) bajando por los niveles de la skip list."""
+        nodo = None # Antes de la cabeza (posición 0)
+        actual = 0
+        for k in range(len(self._saltos_cabeza), 0, -1):
+            paso = 1 << k
+            if actual + paso <= posicion:
+                siguiente = self._saltos_cabeza[k - 1] if nodo is None else nodo.saltos[k - 1]
+                if siguiente is not None:
+                    nodo = siguiente
+                    actual += paso
+        if nodo is None:
+            nodo = self.cabeza
+            actual = 1
+        while actual < posicion:
+            nodo = nodo.siguiente
+            actual += 1
+        return nodo
+
 class Cola:
     """
-    Implementación de una cola (FIFO).
-    Para simplificar, usa una lista de Python internamente.
-    Para una implementación estricta con lista enlazada, se usaría NodoLista.
+    Implementación de una cola (FIFO) sobre un buffer circular (collections.deque):
+    encolar, desencolar y peek son O(1).
+    Con `capacidad` la cola es acotada y `politica` decide qué pasa al encolar con la cola llena:
+    RECHAZAR descarta el elemento nuevo y DESCARTAR_ANTIGUO descarta el del frente.
     """
-    def __init__(self):
-        self.items = []
+    RECHAZAR = "rechazar"
+    DESCARTAR_ANTIGUO = "descartar_antiguo"
+
+    __slots__ = ("_items", "capacidad", "politica", "descartados")
+
+    def __init__(self, capacidad=None, politica=RECHAZAR):
+        """
+        Args:
+            capacidad (int, optional): Máximo de elementos; None = sin límite.
+            politica (str): Cola.RECHAZAR o Cola.DESCARTAR_ANTIGUO.
+        """
+        if politica not in (Cola.RECHAZAR, Cola.DESCARTAR_ANTIGUO):
+            raise ValueError(f"Política de desborde inválida: {politica!r}")
+        if capacidad is not None and capacidad < 1:
+            raise ValueError("La capacidad debe ser al menos 1")
+        self.capacidad = capacidad
+        self.politica = politica
+        self.descartados = 0 # Elementos perdidos por desborde (rechazados o desalojados)
+        # Con DESCARTAR_ANTIGUO el propio deque desaloja el frente al superar maxlen
+        self._items = deque(maxlen=capacidad if politica == Cola.DESCARTAR_ANTIGUO else None)
     
     def encolar(self, item):
-        """Añade un elemento al final de la cola."""
-        self.items.append(item)
+        """
+        Añade un elemento al final de la cola.
+        Returns:
+            bool: False si la cola estaba llena y el elemento fue rechazado.
+        """
+        if self.capacidad is not None and len(self._items) >= self.capacidad:
+            self.descartados += 1
+            if self.politica == Cola.RECHAZAR:
+                return False
+        self._items.append(item)
+        return True
     
     def desencolar(self):
         """Elimina y retorna el elemento del frente de la cola."""
-        if not self.esta_vacia():
-            return self.items.pop(0)
+        if self._items:
+            return self._items.popleft()
         return None
+
+    def desencolar_lote(self, cantidad=None):
+        """
+        Elimina y retorna hasta `cantidad` elementos del frente, en orden (todos si es None).
+        Returns:
+            list: Los elementos desencolados.
+        """
+        items = self._items
+        if cantidad is None or cantidad >= len(items):
+            lote = list(items)
+            items.clear()
+            return lote
+        popleft = items.popleft
+        return [popleft() for _ in range(max(cantidad, 0))]
+
+    def ultimos(self, cantidad):
+        """Retorna, sin quitarlos, los `cantidad` elementos más recientes (del más antiguo al más nuevo)."""
+        if cantidad >= len(self._items):
+            return list(self._items)
+        return list(islice(reversed(self._items), cantidad))[::-1]
     
     def esta_vacia(self):
         """Verifica si la cola está vacía."""
-        return len(self.items) == 0
+        return not self._items
+
+    def esta_llena(self):
+        """Verifica si la cola acotada alcanzó su capacidad."""
+        return self.capacidad is not None and len(self._items) >= self.capacidad
     
     def tamano(self):
         """Retorna el número de elementos en la cola."""
-        return len(self.items)
+        return len(self._items)
 
     def peek(self):
         """Retorna el elemento del frente sin eliminarlo."""
-        return self.items[0] if not self.esta_vacia() else None
+        return self._items[0] if self._items else None
+
+    @property
+    def items(self):
+        """Copia de los elementos, del frente al final (compatibilidad con la versión sobre lista)."""
+        return list(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
 
 class Pila:
     """Implementación de una pila (LIFO)."""
@@ -90,4 +252,157 @@ class Pila:
     
     def esta_vacia(self):
         """Verifica si la pila está vacía."""
-        return len(self.items) == 0
\ No newline at end of file
+        return len(self.items) == 0
+
+class GrafoCSR:
+    """
+    Grafo dirigido compacto en formato CSR (compressed sparse row) con ids enteros de nodo.
+    Las aristas que salen del nodo i ocupan las posiciones desplazamientos[i] a
+    desplazamientos[i + 1] - 1 de los arreglos paralelos vecinos, pesos, activas y etiquetas.
+    Es una instantánea inmutable: ante cualquier cambio se construye un grafo nuevo.
+    """
+    def __init__(self, nombres, aristas):
+        """
+        Args:
+            nombres (list): Nombre de cada nodo; su posición es su id.
+            aristas (list): Tuplas (origen_id, destino_id, peso, activa, etiqueta).
+        """
+        self.nombres = list(nombres)
+        self.ids = {nombre: i for i, nombre in enumerate(self.nombres)}
+        total = len(self.nombres)
+
+        # Ordenamiento por conteo de las aristas según su nodo de origen
+        grados = [0] * (total + 1)
+        for arista in aristas:
+            grados[arista[0] + 1] += 1
+        for i in range(total):
+            grados[i + 1] += grados[i]
+        self.desplazamientos = array('l', grados)
+        posiciones = grados[:-1]
+        vecinos = [0] * len(aristas)
+        pesos = [0.0] * len(aristas)
+        activas = [0] * len(aristas)
+        etiquetas = [None] * len(aristas)
+        for origen, destino, peso, activa, etiqueta in aristas:
+            k = posiciones[origen]
+            posiciones[origen] = k + 1
+            vecinos[k], pesos[k], activas[k], etiquetas[k] = destino, peso, activa, etiqueta
+        self.vecinos = array('l', vecinos)
+        self.pesos = array('d', pesos)
+        self.activas = bytearray(activas)
+        self.etiquetas = etiquetas
+
+    def cantidad_nodos(self):
+        """Retorna el número de nodos."""
+        return len(self.nombres)
+
+    def cantidad_aristas(self):
+        """Retorna el número de aristas dirigidas."""
+        return len(self.vecinos)
+
+    def vecinos_de(self, nodo, solo_activas=False):
+        """Retorna los ids de los vecinos de un nodo."""
+        inicio, fin = self.desplazamientos[nodo], self.desplazamientos[nodo + 1]
+        if not solo_activas:
+            return self.vecinos[inicio:fin]
+        return [self.vecinos[k] for k in range(inicio, fin) if self.activas[k]]
+
+    def bfs(self, origen, solo_activas=False):
+        """
+        Recorrido en anchura desde un nodo.
+        Returns:
+            tuple: (distancias, predecesores) - Listas indexadas por id; -1 si el nodo no es alcanzable
+                   (o, en predecesores, si es el origen).
+        """
+        total = len(self.nombres)
+        distancias = [-1] * total
+        predecesores = [-1] * total
+        distancias[origen] = 0
+        desplazamientos, vecinos, activas = self.desplazamientos, self.vecinos, self.activas
+        pendientes = deque([origen])
+        while pendientes:
+            nodo = pendientes.popleft()
+            siguiente_distancia = distancias[nodo] + 1
+            for k in range(desplazamientos[nodo], desplazamientos[nodo + 1]):
+                vecino = vecinos[k]
+                if distancias[vecino] < 0 and (activas[k] or not solo_activas):
+                    distancias[vecino] = siguiente_distancia
+                    predecesores[vecino] = nodo
+                    pendientes.append(vecino)
+        return distancias, predecesores
+
+    def dijkstra(self, origen, destino=None, solo_activas=False):
+        """
+        Caminos de menor costo desde un nodo (pesos no negativos).
+        Si se indica un destino, la búsqueda se detiene al alcanzarlo.
+        Returns:
+            tuple: (distancias, predecesores) - Listas indexadas por id; inf / -1 si no es alcanzable.
+        """
+        total = len(self.nombres)
+        distancias = [float("inf")] * total
+        predecesores = [-1] * total
+        distancias[origen] = 0.0
+        desplazamientos, vecinos, pesos, activas = self.desplazamientos, self.vecinos, self.pesos, self.activas
+        heap = [(0.0, origen)]
+        while heap:
+            distancia, nodo = heapq.heappop(heap)
+            if distancia > distancias[nodo]:
+                continue # Entrada obsoleta del heap
+            if nodo == destino:
+                break
+            for k in range(desplazamientos[nodo], desplazamientos[nodo + 1]):
+                if not activas[k] and solo_activas:
+                    continue
+                vecino = vecinos[k]
+                nueva = distancia + pesos[k]
+                if nueva < distancias[vecino]:
+                    distancias[vecino] = nueva
+                    predecesores[vecino] = nodo
+                    heapq.heappush(heap, (nueva, vecino))
+        return distancias, predecesores
+
+    def componentes(self):
+        """
+        Retorna las componentes conexas (ignorando la dirección y el estado de las aristas)
+        como listas de ids en orden de recorrido en anchura, de modo que los nodos cercanos
+        quedan contiguos.
+        """
+        total = len(self.nombres)
+        # Aristas inversas para tratar el grafo como no dirigido
+        entrantes = [[] for _ in range(total)]
+        desplazamientos, vecinos = self.desplazamientos, self.vecinos
+        for nodo in range(total):
+            for k in range(desplazamientos[nodo], desplazamientos[nodo + 1]):
+                entrantes[vecinos[k]].append(nodo)
+        visitado = bytearray(total)
+        componentes = []
+        for inicio in range(total):
+            if visitado[inicio]:
+                continue
+            visitado[inicio] = 1
+            orden = [inicio]
+            i = 0
+            while i < len(orden):
+                nodo = orden[i]
+                i += 1
+                for vecino in vecinos[desplazamientos[nodo]:desplazamientos[nodo + 1]]:
+                    if not visitado[vecino]:
+                        visitado[vecino] = 1
+                        orden.append(vecino)
+                for vecino in entrantes[nodo]:
+                    if not visitado[vecino]:
+                        visitado[vecino] = 1
+                        orden.append(vecino)
+            componentes.append(orden)
+        return componentes
+
+    @staticmethod
+    def reconstruir_camino(predecesores, origen, destino):
+        """Retorna la lista de ids desde origen hasta destino, o None si no hay camino."""
+        if origen != destino and predecesores[destino] < 0:
+            return None
+        camino = [destino]
+        while camino[-1] != origen:
+            camino.append(predecesores[camino[-1]])
+        camino.reverse()
+        return camino
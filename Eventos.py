@@ -0,0 +1,113 @@
+# Eventos.py
+"""
+Eventos estructurados del camino de reenvío de paquetes y sumideros que los reciben.
+Red emite un EventoReenvio por cada paso del procesamiento de un paquete; el sumidero
+configurado decide qué hacer con él (imprimirlo, guardarlo en memoria, escribirlo en un
+archivo JSONL o descartarlo). Los emisores consultan `sumidero.activo` antes de construir
+el evento, de modo que el sumidero nulo no tiene costo en el camino de reenvío.
+"""
+import json
+import time
+from collections import deque, namedtuple
+
+# Evento de reenvío: tipo de paso, dispositivo que lo produce, IP de destino y un dato adicional
+EventoReenvio = namedtuple("EventoReenvio", ["tipo", "dispositivo", "destino", "detalle", "instante"])
+
+def crear_evento(tipo, dispositivo, destino, detalle=None):
+    """Crea un EventoReenvio con el instante actual."""
+    return EventoReenvio(tipo, dispositivo, destino, detalle, time.time())
+
+class SumideroNulo:
+    """Descarta todos los eventos."""
+    activo = False
+
+    def emitir(self, evento):
+        """No hace nada."""
+        pass
+
+    def cerrar(self):
+        """No hace nada."""
+        pass
+
+class SumideroConsola:
+    """Imprime los eventos en consola con el formato clásico del simulador."""
+    activo = True
+
+    PLANTILLAS = {
+        "inicio": "\n--- Iniciando envío de paquete desde {dispositivo} a {destino} ---",
+        "consulta": "[{dispositivo}] Consultando políticas (Trie) y tabla de reenvío (FIB) para {destino}...",
+        "bloqueado": "[{dispositivo}] Paquete BLOQUEADO por política para {destino}.",
+        "ttl_min": "[{dispositivo}] Política 'ttl-min' de {detalle} aplicada.",
+        "ruta": "[{dispositivo}] Ruta encontrada: Siguiente salto via {detalle}.",
+        "sin_ruta": "[{dispositivo}] No hay ruta conocida para {destino}. Paquete descartado.",
+        "directo": "[{dispositivo}] {destino} está en un segmento conectado: entrega directa a {detalle}.",
+        "gateway": "[{dispositivo}] {destino} fuera del segmento local. Usando gateway {detalle}.",
+        "reenvio": "[{dispositivo}] Paquete reenviado hacia {detalle}...",
+        "descartado": "[{dispositivo}] Paquete para {destino} descartado ({detalle}).",
+        "entregado": "--- Paquete entregado a {destino} en {dispositivo} ({detalle} saltos) ---",
+    }
+
+    def emitir(self, evento):
+        """Imprime el evento usando la plantilla de su tipo."""
+        plantilla = self.PLANTILLAS.get(evento.tipo)
+        if plantilla is None:
+            print(f"[{evento.dispositivo}] {evento.tipo}: {evento.destino} {evento.detalle}")
+        else:
+            print(plantilla.format(**evento._asdict()))
+
+    def cerrar(self):
+        """No hace nada."""
+        pass
+
+class SumideroMemoria:
+    """Guarda los últimos eventos en un buffer circular de capacidad fija."""
+    activo = True
+
+    def __init__(self, capacidad=10000):
+        self.eventos = deque(maxlen=capacidad)
+
+    def emitir(self, evento):
+        """Agrega el evento al buffer, descartando el más antiguo si está lleno."""
+        self.eventos.append(evento)
+
+    def obtener_eventos(self, cantidad=None):
+        """Retorna los eventos guardados (los `cantidad` más recientes si se indica)."""
+        if cantidad is not None and cantidad > 0:
+            return list(self.eventos)[-cantidad:]
+        return list(self.eventos)
+
+    def cerrar(self):
+        """No hace nada."""
+        pass
+
+class SumideroJSONL:
+    """
+    Escribe los eventos como líneas JSON en un archivo.
+    Las líneas se acumulan en memoria y se escriben en bloques de `tam_buffer` eventos.
+    """
+    activo = True
+
+    def __init__(self, archivo, tam_buffer=1000):
+        self.archivo = archivo
+        self.tam_buffer = tam_buffer
+        self.buffer = []
+        self._f = open(archivo, "a", encoding="utf-8")
+
+    def emitir(self, evento):
+        """Agrega el evento al buffer y lo vacía al archivo si está lleno."""
+        self.buffer.append(evento)
+        if len(self.buffer) >= self.tam_buffer:
+            self.vaciar()
+
+    def vaciar(self):
+        """Escribe los eventos pendientes en el archivo."""
+        if self.buffer:
+            self._f.write("".join(json.dumps(evento._asdict(), default=str) + "\n" for evento in self.buffer))
+            self._f.flush()
+            self.buffer = []
+
+    def cerrar(self):
+        """Vacía los eventos pendientes y cierra el archivo."""
+        if not self._f.closed:
+            self.vaciar()
+            self._f.close()
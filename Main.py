@@ -3,15 +3,19 @@
 Punto de entrada principal del Simulador de Red LAN con CLI estilo router.
 Inicializa la red con datos por defecto y ejecuta el bucle de comandos.
 """
+import asyncio
+import sys
 from Red import Red
 from CLI import CLI
+from Simulacion import RedAsincrona
 from Errores import error_logger
 from Arboles import AVLTree, BTree, Trie
 from json import JSONEncoder, JSONDecoder
 
-def inicializar_red_con_datos_por_defecto():
+def inicializar_red_con_datos_por_defecto(indice_snapshots=None):
     """
     Inicializa la red con dispositivos, interfaces, rutas, políticas y snapshots por defecto para pruebas.
+    Si se indica `indice_snapshots`, el índice de snapshots se mantiene en ese archivo (BTreeDisco).
     """
     red = Red()
 
@@ -20,24 +24,23 @@ def inicializar_red_con_datos_por_defecto():
     red.agregar_dispositivo("router", "Router2")
     red.agregar_dispositivo("switch", "Switch1")
 
-    # Conectar dispositivos
-    red.conectar("Router1", "Gi0/0", "Switch1", "Fa0/1")
-    red.conectar("Router2", "Gi0/0", "Switch1", "Fa0/2")
-
-    # Añadir interfaces manualmente (si no se agregaron automáticamente)
+    # Añadir interfaces
     red.obtener_dispositivo("Router1").agregar_interfaz("Gi0/0")
     red.obtener_dispositivo("Router1").agregar_interfaz("Gi0/1")
     red.obtener_dispositivo("Router2").agregar_interfaz("Gi0/0")
     red.obtener_dispositivo("Switch1").agregar_interfaz("Fa0/1")
     red.obtener_dispositivo("Switch1").agregar_interfaz("Fa0/2")
 
-    # Asignar IPs y activar interfaces
-    red.obtener_dispositivo("Router1").interfaces["Gi0/0"].ip = "192.168.1.1"
-    red.obtener_dispositivo("Router1").interfaces["Gi0/0"].estado = True
-    red.obtener_dispositivo("Router1").interfaces["Gi0/1"].ip = "10.0.0.1"
-    red.obtener_dispositivo("Router1").interfaces["Gi0/1"].estado = True
-    red.obtener_dispositivo("Router2").interfaces["Gi0/0"].ip = "192.168.2.1"
-    red.obtener_dispositivo("Router2").interfaces["Gi0/0"].estado = True
+    # Conectar dispositivos (las interfaces deben existir antes de conectarlas)
+    red.conectar("Router1", "Gi0/0", "Switch1", "Fa0/1")
+    red.conectar("Router2", "Gi0/0", "Switch1", "Fa0/2")
+
+    # Asignar IPs (activa las interfaces y las registra en el índice de IPs de la red)
+    red.asignar_ip("Router1", "Gi0/0", "192.168.1.1", 24)
+    red.asignar_ip("Router1", "Gi0/1", "10.0.0.1", 8)
+    red.asignar_ip("Router2", "Gi0/0", "192.168.2.1", 24)
+    red.establecer_estado_interfaz("Switch1", "Fa0/1", True)
+    red.establecer_estado_interfaz("Switch1", "Fa0/2", True)
 
     # Añadir rutas por defecto en las tablas AVL de los routers
     router1 = red.obtener_dispositivo("Router1")
@@ -55,8 +58,10 @@ def inicializar_red_con_datos_por_defecto():
     router2.trie_politicas.insertar_prefijo("192.168.2.0", 24, {"ttl-min": 3})
 
     # Añadir snapshots por defecto en el B-Tree global
-    red.b_tree_snapshots.insertar("initial_config", "snap_00001.cfg")
-    red.b_tree_snapshots.insertar("updated_config", "snap_00002.cfg")
+    if indice_snapshots is not None:
+        red.usar_indice_disco(indice_snapshots)
+    red.guardar_snapshot("initial_config")
+    red.guardar_snapshot("updated_config")
 
     # Registrar algunos errores por defecto para pruebas
     error_logger.registrar_error("SyntaxError", "Comando de prueba inválido.", "test command")
@@ -64,7 +69,7 @@ def inicializar_red_con_datos_por_defecto():
 
     return red
 
-def main():
+def main(indice_snapshots=None):
     """
     Función principal: Inicializa la red, la CLI y ejecuta el bucle de comandos.
     """
@@ -73,7 +78,7 @@ def main():
     print("Escribe 'exit' para salir.\n")
 
     # Inicializar la red con datos por defecto
-    red = inicializar_red_con_datos_por_defecto()
+    red = inicializar_red_con_datos_por_defecto(indice_snapshots)
     cli = CLI(red)
 
     # Bucle principal de la CLI
@@ -92,5 +97,30 @@ def main():
             print("\n\n[Fin de entrada. Saliendo...] ")
             break
 
+async def main_asincrono(indice_snapshots=None):
+    """
+    Variante de main en la que cada dispositivo corre como tarea de asyncio (RedAsincrona)
+    y la CLI comparte el bucle de eventos; permite lanzar flujos con 'flow' sin bloquear.
+    """
+    print("Bienvenido al Simulador de Red LAN estilo Router! (modo asíncrono)")
+    print("Escribe 'help' para ver comandos disponibles, 'flow <origen> <destino_ip> <cantidad>' para lanzar un flujo.")
+    print("Escribe 'exit' para salir.\n")
+
+    red = inicializar_red_con_datos_por_defecto(indice_snapshots)
+    cli = CLI(red)
+    async with RedAsincrona(red) as runtime:
+        await runtime.consola(cli)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if "--error-log-dir" in sys.argv[1:-1]:
+        # Volcar a disco los errores desalojados de memoria (ver Errores.SegmentosErrores)
+        error_logger.habilitar_disco(sys.argv[sys.argv.index("--error-log-dir") + 1])
+    # Índice de snapshots en un archivo paginado que sobrevive a reinicios (ver Almacenamiento.BTreeDisco)
+    indice = sys.argv[sys.argv.index("--snapshot-index") + 1] if "--snapshot-index" in sys.argv[1:-1] else None
+    try:
+        if "--async" in sys.argv[1:]:
+            asyncio.run(main_asincrono(indice))
+        else:
+            main(indice)
+    finally:
+        error_logger.cerrar()
\ No newline at end of file
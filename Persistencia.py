@@ -3,11 +3,14 @@
 Módulo para guardar y cargar la configuración de la red en formato JSON.
 Incluye serialización de las estructuras de datos AVL, B-Tree, Trie y Cola de errores.
 """
+import csv
 import json
+import time
 from Red import Red
-from Dispositivos import Interfaz
+from Dispositivos import Interfaz, Dispositivo, Router, Switch, Host
 from Errores import RegistroErrores
-from Arboles import AVLTree, BTree, Trie
+from Arboles import AVLTree, BTree, Trie, TrieComprimido
+from Almacenamiento import BTreeDisco
 
 # Codificador/decodificador personalizado para objetos complejos
 class RedEncoder(json.JSONEncoder):
@@ -18,8 +21,37 @@ class RedEncoder(json.JSONEncoder):
                 "__class__": "Red",
                 "dispositivos": {k: self.default(v) for k, v in obj.dispositivos.items()},
                 "estadisticas": obj.estadisticas,
-                "b_tree_snapshots": self.default(obj.b_tree_snapshots)
+                "b_tree_snapshots": self.default(obj.b_tree_snapshots),
+                "snapshots_creados": obj.snapshots_creados,
+                "secuencia_snapshots": obj.secuencia_snapshots
             }
+        elif isinstance(obj, Dispositivo):
+            datos = {
+                "__class__": "Dispositivo",
+                "tipo": obj.tipo,
+                "nombre": obj.nombre,
+                "estado": obj.estado,
+                "interfaces": {k: self.default(v) for k, v in obj.interfaces.items()}
+            }
+            if isinstance(obj, Router):
+                datos["tabla_rutas_avl"] = self.default(obj.tabla_rutas_avl)
+                datos["trie_politicas"] = self.default(obj.trie_politicas)
+            return datos
+        elif isinstance(obj, Interfaz):
+            return {
+                "__class__": "Interfaz",
+                "nombre": obj.nombre,
+                "ip": obj.ip,
+                "mascara": obj.mascara,
+                "estado": obj.estado,
+                "costo": obj.costo,
+                "latencia": obj.latencia,
+                "ancho_banda": obj.ancho_banda,
+                "conexiones": [list(c) for c in obj.conexiones]
+            }
+        elif isinstance(obj, BTreeDisco):
+            # El índice ya está en su propio archivo: solo se guarda la ruta
+            return {"__class__": "BTreeDisco", "archivo": obj.archivo}
         elif isinstance(obj, BTree):
             return {
                 "__class__": "BTree",
@@ -28,6 +60,7 @@ class RedEncoder(json.JSONEncoder):
                 "nodos": obj.nodos,
                 "splits": obj.splits,
                 "merges": obj.merges,
+                "cantidad": obj.cantidad,
                 "raiz": self._serializar_btree_nodo(obj.raiz)
             }
         elif isinstance(obj, Trie):
@@ -35,6 +68,11 @@ class RedEncoder(json.JSONEncoder):
                 "__class__": "Trie",
                 "raiz": self._serializar_trie_nodo(obj.raiz)
             }
+        elif isinstance(obj, TrieComprimido):
+            return {
+                "__class__": "TrieComprimido",
+                "prefijos": [[prefix, longitud, politicas] for prefix, longitud, politicas in obj.recorrer_prefijos()]
+            }
         elif isinstance(obj, AVLTree):
             return {
                 "__class__": "AVLTree",
@@ -86,42 +124,80 @@ class RedDecoder(json.JSONDecoder):
     
     def object_hook(self, dct):
         if "__class__" in dct:
+            # json llama a object_hook de adentro hacia afuera: los objetos anidados ya están decodificados
             if dct["__class__"] == "Red":
                 red = Red()
-                red.dispositivos = {k: self.object_hook(v) for k, v in dct["dispositivos"].items()}
-                red.estadisticas = dct["estadisticas"]
-                # Restaurar B-Tree (simplificado)
-                red.b_tree_snapshots = BTree(dct["b_tree_snapshots"]["t"])
-                self._restaurar_btree_nodo(red.b_tree_snapshots.raiz, dct["b_tree_snapshots"]["raiz"])
+                red.dispositivos = dct["dispositivos"]
+                red.estadisticas.update(dct["estadisticas"])
+                red.reconstruir_indice_ips()
+                red.reconstruir_enlaces()
+                red.b_tree_snapshots = dct["b_tree_snapshots"]
+                if "snapshots_creados" in dct:
+                    red.snapshots_creados = dct["snapshots_creados"]
+                    red.secuencia_snapshots = dct["secuencia_snapshots"]
+                else: # Configuración anterior a la retención: se toman como creados al cargar
+                    ahora = time.time()
+                    red.snapshots_creados = {clave: ahora for clave, _ in red.b_tree_snapshots.recorrer_en_orden()}
+                    red.secuencia_snapshots = len(red.snapshots_creados)
                 return red
+            elif dct["__class__"] == "Dispositivo":
+                clases = {"router": Router, "switch": Switch, "host": Host}
+                disp = clases[dct["tipo"]](dct["nombre"])
+                disp.estado = dct["estado"]
+                disp.interfaces = dct["interfaces"]
+                if isinstance(disp, Router):
+                    # Cargar en las estructuras propias del router, a las que ya apuntan su FIB y su caché
+                    disp.tabla_rutas_avl.cargar_masivo(
+                        (n.prefix, n.mask, n.next_hop, n.metric) for n in dct["tabla_rutas_avl"].recorrer_en_orden())
+                    for prefix, longitud, politicas in dct["trie_politicas"].recorrer_prefijos():
+                        disp.trie_politicas.insertar_prefijo(prefix, longitud, politicas)
+                return disp
+            elif dct["__class__"] == "Interfaz":
+                intf = Interfaz(dct["nombre"])
+                intf.ip = dct["ip"]
+                intf.mascara = dct.get("mascara")
+                intf.estado = dct["estado"]
+                intf.costo = dct.get("costo", intf.costo)
+                intf.latencia = dct.get("latencia", intf.latencia)
+                intf.ancho_banda = dct.get("ancho_banda", intf.ancho_banda)
+                intf.conexiones = {tuple(c): None for c in dct["conexiones"]} # Red.reconstruir_enlaces crea los Enlace
+                return intf
+            elif dct["__class__"] == "BTreeDisco":
+                return BTreeDisco(dct["archivo"])
             elif dct["__class__"] == "BTree":
                 btree = BTree(dct["t"])
                 btree.altura = dct["altura"]
                 btree.nodos = dct["nodos"]
                 btree.splits = dct["splits"]
                 btree.merges = dct["merges"]
-                btree.raiz = self._restaurar_btree_nodo(None, dct["raiz"])
+                btree.raiz = self._restaurar_btree_nodo(dct["t"], dct["raiz"])
+                btree.cantidad = dct["cantidad"] if "cantidad" in dct else sum(1 for _ in btree.iterar())
                 return btree
             elif dct["__class__"] == "Trie":
                 trie = Trie()
                 trie.raiz = self._restaurar_trie_nodo(None, dct["raiz"])
                 return trie
+            elif dct["__class__"] == "TrieComprimido":
+                trie = TrieComprimido()
+                for prefix, longitud, politicas in dct["prefijos"]:
+                    trie.insertar_prefijo(prefix, longitud, politicas)
+                return trie
             elif dct["__class__"] == "AVLTree":
                 avl = AVLTree()
                 avl.nodos = dct["nodos"]
                 avl.raiz = self._restaurar_avl_nodo(None, dct["raiz"])
+                avl.reconstruir_indice()
                 return avl
         return dct
     
-    def _restaurar_btree_nodo(self, padre, dct):
+    def _restaurar_btree_nodo(self, t, dct):
         if not dct:
             return None
-        # Restauración simplificada; no reconstruye la estructura completa de B-Tree
         from Arboles import NodoBTree
-        nodo = NodoBTree(padre.t if padre else 2, dct["hoja"])
+        nodo = NodoBTree(t, dct["hoja"])
         nodo.claves = [tuple(k) if isinstance(k, list) else k for k in dct["claves"]]
         nodo.valores = dct["valores"]
-        nodo.hijos = [self._restaurar_btree_nodo(nodo, h) for h in dct["hijos"]]
+        nodo.hijos = [self._restaurar_btree_nodo(t, h) for h in dct["hijos"]]
         return nodo
     
     def _restaurar_trie_nodo(self, padre, dct):
@@ -178,6 +254,76 @@ def cargar_configuracion(archivo="red_config.json"):
         print(f"[ERROR] No se pudo cargar la configuración: {e}")
         return None
 
+def leer_rutas_desde_archivo(archivo, lineas_invalidas=None):
+    """
+    Lee rutas de un archivo de texto de forma incremental (una ruta por línea).
+    Formatos aceptados por línea:
+        <prefix> <mask> <next-hop> [metric]
+        <prefix>/<longitud> <next-hop> [metric]
+    Las líneas vacías y las que empiezan con '#' se ignoran.
+    Args:
+        archivo: Ruta del archivo a leer.
+        lineas_invalidas (list, optional): Si se indica, recibe los números de línea mal formadas.
+    Yields:
+        tuple: (prefix, mask, next_hop, metric)
+    """
+    with open(archivo, "r") as f:
+        for numero, linea in enumerate(f, 1):
+            campos = linea.split()
+            if not campos or campos[0].startswith("#"):
+                continue
+            if "/" in campos[0]:
+                prefix, mask = campos[0].split("/", 1)
+                campos = [prefix, mask] + campos[1:]
+            if len(campos) not in (3, 4):
+                if lineas_invalidas is not None:
+                    lineas_invalidas.append(numero)
+                continue
+            try:
+                metric = int(campos[3]) if len(campos) == 4 else 1
+            except ValueError:
+                if lineas_invalidas is not None:
+                    lineas_invalidas.append(numero)
+                continue
+            yield campos[0], campos[1], campos[2], metric
+
+CAMPOS_ENLACE = ("disp1", "intf1", "disp2", "intf2")
+
+def leer_enlaces_desde_archivo(archivo, lineas_invalidas=None):
+    """
+    Lee una lista de enlaces de forma incremental (un enlace por línea), para Red.conectar_masivo.
+    El formato se elige por la extensión:
+        .jsonl / .json: {"disp1": ..., "intf1": ..., "disp2": ..., "intf2": ...} o [disp1, intf1, disp2, intf2]
+        otra (CSV):     disp1,intf1,disp2,intf2 (encabezado opcional con esos nombres)
+    Las líneas vacías y las que empiezan con '#' se ignoran.
+    Args:
+        archivo: Ruta del archivo a leer.
+        lineas_invalidas (list, optional): Si se indica, recibe los números de línea mal formadas.
+    Yields:
+        tuple: (disp1, intf1, disp2, intf2)
+    """
+    es_jsonl = archivo.lower().endswith((".jsonl", ".json"))
+    with open(archivo, "r", encoding="utf-8", newline="") as f:
+        for numero, linea in enumerate(f, 1):
+            linea = linea.strip()
+            if not linea or linea.startswith("#"):
+                continue
+            if es_jsonl:
+                try:
+                    dato = json.loads(linea)
+                    campos = [dato[c] for c in CAMPOS_ENLACE] if isinstance(dato, dict) else dato
+                except (ValueError, KeyError):
+                    campos = None
+            else:
+                campos = [c.strip() for c in next(csv.reader([linea]))]
+                if numero == 1 and tuple(c.lower() for c in campos) == CAMPOS_ENLACE:
+                    continue
+            if not isinstance(campos, list) or len(campos) != 4 or not all(isinstance(c, str) and c for c in campos):
+                if lineas_invalidas is not None:
+                    lineas_invalidas.append(numero)
+                continue
+            yield tuple(campos)
+
 # Funciones de ejemplo para uso en la CLI
 def guardar_red_actual(red):
     """Función para guardar la red actual vía CLI."""
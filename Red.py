@@ -1,7 +1,30 @@
 # Red.py
-from Dispositivos import Router, Switch, Host, Interfaz # Importar clases de dispositivos
+from Dispositivos import Router, Switch, Host, Interfaz, Enlace # Importar clases de dispositivos
 from Arboles import BTree # Importar el B-Tree para snapshots
+from Almacenamiento import BTreeDisco # B-Tree paginado en disco para el índice de snapshots
+from Estructuras import GrafoCSR # Instantánea compacta de la topología para algoritmos de grafos
 from Errores import error_logger # Importar el logger de errores
+from Eventos import SumideroConsola, SumideroNulo, crear_evento # Sumideros de eventos del camino de reenvío
+from Arboles import ip_a_entero, entero_a_ip, MASCARAS
+from collections import namedtuple
+import heapq
+import time
+
+try:
+    import numpy as np
+except ImportError: # NumPy es opcional: enviar_lote usa una implementación en Python puro
+    np = None
+
+# Códigos de resultado del reenvío (índices en MOTIVOS)
+(ENTREGADO, ORIGEN_INEXISTENTE, IP_INVALIDA, BLOQUEADO, SIN_RUTA, TTL_INSUFICIENTE,
+ INALCANZABLE, SIN_GATEWAY, TTL_EXPIRADO, BUCLE) = range(10)
+MOTIVOS = ("entregado", "origen_inexistente", "ip_invalida", "bloqueado", "sin_ruta", "ttl_insuficiente",
+           "inalcanzable", "sin_gateway", "ttl_expirado", "bucle")
+EN_TRANSITO = -1 # Código interno: el paquete sigue hacia otro dispositivo
+TTL_POR_DEFECTO = 64
+
+# Resultado del reenvío de un paquete: código de MOTIVOS, dispositivos visitados y TTL final
+ResultadoEnvio = namedtuple("ResultadoEnvio", ["entregado", "motivo", "recorrido", "ttl"])
 
 class Red:
     """
@@ -10,11 +33,37 @@ class Red:
     """
     def __init__(self):
         self.dispositivos = {} # Diccionario de dispositivos {nombre: objeto_dispositivo}
-        self.b_tree_snapshots = BTree(t=4) # Módulo 2: B-Tree para snapshots (grado mínimo t=4 como ejemplo)
+        self.enlaces = {} # Enlaces {((disp_a, intf_a), (disp_b, intf_b)): Enlace}, con la clave en orden canónico
+        self.b_tree_snapshots = BTree() # Módulo 2: B-Tree para snapshots (grado mínimo ORDEN_BTREE)
+        self.snapshots_creados = {} # {clave: instante epoch de creación}, en orden de creación (para la retención)
+        self.secuencia_snapshots = 0 # Número del último archivo de snapshot asignado
         self.estadisticas = { # Estadísticas generales de la red
             'paquetes_enviados': 0,
-            'paquetes_entregados': 0
+            'paquetes_entregados': 0,
+            'paquetes_descartados': 0,
+            'ttl_expirados': 0,
+            'bucles': 0
         }
+        self.sumidero = SumideroConsola() # Destino de los eventos de reenvío (ver Eventos.py)
+        self.indice_ips = {} # Índice global {ip: (nombre_dispositivo, nombre_interfaz)}
+        self.indice_subredes = {} # Subredes conectadas {(red_entera, longitud): {(nombre_dispositivo, nombre_interfaz)}}
+        self._longitudes_subredes = {} # {longitud: número de subredes} para limitar la búsqueda por longitud
+        self.generacion_topologia = 0 # Se incrementa con cada cambio de enlaces, IPs o estados
+        self._segmentos = {} # Caché {nombre: {dispositivo_alcanzable: interfaz_de_salida}} por generación
+        self._gateways = {}
+        self._generacion_segmentos = -1
+        self._grafo = None # Instantánea GrafoCSR de la topología, reconstruida al cambiar la generación
+        self._generacion_grafo = -1
+
+    def establecer_sumidero(self, sumidero):
+        """
+        Reemplaza el sumidero de eventos de reenvío, cerrando el anterior.
+        Args:
+            sumidero: SumideroNulo, SumideroConsola, SumideroMemoria, SumideroJSONL u
+                      otro objeto con atributo `activo` y métodos `emitir` y `cerrar`.
+        """
+        self.sumidero.cerrar()
+        self.sumidero = sumidero
     
     def agregar_dispositivo(self, tipo, nombre):
         """
@@ -38,12 +87,90 @@ class Red:
         else:
             error_logger.registrar_error("ConfigError", f"Tipo de dispositivo inválido: '{tipo}'.", comando_provocador=f"agregar_dispositivo {tipo} {nombre}")
             return False # Tipo de dispositivo no válido
+        self.generacion_topologia += 1
         return True
     
     def obtener_dispositivo(self, nombre):
         """Retorna un objeto dispositivo por su nombre."""
         return self.dispositivos.get(nombre)
 
+    def guardar_snapshot(self, clave, archivo=None):
+        """
+        Indexa un snapshot de configuración en el B-Tree; si la clave ya existía, se reemplaza.
+        Args:
+            clave (str): Clave del snapshot.
+            archivo (str, optional): Archivo asociado; por defecto snap_NNNNN.cfg con numeración creciente.
+        Returns:
+            str: El archivo indexado.
+        """
+        if archivo is None:
+            self.secuencia_snapshots += 1
+            archivo = f"snap_{self.secuencia_snapshots:05d}.cfg"
+        with self.b_tree_snapshots.transaccion():
+            if self.b_tree_snapshots.buscar(clave) is not None:
+                self.b_tree_snapshots.eliminar(clave)
+            self.b_tree_snapshots.insertar(clave, archivo)
+        self.snapshots_creados.pop(clave, None)
+        self.snapshots_creados[clave] = time.time()
+        return archivo
+
+    def eliminar_snapshot(self, clave):
+        """
+        Elimina un snapshot del índice.
+        Returns:
+            bool: True si existía.
+        """
+        self.snapshots_creados.pop(clave, None)
+        return self.b_tree_snapshots.eliminar(clave)
+
+    def podar_snapshots(self, mantener=None, antiguedad=None):
+        """
+        Aplica la política de retención de snapshots: conserva los `mantener` más recientes
+        y/o elimina los creados hace más de `antiguedad` segundos.
+        Returns:
+            list: Claves eliminadas, de la más antigua a la más reciente.
+        """
+        eliminadas = []
+        limite = time.time() - antiguedad if antiguedad is not None else None
+        sobrantes = len(self.snapshots_creados) - mantener if mantener is not None else 0
+        for clave, instante in list(self.snapshots_creados.items()): # Orden de creación: los más antiguos primero
+            if len(eliminadas) < sobrantes or (limite is not None and instante < limite):
+                eliminadas.append(clave)
+            else:
+                break
+        with self.b_tree_snapshots.transaccion():
+            for clave in eliminadas:
+                self.eliminar_snapshot(clave)
+        return eliminadas
+
+    def usar_indice_disco(self, archivo, **opciones):
+        """
+        Pasa el índice de snapshots a un BTreeDisco en `archivo`, que sobrevive a reinicios sin
+        cargar la configuración completa. Los snapshots del índice actual se copian al archivo
+        (sin pisar claves que ya estén en él) y los del archivo se suman a la retención como
+        creados ahora.
+        Args:
+            archivo (str): Archivo del índice; se crea si no existe.
+            **opciones: Parámetros de BTreeDisco (tam_pagina, capacidad_cache, sincronizar...).
+        Returns:
+            BTreeDisco: El nuevo índice.
+        """
+        indice = BTreeDisco(archivo, **opciones)
+        with indice.transaccion():
+            for clave, valor in self.b_tree_snapshots.iterar():
+                if indice.buscar(clave) is None:
+                    indice.insertar(clave, valor)
+        if isinstance(self.b_tree_snapshots, BTreeDisco):
+            self.b_tree_snapshots.cerrar()
+        self.b_tree_snapshots = indice
+
+        ahora = time.time()
+        for clave, valor in indice.iterar():
+            self.snapshots_creados.setdefault(clave, ahora)
+            if valor.startswith("snap_") and valor.endswith(".cfg") and valor[5:-4].isdigit():
+                self.secuencia_snapshots = max(self.secuencia_snapshots, int(valor[5:-4]))
+        return indice
+
     def conectar(self, disp1_nombre, int1_nombre, disp2_nombre, int2_nombre):
         """
         Establece una conexión bidireccional entre dos interfaces de dispositivos.
@@ -70,8 +197,8 @@ class Red:
             return False, "Error: Una o ambas interfaces no existen."
         
         # Conexión bidireccional
-        int1.conectar(disp2_nombre, int2_nombre)
-        int2.conectar(disp1_nombre, int1_nombre)
+        if self._registrar_enlace(disp1_nombre, int1, disp2_nombre, int2):
+            self.generacion_topologia += 1
         return True, f"Conexión establecida entre {disp1_nombre}:{int1_nombre} y {disp2_nombre}:{int2_nombre}"
 
     def desconectar(self, disp1_nombre, int1_nombre, disp2_nombre, int2_nombre):
@@ -100,64 +227,791 @@ class Red:
             return False, "Error: Una o ambas interfaces no existen."
         
         # Desconexión bidireccional
+        self.enlaces.pop(Enlace.clave_de(disp1_nombre, int1_nombre, disp2_nombre, int2_nombre), None)
         int1.desconectar(disp2_nombre, int2_nombre)
         int2.desconectar(disp1_nombre, int1_nombre)
+        self.generacion_topologia += 1
         return True, f"Desconexión realizada entre {disp1_nombre}:{int1_nombre} y {disp2_nombre}:{int2_nombre}"
 
-    def enviar_paquete(self, origen_nombre, destino_ip, mensaje):
+    def _registrar_enlace(self, disp1_nombre, int1, disp2_nombre, int2):
         """
-        Simula el envío de un paquete a través de la red.
-        Este método implementa el flujo de procesamiento de paquetes:
-        Trie (políticas) -> AVL (rutas) -> (ARP/siguiente salto).
-        
+        Crea el Enlace entre dos interfaces existentes y lo registra en ambas y en self.enlaces.
+        Returns:
+            bool: True si el enlace es nuevo, False si ya existía.
+        """
+        clave = Enlace.clave_de(disp1_nombre, int1.nombre, disp2_nombre, int2.nombre)
+        if clave in self.enlaces:
+            return False
+        enlace = Enlace(disp1_nombre, int1.nombre, disp2_nombre, int2.nombre)
+        self.enlaces[clave] = enlace
+        int1.conectar(disp2_nombre, int2.nombre, enlace)
+        int2.conectar(disp1_nombre, int1.nombre, enlace)
+        return True
+
+    def conectar_masivo(self, enlaces, crear_interfaces=False, origen="conectar_masivo"):
+        """
+        Conecta muchos pares de interfaces en una sola pasada sobre un iterable (puede ser un
+        generador que lee un archivo). Los enlaces inválidos se descartan sin detener la carga y
+        se reportan al final con un único error por motivo, en lugar de uno por enlace.
+        Args:
+            enlaces: Iterable de (disp1_nombre, int1_nombre, disp2_nombre, int2_nombre).
+            crear_interfaces (bool): Crear las interfaces que no existan en lugar de descartar el enlace.
+            origen (str): Comando provocador que se anota en el registro de errores.
+        Returns:
+            dict: {"conectados": int, "existentes": int, "descartados": {motivo: cantidad}}
+        """
+        dispositivos = self.dispositivos
+        conectados = existentes = 0
+        descartados = {}
+        ejemplos = {} # Primer enlace descartado por cada motivo, para el mensaje de error
+
+        def descartar(motivo, enlace):
+            if motivo not in descartados:
+                descartados[motivo] = 0
+                ejemplos[motivo] = enlace
+            descartados[motivo] += 1
+
+        for enlace in enlaces:
+            try:
+                disp1_nombre, int1_nombre, disp2_nombre, int2_nombre = enlace
+            except (TypeError, ValueError):
+                descartar("formato_invalido", enlace)
+                continue
+            disp1 = dispositivos.get(disp1_nombre)
+            disp2 = dispositivos.get(disp2_nombre)
+            if disp1 is None or disp2 is None:
+                descartar("dispositivo_inexistente", enlace)
+                continue
+            int1 = disp1.interfaces.get(int1_nombre)
+            int2 = disp2.interfaces.get(int2_nombre)
+            if int1 is None or int2 is None:
+                if not crear_interfaces:
+                    descartar("interfaz_inexistente", enlace)
+                    continue
+                if int1 is None:
+                    disp1.agregar_interfaz(int1_nombre)
+                    int1 = disp1.interfaces[int1_nombre]
+                if int2 is None:
+                    disp2.agregar_interfaz(int2_nombre)
+                    int2 = disp2.interfaces[int2_nombre]
+            if self._registrar_enlace(disp1_nombre, int1, disp2_nombre, int2):
+                conectados += 1
+            else:
+                existentes += 1
+
+        if conectados:
+            self.generacion_topologia += 1
+        for motivo, cantidad in descartados.items():
+            error_logger.registrar_error("ConnectionError", f"{cantidad} enlaces descartados ({motivo}); primero: {ejemplos[motivo]}", comando_provocador=origen)
+        return {"conectados": conectados, "existentes": existentes, "descartados": descartados}
+
+    def reconstruir_enlaces(self):
+        """
+        Reconstruye self.enlaces y los objetos Enlace de cada interfaz a partir de sus
+        conexiones (por ejemplo, después de cargar una configuración guardada).
+        """
+        self.enlaces = {}
+        for disp_nombre, disp in self.dispositivos.items():
+            for intf in disp.interfaces.values():
+                for remoto_nombre, remota_intf_nombre in intf.conexiones:
+                    clave = Enlace.clave_de(disp_nombre, intf.nombre, remoto_nombre, remota_intf_nombre)
+                    enlace = self.enlaces.get(clave)
+                    if enlace is None:
+                        enlace = self.enlaces[clave] = Enlace(disp_nombre, intf.nombre, remoto_nombre, remota_intf_nombre)
+                    intf.conexiones[(remoto_nombre, remota_intf_nombre)] = enlace
+        self.generacion_topologia += 1
+
+    def asignar_ip(self, disp_nombre, intf_nombre, ip, longitud=None):
+        """
+        Asigna una dirección IP a una interfaz, la activa y la registra en el índice global
+        de IPs (y su subred conectada en el índice de subredes).
+        Args:
+            disp_nombre (str): Nombre del dispositivo.
+            intf_nombre (str): Nombre de la interfaz.
+            ip (str): Dirección IP a asignar.
+            longitud (int): Longitud de prefijo de la subred conectada (opcional).
+        Returns:
+            tuple: (bool, str) - Éxito de la operación y mensaje. Falla si la IP ya está
+                   asignada a otra interfaz (IP duplicada).
+        """
+        comando = f"ip address {ip}" + (f" /{longitud}" if longitud is not None else "")
+        disp = self.obtener_dispositivo(disp_nombre)
+        intf = disp.obtener_interfaz(intf_nombre) if disp else None
+        if not intf:
+            error_logger.registrar_error("ConfigError", f"Interfaz {intf_nombre} no encontrada en {disp_nombre}.", comando_provocador=comando)
+            return False, f"Error: Interfaz {intf_nombre} no encontrada en {disp_nombre}."
+        if ip_a_entero(ip) is None or (longitud is not None and not 0 <= longitud <= 32):
+            error_logger.registrar_error("ConfigError", f"Dirección IP o máscara inválida: {ip}.", comando_provocador=comando)
+            return False, f"Error: Dirección IP o máscara inválida: {ip}."
+        propietario = self.indice_ips.get(ip)
+        if propietario is not None and propietario != (disp_nombre, intf_nombre):
+            error_logger.registrar_error("ConfigError", f"IP duplicada: {ip} ya está asignada a {propietario[0]}:{propietario[1]}.", comando_provocador=comando)
+            return False, f"Error: {ip} ya está asignada a {propietario[0]}:{propietario[1]}."
+
+        self._desindexar_ip(disp_nombre, intf)
+        intf.ip = ip
+        intf.mascara = longitud
+        intf.estado = True # Al asignar IP, la interfaz se activa
+        self._indexar_ip(disp_nombre, intf)
+        self.generacion_topologia += 1
+        return True, f"Dirección IP {ip}{f'/{longitud}' if longitud is not None else ''} asignada a {intf_nombre}"
+
+    def quitar_ip(self, disp_nombre, intf_nombre):
+        """
+        Quita la dirección IP de una interfaz (no ip address) y la saca de los índices.
+        Returns:
+            tuple: (bool, str) - Éxito de la operación y mensaje.
+        """
+        disp = self.obtener_dispositivo(disp_nombre)
+        intf = disp.obtener_interfaz(intf_nombre) if disp else None
+        if not intf or intf.ip is None:
+            error_logger.registrar_error("ConfigError", f"La interfaz {intf_nombre} de {disp_nombre} no tiene dirección IP.", comando_provocador="no ip address")
+            return False, f"Error: La interfaz {intf_nombre} no tiene dirección IP."
+        ip = intf.ip
+        self._desindexar_ip(disp_nombre, intf)
+        intf.ip = None
+        intf.mascara = None
+        self.generacion_topologia += 1
+        return True, f"Dirección IP {ip} eliminada de {intf_nombre}"
+
+    def _subred(self, intf):
+        """Retorna la clave (red_entera, longitud) de la subred conectada de una interfaz, o None."""
+        if intf.ip is None or intf.mascara is None:
+            return None
+        return ip_a_entero(intf.ip) & MASCARAS[intf.mascara], intf.mascara
+
+    def _indexar_ip(self, disp_nombre, intf):
+        """Registra la IP y la subred conectada de una interfaz en los índices."""
+        self.indice_ips[intf.ip] = (disp_nombre, intf.nombre)
+        subred = self._subred(intf)
+        if subred is not None:
+            miembros = self.indice_subredes.get(subred)
+            if miembros is None:
+                miembros = self.indice_subredes[subred] = set()
+                self._longitudes_subredes[subred[1]] = self._longitudes_subredes.get(subred[1], 0) + 1
+            miembros.add((disp_nombre, intf.nombre))
+
+    def _desindexar_ip(self, disp_nombre, intf):
+        """Quita la IP y la subred conectada de una interfaz de los índices."""
+        if intf.ip is None:
+            return
+        if self.indice_ips.get(intf.ip) == (disp_nombre, intf.nombre):
+            del self.indice_ips[intf.ip]
+        subred = self._subred(intf)
+        miembros = self.indice_subredes.get(subred) if subred is not None else None
+        if miembros is not None:
+            miembros.discard((disp_nombre, intf.nombre))
+            if not miembros:
+                del self.indice_subredes[subred]
+                self._longitudes_subredes[subred[1]] -= 1
+                if not self._longitudes_subredes[subred[1]]:
+                    del self._longitudes_subredes[subred[1]]
+
+    def reconstruir_indice_ips(self):
+        """Reconstruye los índices de IPs y subredes recorriendo todas las interfaces (p. ej. tras cargar una configuración)."""
+        self.indice_ips = {}
+        self.indice_subredes = {}
+        self._longitudes_subredes = {}
+        for disp_nombre, disp in self.dispositivos.items():
+            for intf in disp.interfaces.values():
+                if intf.ip is not None:
+                    self._indexar_ip(disp_nombre, intf)
+        self.generacion_topologia += 1
+
+    def resolver_ip(self, ip):
+        """
+        Retorna (nombre_dispositivo, nombre_interfaz) dueños de una IP, o None.
+        Es una consulta O(1) al índice global de IPs.
+        """
+        return self.indice_ips.get(ip)
+
+    def resolver_subred(self, ip):
+        """
+        Retorna la subred conectada más específica que contiene una IP como
+        ("red/longitud", {(nombre_dispositivo, nombre_interfaz), ...}), o None.
+        Solo se consultan las longitudes de prefijo en uso (a lo sumo 33 accesos al índice).
+        """
+        valor = ip_a_entero(ip)
+        if valor is None:
+            return None
+        for longitud in sorted(self._longitudes_subredes, reverse=True):
+            red = valor & MASCARAS[longitud]
+            miembros = self.indice_subredes.get((red, longitud))
+            if miembros:
+                return f"{entero_a_ip(red)}/{longitud}", miembros
+        return None
+
+    def establecer_estado_interfaz(self, disp_nombre, intf_nombre, estado):
+        """
+        Activa (no shutdown) o desactiva (shutdown) una interfaz.
+        Returns:
+            tuple: (bool, str) - Éxito de la operación y mensaje.
+        """
+        disp = self.obtener_dispositivo(disp_nombre)
+        intf = disp.obtener_interfaz(intf_nombre) if disp else None
+        if not intf:
+            error_logger.registrar_error("ConfigError", f"Interfaz {intf_nombre} no encontrada en {disp_nombre}.", comando_provocador="shutdown" if not estado else "no shutdown")
+            return False, f"Error: Interfaz {intf_nombre} no encontrada en {disp_nombre}."
+        intf.estado = estado
+        self.generacion_topologia += 1
+        return True, f"Interfaz {intf_nombre} {'ACTIVADA (no shutdown)' if estado else 'DESACTIVADA (shutdown)'}"
+
+    def establecer_costo_interfaz(self, disp_nombre, intf_nombre, costo):
+        """
+        Cambia el costo de los enlaces que salen por una interfaz.
+        Returns:
+            tuple: (bool, str) - Éxito de la operación y mensaje.
+        """
+        disp = self.obtener_dispositivo(disp_nombre)
+        intf = disp.obtener_interfaz(intf_nombre) if disp else None
+        if not intf or costo < 0:
+            error_logger.registrar_error("ConfigError", f"Interfaz {intf_nombre} no encontrada en {disp_nombre} o costo inválido ({costo}).", comando_provocador=f"cost {costo}")
+            return False, f"Error: Interfaz {intf_nombre} no encontrada o costo inválido."
+        intf.costo = costo
+        self.generacion_topologia += 1
+        return True, f"Costo de {intf_nombre} establecido en {costo}"
+
+    def configurar_enlace(self, disp_nombre, intf_nombre, latencia=None, ancho_banda=None):
+        """
+        Cambia la latencia (segundos) y/o el ancho de banda (bits/s) del enlace saliente de una interfaz.
+        Returns:
+            tuple: (bool, str) - Éxito de la operación y mensaje.
+        """
+        disp = self.obtener_dispositivo(disp_nombre)
+        intf = disp.obtener_interfaz(intf_nombre) if disp else None
+        if not intf or (latencia is not None and latencia < 0) or (ancho_banda is not None and ancho_banda <= 0):
+            error_logger.registrar_error("ConfigError", f"Interfaz {intf_nombre} no encontrada en {disp_nombre} o parámetros de enlace inválidos.", comando_provocador=f"latency {latencia} bandwidth {ancho_banda}")
+            return False, f"Error: Interfaz {intf_nombre} no encontrada o parámetros de enlace inválidos."
+        if latencia is not None:
+            intf.latencia = latencia
+        if ancho_banda is not None:
+            intf.ancho_banda = ancho_banda
+        return True, f"Enlace de {intf_nombre}: latencia {intf.latencia * 1000:g} ms, ancho de banda {intf.ancho_banda / 1000:g} kbps"
+
+    def grafo(self):
+        """
+        Retorna la topología como GrafoCSR: un nodo por dispositivo (id entero) y una arista
+        dirigida por cada conexión de cada interfaz, con el costo de la interfaz de salida
+        como peso y marcada como activa si ambos extremos están encendidos y sin shutdown.
+        La instantánea se reconstruye solo cuando cambió la topología desde la última llamada.
+        """
+        if self._grafo is not None and self._generacion_grafo == self.generacion_topologia:
+            return self._grafo
+        nombres = list(self.dispositivos)
+        ids = {nombre: i for i, nombre in enumerate(nombres)}
+        aristas = []
+        for nombre, disp in self.dispositivos.items():
+            origen = ids[nombre]
+            for intf in disp.interfaces.values():
+                for remoto_nombre, remota_intf_nombre in intf.conexiones:
+                    destino = ids.get(remoto_nombre)
+                    if destino is None:
+                        continue
+                    remoto = self.dispositivos[remoto_nombre]
+                    remota_intf = remoto.interfaces.get(remota_intf_nombre)
+                    activa = bool(disp.estado and intf.estado and remoto.estado and remota_intf is not None and remota_intf.estado)
+                    aristas.append((origen, destino, intf.costo, activa, intf.nombre))
+        self._grafo = GrafoCSR(nombres, aristas)
+        self._generacion_grafo = self.generacion_topologia
+        return self._grafo
+
+    def camino_mas_corto(self, origen_nombre, destino_nombre, por_costo=True, solo_activos=True):
+        """
+        Calcula el camino entre dos dispositivos sobre la instantánea CSR de la topología.
+        Args:
+            por_costo (bool): True usa Dijkstra con el costo de las interfaces; False, BFS por saltos.
+            solo_activos (bool): Ignorar enlaces con algún extremo en shutdown o apagado.
+        Returns:
+            tuple: (list, float) - Dispositivos del camino y su costo (o número de saltos),
+                   o (None, None) si no hay camino o algún dispositivo no existe.
+        """
+        grafo = self.grafo()
+        origen = grafo.ids.get(origen_nombre)
+        destino = grafo.ids.get(destino_nombre)
+        if origen is None or destino is None:
+            return None, None
+        if por_costo:
+            distancias, predecesores = grafo.dijkstra(origen, destino, solo_activos)
+        else:
+            distancias, predecesores = grafo.bfs(origen, solo_activos)
+        camino = grafo.reconstruir_camino(predecesores, origen, destino)
+        if camino is None:
+            return None, None
+        return [grafo.nombres[i] for i in camino], distancias[destino]
+
+    def particionar(self, cantidad):
+        """
+        Reparte los dispositivos en `cantidad` fragmentos para procesarlos en paralelo.
+        Cada componente conexa va entera a un fragmento; las componentes más grandes que
+        un fragmento equilibrado se cortan en trozos contiguos de su recorrido en anchura
+        para conservar la localidad. Los trozos se asignan al fragmento menos cargado.
+        Returns:
+            dict: {nombre_dispositivo: número de fragmento (0 a cantidad - 1)}.
+        """
+        grafo = self.grafo()
+        cantidad = max(1, cantidad)
+        objetivo = max(1, -(-grafo.cantidad_nodos() // cantidad))
+        trozos = []
+        for componente in grafo.componentes():
+            trozos.extend(componente[i:i + objetivo] for i in range(0, len(componente), objetivo))
+        trozos.sort(key=len, reverse=True)
+        cargas = [(0, fragmento) for fragmento in range(cantidad)]
+        asignacion = {}
+        for trozo in trozos:
+            carga, fragmento = heapq.heappop(cargas)
+            for nodo in trozo:
+                asignacion[grafo.nombres[nodo]] = fragmento
+            heapq.heappush(cargas, (carga + len(trozo), fragmento))
+        return asignacion
+
+    def _propietario_ip(self, ip):
+        """Retorna el nombre del dispositivo que tiene asignada la IP, o None."""
+        propietario = self.resolver_ip(ip)
+        return propietario[0] if propietario else None
+
+    def _segmento_l2(self, nombre):
+        """
+        Retorna los dispositivos alcanzables desde `nombre` sin pasar por un router:
+        {nombre_dispositivo: interfaz_de_salida}. Los switches reenvían por todos sus
+        puertos activos; las interfaces en shutdown y los dispositivos apagados cortan
+        el camino. El resultado se guarda en caché hasta el siguiente cambio de topología.
+        """
+        if self._generacion_segmentos != self.generacion_topologia:
+            self._segmentos = {}
+            self._gateways = {}
+            self._generacion_segmentos = self.generacion_topologia
+        segmento = self._segmentos.get(nombre)
+        if segmento is not None:
+            return segmento
+
+        segmento = {}
+        visitados = {nombre}
+        disp = self.dispositivos[nombre]
+        for salida in disp.interfaces.values():
+            if not salida.estado:
+                continue
+            pendientes = list(salida.conexiones)
+            while pendientes:
+                remoto_nombre, remota_intf_nombre = pendientes.pop()
+                remoto = self.dispositivos.get(remoto_nombre)
+                if remoto is None or not remoto.estado or remoto_nombre in visitados:
+                    continue
+                remota_intf = remoto.interfaces.get(remota_intf_nombre)
+                if remota_intf is None or not remota_intf.estado:
+                    continue
+                visitados.add(remoto_nombre)
+                segmento[remoto_nombre] = salida.nombre
+                if isinstance(remoto, Switch):
+                    for puerto in remoto.interfaces.values():
+                        if puerto.estado:
+                            pendientes.extend(puerto.conexiones)
+        self._segmentos[nombre] = segmento
+        return segmento
+
+    def _gateway(self, nombre):
+        """Retorna el router que usa un host o switch como puerta de enlace (el primero por nombre de su segmento), o None."""
+        segmento = self._segmento_l2(nombre)
+        if nombre not in self._gateways:
+            routers = [vecino for vecino in segmento if isinstance(self.dispositivos[vecino], Router)]
+            self._gateways[nombre] = min(routers) if routers else None
+        return self._gateways[nombre]
+
+    def _decidir_salto(self, nombre, destino_ip, propietario, ttl, sumidero):
+        """
+        Procesa un paquete en el dispositivo `nombre`.
+        Args:
+            propietario (str): Dispositivo dueño de la IP de destino (o None).
+        Returns:
+            tuple: (codigo, siguiente, ttl) - EN_TRANSITO con el siguiente dispositivo,
+                   ENTREGADO, o el código de descarte con siguiente None.
+        """
+        if propietario == nombre:
+            return ENTREGADO, None, ttl
+        disp = self.dispositivos[nombre]
+        segmento = self._segmento_l2(nombre)
+
+        if isinstance(disp, Router):
+            # Políticas (Trie) y ruta (FIB) a través de la caché de búsqueda del router
+            if sumidero.activo:
+                sumidero.emitir(crear_evento("consulta", nombre, destino_ip))
+            next_hop, politicas = disp.cache_busqueda.buscar(destino_ip)
+            if politicas.get('block'):
+                if sumidero.activo:
+                    sumidero.emitir(crear_evento("bloqueado", nombre, destino_ip))
+                return BLOQUEADO, None, ttl
+            ttl_min = politicas.get('ttl-min')
+            if ttl_min is not None:
+                if sumidero.activo:
+                    sumidero.emitir(crear_evento("ttl_min", nombre, destino_ip, ttl_min))
+                if ttl < ttl_min:
+                    return TTL_INSUFICIENTE, None, ttl
+
+            if propietario in segmento: # Red directamente conectada
+                siguiente = propietario
+                if sumidero.activo:
+                    sumidero.emitir(crear_evento("directo", nombre, destino_ip, siguiente))
+            elif next_hop is None:
+                if sumidero.activo:
+                    sumidero.emitir(crear_evento("sin_ruta", nombre, destino_ip))
+                return SIN_RUTA, None, ttl
+            else:
+                if sumidero.activo:
+                    sumidero.emitir(crear_evento("ruta", nombre, destino_ip, next_hop))
+                siguiente = self._propietario_ip(next_hop)
+                if siguiente not in segmento: # Siguiente salto sin dueño o fuera del segmento
+                    return INALCANZABLE, None, ttl
+            ttl -= 1
+            if ttl <= 0:
+                return TTL_EXPIRADO, None, ttl
+        elif propietario in segmento:
+            siguiente = propietario
+            if sumidero.activo:
+                sumidero.emitir(crear_evento("directo", nombre, destino_ip, siguiente))
+        else:
+            siguiente = self._gateway(nombre)
+            if siguiente is None:
+                return SIN_GATEWAY, None, ttl
+            if sumidero.activo:
+                sumidero.emitir(crear_evento("gateway", nombre, destino_ip, siguiente))
+
+        if sumidero.activo:
+            sumidero.emitir(crear_evento("reenvio", nombre, destino_ip, f"{siguiente} ({segmento[siguiente]})"))
+        return EN_TRANSITO, siguiente, ttl
+
+    def reenviar(self, origen_nombre, destino_ip, ttl=TTL_POR_DEFECTO, sumidero=None):
+        """
+        Sigue un paquete salto a salto por la topología hasta entregarlo o descartarlo.
+        Cada salto se resuelve con índices: IP de destino -> dispositivo (indice_ips),
+        segmento de capa 2 en caché y FIB/políticas de cada router.
+        Args:
+            origen_nombre (str): Nombre del dispositivo de origen.
+            destino_ip (str): Dirección IP de destino.
+            ttl (int): TTL inicial; cada router lo decrementa.
+            sumidero: Sumidero de eventos (por defecto, el de la red).
+        Returns:
+            ResultadoEnvio: entregado, motivo (código de MOTIVOS), recorrido y TTL final.
+        """
+        sumidero = self.sumidero if sumidero is None else sumidero
+        if origen_nombre not in self.dispositivos:
+            return ResultadoEnvio(False, ORIGEN_INEXISTENTE, [], ttl)
+        if ip_a_entero(destino_ip) is None:
+            return ResultadoEnvio(False, IP_INVALIDA, [origen_nombre], ttl)
+
+        propietario = self._propietario_ip(destino_ip)
+        actual = origen_nombre
+        recorrido = [actual]
+        visitados = {actual}
+        while True:
+            codigo, siguiente, ttl = self._decidir_salto(actual, destino_ip, propietario, ttl, sumidero)
+            if codigo != EN_TRANSITO:
+                return ResultadoEnvio(codigo == ENTREGADO, codigo, recorrido, ttl)
+            recorrido.append(siguiente)
+            if siguiente in visitados:
+                return ResultadoEnvio(False, BUCLE, recorrido, ttl)
+            visitados.add(siguiente)
+            actual = siguiente
+
+    def _contabilizar(self, codigos):
+        """Actualiza las estadísticas con un conteo por código de resultado."""
+        total = sum(codigos)
+        self.estadisticas['paquetes_enviados'] += total
+        self.estadisticas['paquetes_entregados'] += codigos[ENTREGADO]
+        self.estadisticas['paquetes_descartados'] += total - codigos[ENTREGADO]
+        self.estadisticas['ttl_expirados'] += codigos[TTL_EXPIRADO]
+        self.estadisticas['bucles'] += codigos[BUCLE]
+
+    def enviar_paquete(self, origen_nombre, destino_ip, mensaje, ttl=TTL_POR_DEFECTO):
+        """
+        Simula el envío de un paquete a través de la red, salto a salto.
+        En cada router: Caché de búsqueda -> Trie (políticas) + FIB (rutas compiladas desde el AVL)
+        -> siguiente salto resuelto con el índice de IPs, decrementando el TTL.
+        Hosts y switches entregan dentro de su segmento o usan el router del segmento como gateway.
+
         Args:
             origen_nombre (str): Nombre del dispositivo de origen.
             destino_ip (str): Dirección IP de destino del paquete.
             mensaje (str): Contenido del mensaje del paquete.
+            ttl (int): TTL inicial del paquete.
         Returns:
-            tuple: (bool, str) - Éxito de la operación y mensaje de resultado.
+            tuple: (bool, str) - Éxito de la operación y mensaje de resultado con el recorrido.
         """
-        self.estadisticas['paquetes_enviados'] += 1
-        
-        origen_disp = self.obtener_dispositivo(origen_nombre)
-        if not origen_disp:
-            error_logger.registrar_error("PacketError", f"Dispositivo de origen '{origen_nombre}' no encontrado.", comando_provocador=f"send {origen_nombre} {destino_ip} {mensaje}")
+        sumidero = self.sumidero
+        comando = f"send {origen_nombre} {destino_ip} {mensaje}"
+        if sumidero.activo and origen_nombre in self.dispositivos:
+            sumidero.emitir(crear_evento("inicio", origen_nombre, destino_ip))
+        resultado = self.reenviar(origen_nombre, destino_ip, ttl, sumidero)
+        codigos = [0] * len(MOTIVOS)
+        codigos[resultado.motivo] = 1
+        self._contabilizar(codigos)
+
+        camino = " -> ".join(resultado.recorrido)
+        ultimo = resultado.recorrido[-1] if resultado.recorrido else origen_nombre
+        if resultado.entregado:
+            if sumidero.activo:
+                sumidero.emitir(crear_evento("entregado", ultimo, destino_ip, len(resultado.recorrido) - 1))
+            return True, f"Paquete entregado a {destino_ip} en {len(resultado.recorrido) - 1} saltos: {camino} (TTL restante {resultado.ttl})."
+
+        if resultado.motivo == ORIGEN_INEXISTENTE:
+            error_logger.registrar_error("PacketError", f"Dispositivo de origen '{origen_nombre}' no encontrado.", comando_provocador=comando)
             return False, f"Error: Dispositivo de origen '{origen_nombre}' no encontrado."
+        if resultado.motivo == IP_INVALIDA:
+            error_logger.registrar_error("PacketError", f"Dirección IP de destino inválida: {destino_ip}.", comando_provocador=comando)
+            return False, f"Error: Dirección IP de destino inválida: {destino_ip}."
+
+        mensajes = {
+            BLOQUEADO: f"Paquete bloqueado por política en {ultimo} para {destino_ip}.",
+            SIN_RUTA: f"No hay ruta conocida desde {ultimo} para {destino_ip}. Paquete descartado.",
+            TTL_INSUFICIENTE: f"Paquete descartado en {ultimo}: TTL {resultado.ttl} menor que el 'ttl-min' de la política para {destino_ip}.",
+            INALCANZABLE: f"Siguiente salto para {destino_ip} inalcanzable desde {ultimo}. Paquete descartado.",
+            SIN_GATEWAY: f"{ultimo} no tiene gateway para llegar a {destino_ip}. Paquete descartado.",
+            TTL_EXPIRADO: f"TTL expirado en {ultimo} para {destino_ip}. Paquete descartado.",
+            BUCLE: f"Bucle de reenvío detectado para {destino_ip} en {ultimo}. Paquete descartado.",
+        }
+        texto = mensajes[resultado.motivo]
+        error_logger.registrar_error("PacketBlocked" if resultado.motivo == BLOQUEADO else "PacketDiscarded", texto, comando_provocador=comando)
+        if sumidero.activo:
+            sumidero.emitir(crear_evento("descartado", ultimo, destino_ip, MOTIVOS[resultado.motivo]))
+        return False, f"{texto} Recorrido: {camino}"
+
+    def enviar_lote(self, paquetes, ttl=TTL_POR_DEFECTO):
+        """
+        Envía un lote de paquetes salto a salto sin imprimir nada por paquete.
+        Con NumPy el lote avanza por rondas: en cada ronda los paquetes en tránsito se
+        agrupan por dispositivo actual y se resuelven en bloque (arreglos uint32 contra
+        la FIB y la tabla de políticas compiladas de cada router). Sin NumPy se usa
+        el mismo motor que enviar_paquete, paquete por paquete.
+        Args:
+            paquetes: Iterable de tuplas (origen_nombre, destino_ip, mensaje).
+            ttl (int): TTL inicial de todos los paquetes.
+        Returns:
+            dict: Arreglos paralelos al lote:
+                "exito": bool por paquete,
+                "motivo": código de resultado (índice en MOTIVOS),
+                "saltos": número de saltos recorridos (en bucles, hasta detectarlo),
+                "dispositivo": dispositivo donde terminó el paquete (o None).
+        """
+        paquetes = paquetes if isinstance(paquetes, list) else list(paquetes)
+        total = len(paquetes)
+        if np is not None:
+            motivo, saltos, dispositivo = self._enviar_lote_numpy(paquetes, ttl)
+            exito = motivo == ENTREGADO
+            conteo = np.bincount(motivo, minlength=len(MOTIVOS)).tolist()
+        else:
+            motivo, saltos, dispositivo = self._enviar_lote_python(paquetes, ttl)
+            exito = [m == ENTREGADO for m in motivo]
+            conteo = [0] * len(MOTIVOS)
+            for m in motivo:
+                conteo[m] += 1
+
+        self._contabilizar(conteo)
+        # Un único registro agregado por tipo de descarte, en vez de uno por paquete
+        for codigo in range(1, len(MOTIVOS)):
+            if conteo[codigo]:
+                tipo = "PacketError" if codigo in (ORIGEN_INEXISTENTE, IP_INVALIDA) else "PacketBlocked" if codigo == BLOQUEADO else "PacketDiscarded"
+                error_logger.registrar_error(tipo, f"{conteo[codigo]} paquetes descartados en lote ({MOTIVOS[codigo]}).", comando_provocador=f"enviar_lote ({total} paquetes)")
+        return {"exito": exito, "motivo": motivo, "saltos": saltos, "dispositivo": dispositivo}
+
+    def _enviar_lote_python(self, paquetes, ttl):
+        """Implementación de enviar_lote sin NumPy."""
+        sumidero = SumideroNulo()
+        motivo, saltos, dispositivo = [], [], []
+        for origen_nombre, destino_ip, _ in paquetes:
+            resultado = self.reenviar(origen_nombre, destino_ip, ttl, sumidero)
+            motivo.append(resultado.motivo)
+            saltos.append(max(len(resultado.recorrido) - 1, 0))
+            dispositivo.append(resultado.recorrido[-1] if resultado.recorrido else None)
+        return motivo, saltos, dispositivo
 
-        print(f"\n--- Iniciando envío de paquete desde {origen_nombre} a {destino_ip} ---")
-
-        # Paso 1: Consulta de Políticas en el Trie (si es un Router)
-        if isinstance(origen_disp, Router):
-            print(f"[{origen_nombre}] Consultando políticas en Trie para {destino_ip}...")
-            politicas = origen_disp.trie_politicas.obtener_politica(destino_ip)
-            if 'block' in politicas and politicas['block']:
-                error_logger.registrar_error("PacketBlocked", f"Paquete bloqueado por política en {origen_nombre} para {destino_ip}.", comando_provocador=f"send {origen_nombre} {destino_ip} {mensaje}")
-                print(f"[{origen_disp.nombre}] Paquete BLOQUEADO por política para {destino_ip}.")
-                return False, f"Paquete bloqueado por política en {origen_nombre} para {destino_ip}."
-            
-            if 'ttl-min' in politicas:
-                print(f"[{origen_disp.nombre}] Política 'ttl-min' de {politicas['ttl-min']} aplicada.")
-            # Aquí se aplicarían otras políticas si existieran
-
-        # Paso 2: Consulta de Ruta en el AVL (si es un Router)
-        next_hop = None
-        if isinstance(origen_disp, Router):
-            print(f"[{origen_nombre}] Consultando tabla de rutas (AVL) para {destino_ip}...")
-            ruta_encontrada = origen_disp.tabla_rutas_avl.buscar(destino_ip) # Esto es una búsqueda simplificada
-            
-            if ruta_encontrada:
-                next_hop = ruta_encontrada.next_hop
-                print(f"[{origen_nombre}] Ruta encontrada: Siguiente salto via {next_hop}.")
+    @staticmethod
+    def _ips_a_uint32(ips):
+        """
+        Convierte una lista de IPs punteadas a (arreglo uint32, máscara de inválidas).
+        La conversión se hace en bloque; las IPs mal formadas se marcan como inválidas.
+        """
+        total = len(ips)
+        invalidas = np.fromiter((ip.count('.') != 3 for ip in ips), dtype=bool, count=total)
+        if invalidas.any():
+            ips = ["0.0.0.0" if mala else ip for ip, mala in zip(ips, invalidas)]
+        try:
+            octetos = np.array(".".join(ips).split("."), dtype=np.int64).reshape(total, 4)
+        except ValueError:
+            # Algún octeto no es numérico: conversión individual como respaldo
+            valores = [ip_a_entero(ip) for ip in ips]
+            invalidas |= np.fromiter((v is None for v in valores), dtype=bool, count=total)
+            return np.fromiter((v or 0 for v in valores), dtype=np.uint32, count=total), invalidas
+        invalidas |= ((octetos < 0) | (octetos > 255)).any(axis=1)
+        ips_enteras = (octetos[:, 0] << 24) | (octetos[:, 1] << 16) | (octetos[:, 2] << 8) | octetos[:, 3]
+        return ips_enteras.astype(np.uint32), invalidas
+
+    @staticmethod
+    def _buscar_rangos(tabla, ips):
+        """Busca en bloque una tabla de rangos (inicios, fines, valores); retorna (índices, encontrados)."""
+        inicios, fines, _ = tabla
+        if not len(inicios):
+            return np.zeros(len(ips), dtype=np.intp), np.zeros(len(ips), dtype=bool)
+        inicios = np.frombuffer(inicios, dtype=np.uint32)
+        fines = np.frombuffer(fines, dtype=np.uint32)
+        indices = np.searchsorted(inicios, ips, side='right') - 1
+        encontrados = indices >= 0
+        indices[~encontrados] = 0
+        encontrados &= ips <= fines[indices]
+        return indices, encontrados
+
+    def _compilar_router(self, router, ids):
+        """
+        Prepara las tablas de un router para una ronda del lote: políticas compiladas
+        (bloqueo y ttl-min por rango) y FIB con el siguiente salto ya resuelto a id de dispositivo.
+        """
+        router.tabla_politicas.sincronizar()
+        politicas = router.tabla_politicas.tabla
+        bloqueo = np.fromiter((bool(p.get('block')) for p in politicas[2]), dtype=bool, count=len(politicas[2]))
+        ttl_min = np.fromiter((p.get('ttl-min', 0) for p in politicas[2]), dtype=np.int64, count=len(politicas[2]))
+        fib = router.fib
+        if fib.generacion != fib.rib.generacion:
+            fib.sincronizar()
+        saltos = {}
+        for entrada in fib.tabla[2]:
+            if entrada.next_hop not in saltos:
+                saltos[entrada.next_hop] = ids.get(self._propietario_ip(entrada.next_hop), -1)
+        siguiente = np.fromiter((saltos[entrada.next_hop] for entrada in fib.tabla[2]), dtype=np.intp, count=len(fib.tabla[2]))
+        return politicas, bloqueo, ttl_min, fib.tabla, siguiente
+
+    def _salto_lote(self, nombre, ids, compilados, indices, ips, propietario, ttls, motivo):
+        """
+        Resuelve en bloque un salto para los paquetes `indices` que están en `nombre`.
+        Marca los descartes en `motivo` y retorna el id del siguiente dispositivo (-1 si se descarta).
+        """
+        segmento = self._segmento_l2(nombre)
+        en_segmento_ids = np.fromiter((ids[vecino] for vecino in segmento), dtype=np.intp, count=len(segmento))
+        destino = propietario[indices]
+        directos = np.isin(destino, en_segmento_ids) if len(segmento) else np.zeros(len(indices), dtype=bool)
+        siguiente = np.full(len(indices), -1, dtype=np.intp)
+        disp = self.dispositivos[nombre]
+
+        if not isinstance(disp, Router):
+            siguiente[directos] = destino[directos]
+            gateway = self._gateway(nombre)
+            if gateway is None:
+                motivo[indices[~directos]] = SIN_GATEWAY
             else:
-                error_logger.registrar_error("PacketDiscarded", f"No hay ruta conocida desde {origen_nombre} para {destino_ip}.", comando_provocador=f"send {origen_nombre} {destino_ip} {mensaje}")
-                print(f"[{origen_nombre}] No hay ruta conocida para {destino_ip}. Paquete descartado.")
-                return False, f"No hay ruta conocida desde {origen_nombre} para {destino_ip}. Paquete descartado."
-        else: # Para Hosts o Switches, asume conexión directa o gateway
-            print(f"[{origen_nombre}] Dispositivo no es un router. Asumiendo conexión directa o vía gateway.")
-            next_hop = destino_ip # Asume que el destino es el siguiente salto directo para simplificar
-            
-        # Paso 3: Simulación de Reenvío al Siguiente Salto
-        print(f"[{origen_nombre}] Paquete reenviado (simulado) hacia {next_hop}...")
-        self.estadisticas['paquetes_entregados'] += 1 # Asume entrega exitosa por ahora
-        print(f"--- Paquete enviado con éxito (simulado) a {destino_ip} ---")
-        return True, f"Paquete enviado con éxito (simulado) a {destino_ip}."
\ No newline at end of file
+                siguiente[~directos] = ids[gateway]
+            return siguiente
+
+        if nombre not in compilados:
+            compilados[nombre] = self._compilar_router(disp, ids)
+        politicas, bloqueo, ttl_min, fib_tabla, fib_siguiente = compilados[nombre]
+        grupo = ips[indices]
+
+        # Paso 1: políticas (tabla compilada del trie)
+        vivos = np.ones(len(indices), dtype=bool)
+        if len(bloqueo):
+            segmento_pol, con_politica = self._buscar_rangos(politicas, grupo)
+            bloqueados = con_politica & bloqueo[segmento_pol]
+            motivo[indices[bloqueados]] = BLOQUEADO
+            insuficientes = ~bloqueados & con_politica & (ttls[indices] < ttl_min[segmento_pol])
+            motivo[indices[insuficientes]] = TTL_INSUFICIENTE
+            vivos &= ~bloqueados & ~insuficientes
+
+        # Paso 2: red conectada o ruta (FIB) con siguiente salto en el segmento
+        directos &= vivos
+        siguiente[directos] = destino[directos]
+        ruteados = vivos & ~directos
+        segmento_fib, con_ruta = self._buscar_rangos(fib_tabla, grupo)
+        motivo[indices[ruteados & ~con_ruta]] = SIN_RUTA
+        ruteados &= con_ruta
+        if ruteados.any():
+            salto = fib_siguiente[segmento_fib[ruteados]]
+            alcanzable = np.isin(salto, en_segmento_ids) if len(segmento) else np.zeros(len(salto), dtype=bool)
+            motivo[indices[ruteados][~alcanzable]] = INALCANZABLE
+            salto[~alcanzable] = -1
+            siguiente[ruteados] = salto
+
+        # Paso 3: decremento del TTL
+        avanzan = indices[siguiente >= 0]
+        ttls[avanzan] -= 1
+        expirados = siguiente >= 0
+        expirados[expirados] = ttls[avanzan] <= 0
+        motivo[indices[expirados]] = TTL_EXPIRADO
+        siguiente[expirados] = -1
+        return siguiente
+
+    @staticmethod
+    def _ya_visitados(bloques, claves):
+        """Retorna la máscara de las claves que ya están en algún bloque ordenado de visitados."""
+        encontradas = np.zeros(len(claves), dtype=bool)
+        for bloque in bloques:
+            indices = np.searchsorted(bloque, claves)
+            indices[indices == len(bloque)] = 0
+            encontradas |= bloque[indices] == claves
+        return encontradas
+
+    @staticmethod
+    def _agregar_visitados(bloques, claves, vigentes):
+        """
+        Agrega claves de visitados como un bloque ordenado. Los bloques se mantienen de tamaño
+        decreciente fusionando el último mientras no duplique al nuevo, así que hay O(log n)
+        bloques y cada clave se reordena O(log n) veces; al fusionar se descartan las claves
+        de paquetes que ya no están en tránsito (`vigentes` retorna la máscara de las que siguen).
+        """
+        bloque = np.sort(claves)
+        while bloques and len(bloques[-1]) <= 2 * len(bloque):
+            bloque = np.concatenate((bloques.pop(), bloque))
+            bloque = np.sort(bloque[vigentes(bloque)], kind="mergesort")
+        if len(bloque):
+            bloques.append(bloque)
+
+    def _enviar_lote_numpy(self, paquetes, ttl):
+        """Implementación vectorizada de enviar_lote: una ronda por salto."""
+        total = len(paquetes)
+        nombres = list(self.dispositivos)
+        ids = {nombre: i for i, nombre in enumerate(nombres)}
+        motivo = np.full(total, EN_TRANSITO, dtype=np.int8)
+        ips, invalidas = self._ips_a_uint32([paquete[1] for paquete in paquetes])
+        posicion = np.fromiter((ids.get(paquete[0], -1) for paquete in paquetes), dtype=np.intp, count=total)
+        motivo[invalidas] = IP_INVALIDA
+        motivo[posicion < 0] = ORIGEN_INEXISTENTE
+
+        # Dispositivo dueño de cada IP de destino (índice global de IPs, una consulta por IP distinta)
+        propietarios = {ip_a_entero(ip): ids[disp] for ip, (disp, _) in self.indice_ips.items()}
+        unicas, inversa = np.unique(ips, return_inverse=True)
+        propietario = np.fromiter((propietarios.get(int(ip), -1) for ip in unicas), dtype=np.intp, count=len(unicas))[inversa.ravel()]
+
+        ttls = np.full(total, ttl, dtype=np.int64)
+        saltos = np.zeros(total, dtype=np.int64)
+        compilados = {}
+        # Detección de bucles con la misma regla que reenviar: un paquete está en bucle en cuanto
+        # vuelve a un dispositivo que ya visitó. Los pares visitados se guardan como claves
+        # paquete * dispositivos + dispositivo (ver _agregar_visitados)
+        cantidad_disp = len(nombres)
+        tipo_clave = np.uint32 if total * cantidad_disp < 2 ** 32 else np.int64 # Claves de 4 bytes si caben
+        en_transito = lambda claves: motivo[claves // cantidad_disp] == EN_TRANSITO
+        visitados = []
+        iniciales = np.flatnonzero(motivo == EN_TRANSITO)
+        self._agregar_visitados(visitados, (iniciales * cantidad_disp + posicion[iniciales]).astype(tipo_clave), en_transito)
+        while True:
+            activos = np.flatnonzero(motivo == EN_TRANSITO)
+            llegaron = propietario[activos] == posicion[activos]
+            motivo[activos[llegaron]] = ENTREGADO
+            activos = activos[~llegaron]
+            if not len(activos):
+                break
+
+            siguiente = np.full(len(activos), -1, dtype=np.intp)
+            orden = np.argsort(posicion[activos], kind='stable')
+            dispositivos, cortes = np.unique(posicion[activos][orden], return_index=True)
+            cortes = list(cortes) + [len(orden)]
+            for k, disp_id in enumerate(dispositivos):
+                grupo = orden[cortes[k]:cortes[k + 1]]
+                siguiente[grupo] = self._salto_lote(nombres[disp_id], ids, compilados, activos[grupo],
+                                                    ips, propietario, ttls, motivo)
+
+            avanzan = activos[siguiente >= 0]
+            posicion[avanzan] = siguiente[siguiente >= 0]
+            saltos[avanzan] += 1
+            claves = (avanzan * cantidad_disp + posicion[avanzan]).astype(tipo_clave)
+            revisita = self._ya_visitados(visitados, claves)
+            motivo[avanzan[revisita]] = BUCLE
+            self._agregar_visitados(visitados, claves[~revisita], en_transito)
+
+        nombres_arr = np.array(nombres + [None], dtype=object)
+        return motivo, saltos, nombres_arr[posicion]
@@ -0,0 +1,276 @@
+# Reenvio.py
+"""
+Tablas de reenvío (plano de datos) derivadas de la tabla de rutas (plano de control).
+La FIB es una tabla plana de rangos disjuntos de direcciones IP ordenados, construida
+a partir del AVL de rutas, que se consulta con una búsqueda binaria sobre arreglos.
+"""
+from array import array
+from bisect import bisect_right
+from collections import namedtuple, OrderedDict
+
+from Arboles import ip_a_entero, MASCARAS
+
+# Entrada inmutable de la FIB: la ruta ganadora de un rango de direcciones
+EntradaFIB = namedtuple("EntradaFIB", ["red", "longitud", "next_hop", "metric"])
+
+def construir_segmentos(prefijos, inicio=0, fin=0xFFFFFFFF):
+    """
+    Convierte prefijos anidados en rangos disjuntos donde gana el más específico.
+    Args:
+        prefijos: Iterable de (red, longitud, valor) ordenado por (red, longitud),
+                  con a lo sumo un valor por prefijo.
+        inicio, fin: Rango de direcciones a cubrir; los prefijos deben estar dentro de él.
+    Returns:
+        tuple: (inicios, fines, valores) - Listas paralelas de rangos cerrados [inicio, fin]
+               con su valor; los huecos sin prefijo no aparecen. Rangos contiguos con el
+               mismo valor se fusionan.
+    """
+    inicios, fines, valores = [], [], []
+
+    def emitir(a, b, valor):
+        if a > b:
+            return
+        if valores and valores[-1] == valor and fines[-1] + 1 == a:
+            fines[-1] = b
+        else:
+            inicios.append(a)
+            fines.append(b)
+            valores.append(valor)
+
+    pila = [] # Prefijos que contienen la posición actual: (fin, valor)
+    cursor = inicio
+    for red, longitud, valor in prefijos:
+        ultimo = red | (~MASCARAS[longitud] & 0xFFFFFFFF)
+        # Cerrar los prefijos que terminan antes del nuevo
+        while pila and pila[-1][0] < red:
+            fin_prefijo, valor_prefijo = pila.pop()
+            emitir(cursor, fin_prefijo, valor_prefijo)
+            cursor = fin_prefijo + 1
+        if pila:
+            emitir(cursor, red - 1, pila[-1][1])
+        cursor = red
+        pila.append((ultimo, valor))
+    while pila:
+        fin_prefijo, valor_prefijo = pila.pop()
+        emitir(cursor, fin_prefijo, valor_prefijo)
+        cursor = fin_prefijo + 1
+    return inicios, fines, valores
+
+
+class FIB:
+    """
+    Forwarding Information Base compilada a partir de un AVLTree de rutas (RIB).
+    La tabla es una tupla inmutable (inicios, fines, entradas) con los rangos en arreglos
+    de enteros sin signo; cada cambio en la RIB produce una tabla nueva que reemplaza a
+    la anterior en una sola asignación, de modo que un lector nunca ve un estado a medias.
+    Los cambios se aplican de forma incremental: solo se recalcula el rango de direcciones
+    del prefijo modificado.
+    """
+    def __init__(self, rib):
+        self.rib = rib
+        self.tabla = (array('I'), array('I'), ())
+        self.generacion = -1 # Generación de la RIB reflejada en la tabla
+        self.reconstrucciones = 0
+        self.actualizaciones = 0
+
+    def buscar(self, dest_ip):
+        """
+        Retorna la EntradaFIB que corresponde a una IP de destino, o None.
+        Acepta la IP en notación punteada o como entero.
+        """
+        if self.generacion != self.rib.generacion:
+            self.sincronizar()
+        ip = dest_ip if isinstance(dest_ip, int) else ip_a_entero(dest_ip)
+        if ip is None:
+            return None
+        inicios, fines, entradas = self.tabla
+        i = bisect_right(inicios, ip) - 1
+        if i >= 0 and ip <= fines[i]:
+            return entradas[i]
+        return None
+
+    def sincronizar(self):
+        """Aplica a la FIB los cambios pendientes de la RIB."""
+        generacion = self.rib.generacion
+        cambios = self.rib.tomar_cambios()
+        if cambios is None:
+            self.reconstruir()
+        else:
+            for red, longitud in cambios:
+                self._actualizar_rango(red, longitud)
+        self.generacion = generacion
+
+    def _mejores_rutas(self, nodos):
+        """Convierte nodos AVL ordenados en (red, longitud, EntradaFIB), uno por prefijo (menor métrica)."""
+        anterior = None
+        for nodo in nodos:
+            if (nodo.red, nodo.longitud) != anterior:
+                anterior = (nodo.red, nodo.longitud)
+                yield nodo.red, nodo.longitud, EntradaFIB(nodo.red, nodo.longitud, nodo.next_hop, nodo.metric)
+
+    def reconstruir(self):
+        """Compila la FIB completa desde la RIB."""
+        inicios, fines, entradas = construir_segmentos(self._mejores_rutas(self.rib.recorrer_en_orden()))
+        self.tabla = (array('I', inicios), array('I', fines), tuple(entradas))
+        self.reconstrucciones += 1
+
+    def _actualizar_rango(self, red, longitud):
+        """Recalcula los rangos dentro del prefijo red/longitud y los reemplaza en una tabla nueva."""
+        inicio = red
+        fin = red | (~MASCARAS[longitud] & 0xFFFFFFFF)
+
+        # Ruta menos específica que cubre todo el rango (si la hay) y rutas contenidas en él
+        prefijos = []
+        base = self.rib.indice_lpm.buscar(red, longitud - 1) if longitud > 0 else None
+        if base is not None:
+            prefijos.append((inicio, longitud, EntradaFIB(base.red, base.longitud, base.next_hop, base.metric)))
+        for red_ruta, longitud_ruta, entrada in self._mejores_rutas(self.rib._rango(
+                (inicio, longitud, float("-inf")), (fin, 32, float("inf")))):
+            if base is not None and (red_ruta, longitud_ruta) == (inicio, longitud):
+                prefijos[0] = (red_ruta, longitud_ruta, entrada) # El propio prefijo tapa a la base
+            else:
+                prefijos.append((red_ruta, longitud_ruta, entrada))
+        nuevos_inicios, nuevos_fines, nuevas_entradas = construir_segmentos(prefijos, inicio, fin)
+
+        # Reemplazar los rangos que se solapan con [inicio, fin], recortando los de los bordes
+        inicios, fines, entradas = self.tabla
+        i = bisect_right(inicios, inicio) - 1
+        if i < 0 or fines[i] < inicio:
+            i += 1
+        j = bisect_right(inicios, fin)
+        izquierda_i, izquierda_f, izquierda_e = [], [], []
+        derecha_i, derecha_f, derecha_e = [], [], []
+        if i < j and inicios[i] < inicio:
+            izquierda_i, izquierda_f, izquierda_e = [inicios[i]], [inicio - 1], [entradas[i]]
+        if i < j and fines[j - 1] > fin:
+            derecha_i, derecha_f, derecha_e = [fin + 1], [fines[j - 1]], [entradas[j - 1]]
+
+        self.tabla = (
+            inicios[:i] + array('I', izquierda_i + nuevos_inicios + derecha_i) + inicios[j:],
+            fines[:i] + array('I', izquierda_f + nuevos_fines + derecha_f) + fines[j:],
+            entradas[:i] + tuple(izquierda_e + nuevas_entradas + derecha_e) + entradas[j:],
+        )
+        self.actualizaciones += 1
+
+    def obtener_stats(self):
+        """Retorna estadísticas de la FIB."""
+        return {
+            "rangos": len(self.tabla[0]),
+            "generacion": self.generacion,
+            "reconstrucciones": self.reconstrucciones,
+            "actualizaciones": self.actualizaciones
+        }
+
+
+class CacheBusqueda:
+    """
+    Caché LRU acotada por router: IP de destino -> (next_hop, políticas efectivas).
+    Se invalida sola cuando cambia la generación de la RIB o del trie de políticas,
+    así que cualquier modificación de rutas o políticas la vacía en la siguiente consulta.
+    Las políticas retornadas se comparten entre consultas y no deben modificarse.
+    """
+    def __init__(self, fib, politicas, capacidad=4096):
+        self.fib = fib
+        self.politicas = politicas
+        self.capacidad = capacidad
+        self.entradas = OrderedDict()
+        self.generacion_rib = fib.rib.generacion
+        self.generacion_politicas = politicas.generacion
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.invalidaciones = 0
+
+    def buscar(self, dest_ip):
+        """Retorna (next_hop o None, políticas) para una IP de destino."""
+        if (self.generacion_rib != self.fib.rib.generacion
+                or self.generacion_politicas != self.politicas.generacion):
+            self.invalidar()
+        resultado = self.entradas.get(dest_ip)
+        if resultado is not None:
+            self.entradas.move_to_end(dest_ip)
+            self.aciertos += 1
+            return resultado
+
+        self.fallos += 1
+        entrada = self.fib.buscar(dest_ip)
+        resultado = (entrada.next_hop if entrada else None, self.politicas.obtener_politica(dest_ip))
+        self.entradas[dest_ip] = resultado
+        if len(self.entradas) > self.capacidad:
+            self.entradas.popitem(last=False)
+            self.desalojos += 1
+        return resultado
+
+    def invalidar(self):
+        """Vacía la caché y la alinea con las generaciones actuales."""
+        if self.entradas:
+            self.entradas.clear()
+            self.invalidaciones += 1
+        self.generacion_rib = self.fib.rib.generacion
+        self.generacion_politicas = self.politicas.generacion
+
+    def redimensionar(self, capacidad):
+        """Cambia la capacidad máxima, desalojando las entradas menos usadas si sobran."""
+        self.capacidad = capacidad
+        while len(self.entradas) > capacidad:
+            self.entradas.popitem(last=False)
+            self.desalojos += 1
+
+    def obtener_stats(self):
+        """Retorna estadísticas de la caché."""
+        consultas = self.aciertos + self.fallos
+        return {
+            "capacidad": self.capacidad,
+            "entradas": len(self.entradas),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "desalojos": self.desalojos,
+            "invalidaciones": self.invalidaciones,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0
+        }
+
+
+class TablaPoliticas:
+    """
+    Versión compilada de un TrieComprimido: rangos disjuntos de direcciones con sus
+    políticas efectivas (ya heredadas de los prefijos menos específicos). Se recompila
+    por completo cuando cambia la generación del trie; se usa para el procesamiento
+    de paquetes en lote.
+    """
+    def __init__(self, trie):
+        self.trie = trie
+        self.tabla = (array('I'), array('I'), ())
+        self.generacion = -1
+
+    def sincronizar(self):
+        """Recompila la tabla si el trie cambió desde la última compilación."""
+        if self.generacion == self.trie.generacion:
+            return
+        generacion = self.trie.generacion
+
+        def _efectivas():
+            pila = [] # (fin, políticas efectivas) de los prefijos que contienen al actual
+            for prefix, longitud, politicas in self.trie.recorrer_prefijos():
+                red = ip_a_entero(prefix)
+                while pila and pila[-1][0] < red:
+                    pila.pop()
+                efectivas = dict(pila[-1][1]) if pila else {}
+                efectivas.update(politicas)
+                pila.append((red | (~MASCARAS[longitud] & 0xFFFFFFFF), efectivas))
+                yield red, longitud, efectivas
+
+        inicios, fines, politicas = construir_segmentos(_efectivas())
+        self.tabla = (array('I', inicios), array('I', fines), tuple(politicas))
+        self.generacion = generacion
+
+    def buscar(self, dest_ip):
+        """Retorna las políticas efectivas para una IP (entera o punteada)."""
+        self.sincronizar()
+        ip = dest_ip if isinstance(dest_ip, int) else ip_a_entero(dest_ip)
+        if ip is None:
+            return {}
+        inicios, fines, politicas = self.tabla
+        i = bisect_right(inicios, ip) - 1
+        if i >= 0 and ip <= fines[i]:
+            return politicas[i]
+        return {}
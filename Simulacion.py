@@ -0,0 +1,485 @@
+# Simulacion.py
+"""
+Modos de ejecución del tráfico de la red.
+Simulador: simulación de eventos discretos. Los paquetes esperan en la cola de cada
+dispositivo (Dispositivo.cola_paquetes), cada dispositivo procesa un paquete por vez y
+los enlaces tienen latencia y ancho de banda (atributos de la interfaz de salida). Los
+eventos se ordenan en un heap por instante simulado.
+RedAsincrona: cada dispositivo es una tarea de asyncio que atiende su propia cola, de
+modo que varios flujos de tráfico y la CLI comparten el mismo bucle de eventos.
+SimulacionParalela: los dispositivos se reparten en fragmentos que se procesan en un
+pool de procesos; los paquetes que cruzan de fragmento se intercambian por rondas.
+En ambos casos las decisiones de reenvío son las mismas que las de Red.enviar_paquete.
+"""
+import asyncio
+import heapq
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from Red import (ENTREGADO, ORIGEN_INEXISTENTE, IP_INVALIDA, EN_TRANSITO, MOTIVOS,
+                 TTL_POR_DEFECTO, ResultadoEnvio)
+from Eventos import SumideroNulo
+from Arboles import ip_a_entero
+
+# Tipos de evento del heap
+LLEGADA, PROCESAR = range(2)
+
+class Paquete:
+    """Paquete en vuelo dentro de la simulación."""
+    __slots__ = ("destino_ip", "propietario", "ttl", "tamano", "creado", "saltos")
+
+    def __init__(self, destino_ip, propietario, ttl, tamano, creado):
+        self.destino_ip = destino_ip
+        self.propietario = propietario # Dispositivo dueño de la IP de destino (o None)
+        self.ttl = ttl
+        self.tamano = tamano # Bytes
+        self.creado = creado # Instante simulado de envío
+        self.saltos = 0
+
+class Simulador:
+    """
+    Motor de eventos discretos sobre una Red.
+    Cada entrada del heap es (instante, secuencia, tipo, dispositivo, paquete); la secuencia
+    desempata eventos simultáneos en orden de programación. Los bucles de reenvío terminan
+    por expiración del TTL, ya que todo bucle pasa por al menos un router.
+    """
+    def __init__(self, red, tiempo_proceso=1e-6, sumidero=None):
+        """
+        Args:
+            red (Red): Red a simular.
+            tiempo_proceso (float): Segundos que tarda un dispositivo en procesar un paquete.
+            sumidero: Sumidero de eventos de reenvío (por defecto, SumideroNulo).
+        """
+        self.red = red
+        self.tiempo_proceso = tiempo_proceso
+        self.sumidero = sumidero if sumidero is not None else SumideroNulo()
+        self.reloj = 0.0
+        self.eventos = []
+        self.secuencia = 0
+        self.ocupados = set() # Dispositivos con un evento PROCESAR pendiente
+        self.enlace_libre = {} # (dispositivo, interfaz) -> instante en que termina la transmisión en curso
+        self.eventos_procesados = 0
+        self.conteo = [0] * len(MOTIVOS)
+        self.reportado = [0] * len(MOTIVOS) # Parte de conteo ya sumada a red.estadisticas
+        self.latencia_total = 0.0
+        self.saltos_totales = 0
+
+    def _programar(self, instante, tipo, dispositivo, paquete=None):
+        """Agrega un evento al heap."""
+        self.secuencia += 1
+        heapq.heappush(self.eventos, (instante, self.secuencia, tipo, dispositivo, paquete))
+
+    def programar_envio(self, origen_nombre, destino_ip, instante=0.0, tamano=1500, ttl=TTL_POR_DEFECTO):
+        """
+        Programa la inyección de un paquete en un dispositivo de origen.
+        Returns:
+            bool: True si se programó; False si el origen no existe o la IP es inválida
+                  (el descarte se cuenta en el resultado y en las estadísticas de la red al ejecutar).
+        """
+        if origen_nombre not in self.red.dispositivos:
+            self.conteo[ORIGEN_INEXISTENTE] += 1
+            return False
+        if ip_a_entero(destino_ip) is None:
+            self.conteo[IP_INVALIDA] += 1
+            return False
+        paquete = Paquete(destino_ip, self.red._propietario_ip(destino_ip), ttl, tamano, instante)
+        self._programar(instante, LLEGADA, origen_nombre, paquete)
+        return True
+
+    def programar_flujo(self, origen_nombre, destino_ip, cantidad, intervalo=0.001, inicio=0.0, tamano=1500, ttl=TTL_POR_DEFECTO):
+        """Programa `cantidad` paquetes separados por `intervalo` segundos. Retorna cuántos se programaron."""
+        programados = 0
+        for i in range(cantidad):
+            programados += self.programar_envio(origen_nombre, destino_ip, inicio + i * intervalo, tamano, ttl)
+        return programados
+
+    def ejecutar(self, hasta=None, max_eventos=None):
+        """
+        Procesa eventos en orden de instante hasta vaciar el heap, superar `hasta`
+        (segundos simulados) o procesar `max_eventos`.
+        Returns:
+            dict: Resumen de la ejecución (ver resumen()).
+        """
+        red = self.red
+        dispositivos = red.dispositivos
+        eventos = self.eventos
+        ocupados = self.ocupados
+        enlace_libre = self.enlace_libre
+        sumidero = self.sumidero
+        tiempo_proceso = self.tiempo_proceso
+        procesados = 0
+        inicio_real = time.perf_counter()
+
+        while eventos:
+            if hasta is not None and eventos[0][0] > hasta:
+                break
+            if max_eventos is not None and procesados >= max_eventos:
+                break
+            instante, _, tipo, nombre, paquete = heapq.heappop(eventos)
+            self.reloj = instante
+            procesados += 1
+            disp = dispositivos[nombre]
+
+            if tipo == LLEGADA:
+                disp.cola_paquetes.append(paquete)
+                if nombre not in ocupados:
+                    ocupados.add(nombre)
+                    self._programar(instante, PROCESAR, nombre)
+                continue
+
+            # PROCESAR: el dispositivo atiende el primer paquete de su cola
+            paquete = disp.cola_paquetes.popleft()
+            codigo, siguiente, paquete.ttl = red._decidir_salto(nombre, paquete.destino_ip, paquete.propietario, paquete.ttl, sumidero)
+            fin_proceso = instante + tiempo_proceso
+            if codigo == EN_TRANSITO:
+                # Transmisión por la interfaz de salida: serialización (si el enlace está ocupado, espera) + propagación
+                intf = disp.interfaces[red._segmento_l2(nombre)[siguiente]]
+                clave = (nombre, intf.nombre)
+                inicio_tx = max(fin_proceso, enlace_libre.get(clave, 0.0))
+                fin_tx = inicio_tx + paquete.tamano * 8 / intf.ancho_banda
+                enlace_libre[clave] = fin_tx
+                paquete.saltos += 1
+                self._programar(fin_tx + intf.latencia, LLEGADA, siguiente, paquete)
+            else:
+                self.conteo[codigo] += 1
+                if codigo == ENTREGADO:
+                    self.latencia_total += fin_proceso - paquete.creado
+                    self.saltos_totales += paquete.saltos
+            if disp.cola_paquetes:
+                self._programar(fin_proceso, PROCESAR, nombre)
+            else:
+                ocupados.discard(nombre)
+
+        self.eventos_procesados += procesados
+        # Incluye los envíos rechazados por programar_envio antes de esta ejecución
+        red._contabilizar([total - reportado for reportado, total in zip(self.reportado, self.conteo)])
+        self.reportado = list(self.conteo)
+        return self.resumen(procesados, time.perf_counter() - inicio_real)
+
+    def resumen(self, procesados=None, tiempo_real=None):
+        """
+        Retorna el resumen de la simulación: eventos procesados, tiempo simulado y real,
+        eventos por segundo real, paquetes entregados, descartes por motivo, latencia y
+        saltos medios de los paquetes entregados y paquetes aún en vuelo.
+        """
+        procesados = self.eventos_procesados if procesados is None else procesados
+        entregados = self.conteo[ENTREGADO]
+        return {
+            "eventos": procesados,
+            "tiempo_simulado": self.reloj,
+            "tiempo_real": tiempo_real,
+            "eventos_por_segundo": procesados / tiempo_real if tiempo_real else None,
+            "entregados": entregados,
+            "descartados": {MOTIVOS[codigo]: n for codigo, n in enumerate(self.conteo) if codigo != ENTREGADO and n},
+            "latencia_media": self.latencia_total / entregados if entregados else None,
+            "saltos_medios": self.saltos_totales / entregados if entregados else None,
+            "en_vuelo": sum(1 for evento in self.eventos if evento[2] == LLEGADA)
+                        + sum(len(self.red.dispositivos[nombre].cola_paquetes) for nombre in self.ocupados)
+        }
+
+
+class RedAsincrona:
+    """
+    Ejecución concurrente de la red sobre asyncio: mientras está iniciada, la cola_paquetes
+    de cada dispositivo se reemplaza por un asyncio.Queue y una tarea por dispositivo la
+    atiende, reenviando cada paquete a la cola del siguiente dispositivo. Cada envío
+    retorna un futuro que se resuelve con el ResultadoEnvio al entregarse o descartarse.
+    Los bucles de reenvío terminan por expiración del TTL.
+    Uso:
+        async with RedAsincrona(red) as runtime:
+            resultado = await runtime.enviar("PC1", "10.0.0.1")
+    """
+    LOTE = 64 # Paquetes que atiende una tarea antes de ceder el control al bucle de eventos
+
+    def __init__(self, red, capacidad_cola=0, sumidero=None):
+        """
+        Args:
+            red (Red): Red a ejecutar.
+            capacidad_cola (int): Capacidad de la cola de cada dispositivo (0 = sin límite);
+                                  con límite, un dispositivo espera si la cola del siguiente está llena
+                                  (contrapresión; en topologías con ciclos puede bloquearse).
+            sumidero: Sumidero de eventos de reenvío (por defecto, SumideroNulo).
+        """
+        self.red = red
+        self.capacidad_cola = capacidad_cola
+        self.sumidero = sumidero if sumidero is not None else SumideroNulo()
+        self.tareas = {}
+        self._colas_originales = {}
+        self.conteo = [0] * len(MOTIVOS)
+
+    async def __aenter__(self):
+        await self.iniciar()
+        return self
+
+    async def __aexit__(self, *excepcion):
+        await self.detener()
+
+    async def iniciar(self):
+        """Crea la cola y la tarea de cada dispositivo de la red que aún no las tenga."""
+        for nombre in self.red.dispositivos:
+            self._cola(nombre)
+
+    def _cola(self, nombre):
+        """
+        Retorna la cola de un dispositivo; si se agregó a la red después de iniciar(),
+        crea en ese momento su cola y su tarea.
+        """
+        disp = self.red.dispositivos[nombre]
+        if nombre not in self.tareas:
+            self._colas_originales[nombre] = disp.cola_paquetes
+            disp.cola_paquetes = asyncio.Queue(self.capacidad_cola)
+            self.tareas[nombre] = asyncio.create_task(self._atender(nombre, disp))
+        return disp.cola_paquetes
+
+    async def detener(self):
+        """
+        Cancela las tareas, restaura las colas originales y suma los resultados a las
+        estadísticas de la red. Los paquetes aún en cola se descartan sin resolver.
+        """
+        for tarea in self.tareas.values():
+            tarea.cancel()
+        await asyncio.gather(*self.tareas.values(), return_exceptions=True)
+        for nombre, cola in self._colas_originales.items():
+            disp = self.red.dispositivos.get(nombre)
+            if disp is not None:
+                disp.cola_paquetes = cola
+        self.tareas = {}
+        self._colas_originales = {}
+        self.red._contabilizar(self.conteo)
+        self.conteo = [0] * len(MOTIVOS)
+
+    async def _atender(self, nombre, disp):
+        """Tarea de un dispositivo: atiende su cola y reenvía o resuelve cada paquete."""
+        red = self.red
+        cola = disp.cola_paquetes
+        sumidero = self.sumidero
+        conteo = self.conteo
+        atendidos = 0
+        while True:
+            paquete, futuro, recorrido = await cola.get()
+            codigo, siguiente, paquete.ttl = red._decidir_salto(nombre, paquete.destino_ip, paquete.propietario, paquete.ttl, sumidero)
+            if codigo == EN_TRANSITO:
+                recorrido.append(siguiente)
+                paquete.saltos += 1
+                await self._cola(siguiente).put((paquete, futuro, recorrido))
+            else:
+                conteo[codigo] += 1
+                if not futuro.done():
+                    futuro.set_result(ResultadoEnvio(codigo == ENTREGADO, codigo, recorrido, paquete.ttl))
+            atendidos += 1
+            if atendidos % self.LOTE == 0:
+                await asyncio.sleep(0) # Ceder el control aunque la cola no esté vacía
+
+    async def enviar(self, origen_nombre, destino_ip, ttl=TTL_POR_DEFECTO, tamano=1500):
+        """
+        Inyecta un paquete en la cola del dispositivo de origen y espera su resultado.
+        Returns:
+            ResultadoEnvio: entregado, motivo (código de MOTIVOS), recorrido y TTL final.
+        """
+        futuro = await self.inyectar(origen_nombre, destino_ip, ttl, tamano)
+        return await futuro
+
+    async def inyectar(self, origen_nombre, destino_ip, ttl=TTL_POR_DEFECTO, tamano=1500):
+        """Inyecta un paquete y retorna el futuro de su resultado sin esperarlo."""
+        futuro = asyncio.get_running_loop().create_future()
+        if origen_nombre not in self.red.dispositivos:
+            self.conteo[ORIGEN_INEXISTENTE] += 1
+            futuro.set_result(ResultadoEnvio(False, ORIGEN_INEXISTENTE, [], ttl))
+        elif ip_a_entero(destino_ip) is None:
+            self.conteo[IP_INVALIDA] += 1
+            futuro.set_result(ResultadoEnvio(False, IP_INVALIDA, [origen_nombre], ttl))
+        else:
+            paquete = Paquete(destino_ip, self.red._propietario_ip(destino_ip), ttl, tamano, time.perf_counter())
+            await self._cola(origen_nombre).put((paquete, futuro, [origen_nombre]))
+        return futuro
+
+    async def flujo(self, origen_nombre, destino_ip, cantidad, intervalo=0.0, ttl=TTL_POR_DEFECTO):
+        """
+        Envía `cantidad` paquetes de un flujo, separados por `intervalo` segundos reales,
+        sin esperar a cada uno antes de enviar el siguiente.
+        Returns:
+            list: ResultadoEnvio de cada paquete, en orden de envío.
+        """
+        futuros = []
+        for _ in range(cantidad):
+            futuros.append(await self.inyectar(origen_nombre, destino_ip, ttl))
+            if intervalo > 0:
+                await asyncio.sleep(intervalo)
+        return await asyncio.gather(*futuros)
+
+    async def consola(self, cli, entrada=input):
+        """
+        Bucle de la CLI dentro del bucle de eventos: la lectura de cada comando se hace en un
+        hilo para no bloquear a los dispositivos. El comando 'flow <origen> <destino_ip> <cantidad>'
+        lanza un flujo en segundo plano e informa el resultado al terminar.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                comando = (await loop.run_in_executor(None, entrada, cli.obtener_prompt())).strip()
+            except (EOFError, KeyboardInterrupt):
+                print("\n\n[Fin de entrada. Saliendo...] ")
+                break
+            partes = comando.split()
+            if partes and partes[0] == "flow":
+                if len(partes) == 4 and partes[3].isdigit():
+                    asyncio.create_task(self._informar_flujo(partes[1], partes[2], int(partes[3])))
+                    print(f"Flujo de {partes[3]} paquetes de {partes[1]} a {partes[2]} iniciado.")
+                else:
+                    print("Uso: flow <origen> <destino_ip> <cantidad>")
+                continue
+            terminado, mensaje = cli.procesar_comando(comando)
+            print(mensaje, end="")
+            if terminado:
+                break
+            await self.iniciar() # Colas y tareas para los dispositivos que haya agregado el comando
+
+    async def _informar_flujo(self, origen_nombre, destino_ip, cantidad):
+        """Ejecuta un flujo e imprime su resumen al terminar."""
+        inicio = time.perf_counter()
+        resultados = await self.flujo(origen_nombre, destino_ip, cantidad)
+        entregados = sum(1 for r in resultados if r.entregado)
+        print(f"\n[flow {origen_nombre} -> {destino_ip}] {entregados}/{cantidad} entregados en {time.perf_counter() - inicio:.3f} s")
+
+
+# Estado de cada proceso trabajador de SimulacionParalela (copia de la red y asignación de fragmentos)
+_red_trabajador = None
+_asignacion_trabajador = None
+
+def _iniciar_trabajador(red_serializada, asignacion):
+    """Inicializador del pool: deserializa la red una sola vez por proceso."""
+    global _red_trabajador, _asignacion_trabajador
+    _red_trabajador = pickle.loads(red_serializada)
+    _asignacion_trabajador = asignacion
+
+def _procesar_fragmento(fragmento, paquetes):
+    """
+    Avanza los paquetes de un fragmento mientras sigan dentro de él.
+    Args:
+        fragmento (int): Número de fragmento.
+        paquetes (list): Tuplas (indice, dispositivo, destino_ip, propietario, ttl, saltos).
+    Returns:
+        tuple: (terminados, salientes) - terminados es una lista de (indice, codigo, saltos, dispositivo);
+               salientes, {fragmento_destino: [paquetes con el mismo formato de entrada]}.
+    """
+    red = _red_trabajador
+    asignacion = _asignacion_trabajador
+    sumidero = SumideroNulo()
+    terminados = []
+    salientes = {}
+    for indice, actual, destino_ip, propietario, ttl, saltos in paquetes:
+        while True:
+            codigo, siguiente, ttl = red._decidir_salto(actual, destino_ip, propietario, ttl, sumidero)
+            if codigo != EN_TRANSITO:
+                terminados.append((indice, codigo, saltos, actual))
+                break
+            saltos += 1
+            destino = asignacion[siguiente]
+            if destino != fragmento:
+                salientes.setdefault(destino, []).append((indice, siguiente, destino_ip, propietario, ttl, saltos))
+                break
+            actual = siguiente
+    return terminados, salientes
+
+
+class SimulacionParalela:
+    """
+    Procesamiento de lotes de paquetes repartido en varios núcleos.
+    La red se particiona con Red.particionar y se copia una vez a cada proceso del pool;
+    en cada ronda cada fragmento con paquetes pendientes se procesa como una tarea y los
+    paquetes que pasan a otro fragmento se agrupan para la ronda siguiente. Los bucles de
+    reenvío terminan por expiración del TTL. Los cambios de configuración hechos después
+    de iniciar() no llegan a los trabajadores.
+    Uso:
+        with SimulacionParalela(red, procesos=4) as simulacion:
+            resultado = simulacion.ejecutar(paquetes)
+    """
+    def __init__(self, red, procesos=None, fragmentos=None):
+        """
+        Args:
+            red (Red): Red a simular.
+            procesos (int): Procesos del pool (por defecto, los núcleos disponibles).
+            fragmentos (int): Número de fragmentos (por defecto, igual a procesos).
+        """
+        self.red = red
+        self.procesos = procesos or os.cpu_count() or 1
+        self.fragmentos = fragmentos or self.procesos
+        self.asignacion = red.particionar(self.fragmentos)
+        self._pool = None
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def iniciar(self):
+        """Crea el pool de procesos con una copia de la red (sin su sumidero de eventos)."""
+        sumidero = self.red.sumidero
+        self.red.sumidero = SumideroNulo()
+        try:
+            red_serializada = pickle.dumps(self.red, protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            self.red.sumidero = sumidero
+        self._pool = ProcessPoolExecutor(self.procesos, initializer=_iniciar_trabajador,
+                                         initargs=(red_serializada, self.asignacion))
+
+    def cerrar(self):
+        """Cierra el pool de procesos."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def ejecutar(self, paquetes, ttl=TTL_POR_DEFECTO):
+        """
+        Envía un lote de paquetes y suma los resultados a las estadísticas de la red.
+        Args:
+            paquetes: Iterable de tuplas (origen_nombre, destino_ip, mensaje).
+            ttl (int): TTL inicial de todos los paquetes.
+        Returns:
+            dict: Listas paralelas al lote "exito", "motivo", "saltos" y "dispositivo"
+                  (como Red.enviar_lote), más "rondas" y "cruces" (paquetes que cambiaron de fragmento).
+        """
+        if self._pool is None:
+            self.iniciar()
+        paquetes = paquetes if isinstance(paquetes, list) else list(paquetes)
+        total = len(paquetes)
+        motivo = [ENTREGADO] * total
+        saltos = [0] * total
+        dispositivo = [None] * total
+
+        pendientes = {}
+        for indice, (origen_nombre, destino_ip, _) in enumerate(paquetes):
+            if origen_nombre not in self.asignacion:
+                motivo[indice] = ORIGEN_INEXISTENTE
+            elif ip_a_entero(destino_ip) is None:
+                motivo[indice] = IP_INVALIDA
+                dispositivo[indice] = origen_nombre
+            else:
+                pendientes.setdefault(self.asignacion[origen_nombre], []).append(
+                    (indice, origen_nombre, destino_ip, self.red._propietario_ip(destino_ip), ttl, 0))
+
+        rondas = cruces = 0
+        while pendientes:
+            rondas += 1
+            futuros = [self._pool.submit(_procesar_fragmento, fragmento, lote) for fragmento, lote in pendientes.items()]
+            pendientes = {}
+            for futuro in futuros:
+                terminados, salientes = futuro.result()
+                for indice, codigo, n_saltos, ultimo in terminados:
+                    motivo[indice] = codigo
+                    saltos[indice] = n_saltos
+                    dispositivo[indice] = ultimo
+                for fragmento, lote in salientes.items():
+                    cruces += len(lote)
+                    pendientes.setdefault(fragmento, []).extend(lote)
+
+        conteo = [0] * len(MOTIVOS)
+        for codigo in motivo:
+            conteo[codigo] += 1
+        self.red._contabilizar(conteo)
+        return {"exito": [codigo == ENTREGADO for codigo in motivo], "motivo": motivo, "saltos": saltos,
+                "dispositivo": dispositivo, "rondas": rondas, "cruces": cruces}
@@ -0,0 +1,220 @@
+# Topologias.py
+"""
+Generadores de datos sintéticos para pruebas de escala: tablas de rutas con una
+distribución de prefijos realista, IPs de destino y topologías completas construidas
+con la API pública de Red y Router. También mide la memoria usada por la construcción
+de una red y por cada tipo de objeto.
+"""
+import math
+import random
+import sys
+import time
+import tracemalloc
+
+from Arboles import NodoAVL, NodoTrie, NodoTrieComprimido, NodoBTree, entero_a_ip, ip_a_entero, MASCARAS
+from Dispositivos import Interfaz, Enlace
+from Red import Red
+
+def generar_rutas(cantidad, semilla=42):
+    """
+    Genera rutas aleatorias (prefix, mask, next_hop, metric) con una distribución
+    de longitudes de máscara similar a una tabla real (mayoría /24, algunos /16-/23).
+    """
+    rng = random.Random(semilla)
+    longitudes = [8] + [16] * 3 + list(range(17, 24)) * 2 + [24] * 30 + [28, 30, 32]
+    rutas = []
+    for _ in range(cantidad):
+        longitud = rng.choice(longitudes)
+        red = rng.getrandbits(32) & MASCARAS[longitud]
+        rutas.append((entero_a_ip(red), str(longitud), entero_a_ip(rng.getrandbits(32)), rng.randint(1, 20)))
+    return rutas
+
+def generar_destinos(rutas, cantidad, semilla=7):
+    """Genera IPs de destino: la mitad dentro de rutas existentes y la mitad aleatorias."""
+    rng = random.Random(semilla)
+    destinos = []
+    for i in range(cantidad):
+        if i % 2 == 0 and rutas:
+            prefix, mask, _, _ = rng.choice(rutas)
+            libres = 32 - int(mask)
+            ip = ip_a_entero(prefix) | (rng.getrandbits(libres) if libres else 0)
+        else:
+            ip = rng.getrandbits(32)
+        destinos.append(entero_a_ip(ip))
+    return destinos
+
+def topologia_estrella(red, bordes, hosts_por_borde):
+    """
+    Construye una topología de dos niveles: un router núcleo conectado a `bordes` routers
+    de borde, cada uno con un switch y `hosts_por_borde` hosts en la red 10.<b/256>.<b%256>.0/24.
+    Retorna la lista de (nombre_host, ip_host).
+    """
+    red.agregar_dispositivo("router", "Nucleo")
+    nucleo = red.obtener_dispositivo("Nucleo")
+    hosts = []
+    for b in range(bordes):
+        red_borde = f"10.{b // 256}.{b % 256}"
+        router, switch = f"B{b}", f"S{b}"
+        red.agregar_dispositivo("router", router)
+        red.agregar_dispositivo("switch", switch)
+        borde = red.obtener_dispositivo(router)
+        borde.agregar_interfaz("up")
+        borde.agregar_interfaz("lan")
+        nucleo.agregar_interfaz(f"b{b}")
+        red.obtener_dispositivo(switch).agregar_interfaz("up")
+        red.conectar("Nucleo", f"b{b}", router, "up")
+        red.conectar(router, "lan", switch, "up")
+        red.asignar_ip("Nucleo", f"b{b}", f"100.{b // 256}.{b % 256}.1", 30)
+        red.asignar_ip(router, "up", f"100.{b // 256}.{b % 256}.2", 30)
+        red.asignar_ip(router, "lan", f"{red_borde}.1", 24)
+        red.establecer_estado_interfaz(switch, "up", True)
+        borde.tabla_rutas_avl.insertar("0.0.0.0", "0", f"100.{b // 256}.{b % 256}.1", 1)
+        nucleo.tabla_rutas_avl.insertar(f"{red_borde}.0", "24", f"100.{b // 256}.{b % 256}.2", 1)
+        for h in range(hosts_por_borde):
+            host, puerto = f"H{b}_{h}", f"p{h}"
+            red.agregar_dispositivo("host", host)
+            red.obtener_dispositivo(host).agregar_interfaz("eth0")
+            red.obtener_dispositivo(switch).agregar_interfaz(puerto)
+            red.conectar(host, "eth0", switch, puerto)
+            red.establecer_estado_interfaz(switch, puerto, True)
+            red.asignar_ip(host, "eth0", f"{red_borde}.{10 + h}", 24)
+            hosts.append((host, f"{red_borde}.{10 + h}"))
+    return hosts
+
+def _ip(base, desplazamiento):
+    """Suma un desplazamiento a una IP entera y la retorna en notación punteada."""
+    return entero_a_ip(base + desplazamiento)
+
+def generar_topologia(red, routers, switches=0, hosts=0, rutas_por_router=0, politicas_por_router=0, semilla=1):
+    """
+    Construye una topología sintética en `red`:
+    - Los routers forman un anillo de enlaces punto a punto /30 (en 100.64.0.0/10), con
+      routers // 4 enlaces extra al azar para tener caminos alternativos.
+    - Cada switch cuelga de un router (en turno rotativo) con su propia subred LAN
+      (en 10.0.0.0/8), dimensionada para los hosts que le tocan (como máximo /24).
+    - Los hosts se reparten entre los switches.
+    - Cada router recibe `rutas_por_router` rutas con la distribución de generar_rutas y
+      siguiente salto en un router vecino, y `politicas_por_router` políticas en su trie.
+    Returns:
+        dict: {"routers": [nombres], "switches": [nombres], "hosts": [(nombre, ip)]}
+    Raises:
+        ValueError: Si hay switches sin routers o hosts sin switches.
+    """
+    if switches and not routers:
+        raise ValueError("Los switches necesitan al menos un router.")
+    if hosts and not switches:
+        raise ValueError("Los hosts necesitan al menos un switch.")
+    rng = random.Random(semilla)
+    nombres_routers = [f"R{i}" for i in range(routers)]
+    for nombre in nombres_routers:
+        red.agregar_dispositivo("router", nombre)
+
+    # Núcleo: anillo y cuerdas al azar, un /30 por enlace
+    vecinos = {nombre: [] for nombre in nombres_routers} # nombre -> IPs de los routers vecinos
+    enlaces = [(i, (i + 1) % routers) for i in range(routers if routers > 2 else routers - 1)]
+    enlaces += [(rng.randrange(routers), rng.randrange(routers)) for _ in range(routers // 4)]
+    base_p2p = ip_a_entero("100.64.0.0")
+    for k, (a, b) in enumerate(enlaces):
+        if a == b:
+            continue
+        ra, rb = nombres_routers[a], nombres_routers[b]
+        ia, ib = f"p{k}a", f"p{k}b"
+        red.obtener_dispositivo(ra).agregar_interfaz(ia)
+        red.obtener_dispositivo(rb).agregar_interfaz(ib)
+        red.conectar(ra, ia, rb, ib)
+        ip_a, ip_b = _ip(base_p2p, 4 * k + 1), _ip(base_p2p, 4 * k + 2)
+        red.asignar_ip(ra, ia, ip_a, 30)
+        red.asignar_ip(rb, ib, ip_b, 30)
+        vecinos[ra].append(ip_b)
+        vecinos[rb].append(ip_a)
+
+    # Acceso: un switch por LAN, hosts repartidos entre los switches
+    nombres_switches = [f"S{i}" for i in range(switches)]
+    hosts_por_switch = -(-hosts // switches) if switches else 0
+    longitud = max(0, min(24, 32 - math.ceil(math.log2(hosts_por_switch + 3)))) if switches else 24
+    base_lan = ip_a_entero("10.0.0.0")
+    lista_hosts = []
+    for s, switch in enumerate(nombres_switches):
+        router = nombres_routers[s % routers]
+        red_lan = base_lan + s * (1 << (32 - longitud))
+        red.agregar_dispositivo("switch", switch)
+        red.obtener_dispositivo(switch).agregar_interfaz("up")
+        red.obtener_dispositivo(router).agregar_interfaz(f"lan{s}")
+        red.conectar(router, f"lan{s}", switch, "up")
+        red.asignar_ip(router, f"lan{s}", _ip(red_lan, 1), longitud)
+        red.establecer_estado_interfaz(switch, "up", True)
+    for h in range(hosts):
+        s = h % switches
+        switch, host, puerto = nombres_switches[s], f"H{h}", f"p{h // switches}"
+        ip = _ip(base_lan + s * (1 << (32 - longitud)), 2 + h // switches)
+        red.agregar_dispositivo("host", host)
+        red.obtener_dispositivo(host).agregar_interfaz("eth0")
+        red.obtener_dispositivo(switch).agregar_interfaz(puerto)
+        red.conectar(host, "eth0", switch, puerto)
+        red.establecer_estado_interfaz(switch, puerto, True)
+        red.asignar_ip(host, "eth0", ip, longitud)
+        lista_hosts.append((host, ip))
+
+    # Plano de control: rutas y políticas con distribución de prefijos realista
+    for i, nombre in enumerate(nombres_routers):
+        router = red.obtener_dispositivo(nombre)
+        if rutas_por_router and vecinos[nombre]:
+            rutas = [(prefix, mask, rng.choice(vecinos[nombre]), metric)
+                     for prefix, mask, _, metric in generar_rutas(rutas_por_router, semilla + i)]
+            router.tabla_rutas_avl.cargar_masivo(rutas)
+        for prefix, mask, _, metric in generar_rutas(politicas_por_router, semilla + routers + i):
+            router.trie_politicas.insertar_prefijo(prefix, int(mask), {"ttl-min": metric} if metric % 2 else {"block": True})
+    return {"routers": nombres_routers, "switches": nombres_switches, "hosts": lista_hosts}
+
+def memoria_por_objeto(fabrica, cantidad=10000):
+    """
+    Bytes promedio por objeto creado con fabrica(i), incluidos sus atributos y contenedores
+    internos (medido con tracemalloc, descontando la lista que los retiene).
+    Los argumentos de la fábrica deben crearse antes para no contarlos.
+    """
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    objetos = [fabrica(i) for i in range(cantidad)]
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (despues - antes - sys.getsizeof(objetos)) / cantidad
+
+def memoria_objetos(cantidad=10000):
+    """Retorna {clase: bytes por objeto} para los nodos de los árboles, las interfaces y los enlaces."""
+    prefijos = [entero_a_ip(i << 8) for i in range(cantidad)]
+    nombres = [f"eth{i}" for i in range(cantidad)]
+    return {
+        "NodoAVL": memoria_por_objeto(lambda i: NodoAVL(prefijos[i], "24", "10.0.0.1", 1), cantidad),
+        "NodoTrie": memoria_por_objeto(lambda i: NodoTrie(), cantidad),
+        "NodoTrieComprimido": memoria_por_objeto(lambda i: NodoTrieComprimido(i << 8, 24), cantidad),
+        "NodoBTree": memoria_por_objeto(lambda i: NodoBTree(4), cantidad),
+        "Interfaz": memoria_por_objeto(lambda i: Interfaz(nombres[i]), cantidad),
+        "Enlace": memoria_por_objeto(lambda i: Enlace("R1", nombres[i], "R2", nombres[i]), cantidad),
+    }
+
+def medir_escala(routers, switches, hosts, rutas_por_router=0, politicas_por_router=0, semilla=1):
+    """
+    Construye una red sintética midiendo el tiempo de construcción y el pico de memoria.
+    Returns:
+        dict: Parámetros, "segundos", "memoria_pico" y "memoria_final" (bytes), y conteos de
+              dispositivos, interfaces, nodos AVL y nodos de los tries de políticas.
+    """
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    red = Red()
+    generar_topologia(red, routers, switches, hosts, rutas_por_router, politicas_por_router, semilla)
+    segundos = time.perf_counter() - inicio
+    memoria_final, memoria_pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    routers_red = [d for d in red.dispositivos.values() if d.tipo == "router"]
+    return {
+        "routers": routers, "switches": switches, "hosts": hosts,
+        "rutas_por_router": rutas_por_router, "politicas_por_router": politicas_por_router,
+        "segundos": segundos, "memoria_pico": memoria_pico, "memoria_final": memoria_final,
+        "dispositivos": len(red.dispositivos),
+        "interfaces": sum(len(d.interfaces) for d in red.dispositivos.values()),
+        "enlaces": len(red.enlaces),
+        "nodos_avl": sum(r.tabla_rutas_avl.nodos for r in routers_red),
+        "nodos_trie": sum(r.trie_politicas.nodos for r in routers_red),
+    }